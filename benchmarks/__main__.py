@@ -0,0 +1,241 @@
+"""Run throughput benchmarks: python -m benchmarks --help."""
+
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from io import StringIO
+from pathlib import Path
+from typing import Any
+
+import typer
+
+from migratassert import __version__
+from migratassert.migrate import YAML_ENGINES, get_yaml, load_yaml, run_migration
+from migratassert.transform import transform_config
+
+from benchmarks.corpus import CorpusShape, write_corpus
+
+app = typer.Typer(
+  name="migratassert-bench",
+  help="Benchmark parse/transform/dump throughput on a synthetic v4.4.0 corpus",
+  add_completion=False,
+)
+
+
+def peak_rss_kb() -> int:
+  """Return the peak resident set size of this process in KiB."""
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  # macOS reports bytes, Linux reports KiB
+  return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def git_revision() -> str | None:
+  """Return the current git commit, if available."""
+  try:
+    out = subprocess.run(
+      ["git", "rev-parse", "--short", "HEAD"],
+      capture_output=True,
+      text=True,
+      check=True,
+    )
+  except (OSError, subprocess.CalledProcessError):
+    return None
+  return out.stdout.strip()
+
+
+def _phase(seconds: float, files: int, nbytes: int) -> dict[str, float]:
+  """Summarize one timed phase."""
+  return {
+    "seconds": round(seconds, 6),
+    "files_per_sec": round(files / seconds, 2) if seconds else 0.0,
+    "mb_per_sec": round(nbytes / 1e6 / seconds, 3) if seconds else 0.0,
+  }
+
+
+def time_end_to_end(indir: Path, engine: str, repeat: int) -> float:
+  """Time whole run_migration calls over a corpus directory.
+
+  Covers what the separate phases leave out: discovery, reads, writes
+  and per-file bookkeeping. Each run writes into a fresh directory so
+  no output is skipped as unchanged.
+
+  Args:
+    indir: Directory holding the corpus
+    engine: One of YAML_ENGINES
+    repeat: Number of timed runs (fastest is kept)
+
+  Returns:
+    Seconds taken by the fastest run
+
+  Raises:
+    RuntimeError: If any file fails to migrate
+  """
+  best = float("inf")
+  for _ in range(repeat):
+    with tempfile.TemporaryDirectory(prefix="migratassert-bench-out-") as outdir:
+      start = time.perf_counter()
+      result = run_migration(indir, Path(outdir), yaml_engine=engine, keep_file_results=False)
+      best = min(best, time.perf_counter() - start)
+    if result.failures:
+      name, error = result.failures[0]
+      raise RuntimeError(f"{len(result.failures)} files failed to migrate, e.g. {name}: {error}")
+  return best
+
+
+def run_benchmark(indir: Path, paths: list[Path], engine: str, repeat: int) -> dict[str, Any]:
+  """Time parse, transform and dump separately over a corpus, then end to end.
+
+  Each phase is run `repeat` times and the fastest run is kept. The
+  end-to-end timing is not part of "total", which sums the phases.
+
+  Args:
+    indir: Directory holding the corpus
+    paths: v4.4.0 files to benchmark
+    engine: One of YAML_ENGINES
+    repeat: Number of timed repetitions per phase
+
+  Returns:
+    Dict with per-phase timings and byte counts
+  """
+  yaml = get_yaml(engine)
+  texts = [p.read_text() for p in paths]
+  input_bytes = sum(len(t.encode("utf-8")) for t in texts)
+
+  best = {"parse": float("inf"), "transform": float("inf"), "dump": float("inf")}
+  output_bytes = 0
+  for _ in range(repeat):
+    start = time.perf_counter()
+    parsed = [load_yaml(yaml, t) for t in texts]
+    best["parse"] = min(best["parse"], time.perf_counter() - start)
+
+    start = time.perf_counter()
+    configs = [transform_config(c, file_stem=p.stem.upper()).config for c, p in zip(parsed, paths)]
+    best["transform"] = min(best["transform"], time.perf_counter() - start)
+
+    start = time.perf_counter()
+    dumped = []
+    for config in configs:
+      stream = StringIO()
+      yaml.dump(config, stream)
+      dumped.append(stream.getvalue())
+    best["dump"] = min(best["dump"], time.perf_counter() - start)
+    output_bytes = sum(len(d.encode("utf-8")) for d in dumped)
+
+  end_to_end = time_end_to_end(indir, engine, repeat)
+  files = len(paths)
+  return {
+    "engine": engine,
+    "input_bytes": input_bytes,
+    "output_bytes": output_bytes,
+    "phases": {
+      "parse": _phase(best["parse"], files, input_bytes),
+      "transform": _phase(best["transform"], files, input_bytes),
+      "dump": _phase(best["dump"], files, output_bytes),
+      "total": _phase(sum(best.values()), files, input_bytes),
+      "end_to_end": _phase(end_to_end, files, input_bytes),
+    },
+  }
+
+
+def compare_results(
+  baseline: dict[str, Any],
+  current: dict[str, Any],
+  threshold: float,
+) -> tuple[list[str], bool]:
+  """Compare two benchmark result documents phase by phase.
+
+  Args:
+    baseline: Earlier benchmark output
+    current: New benchmark output
+    threshold: Allowed slowdown as a fraction (0.1 = 10%)
+
+  Returns:
+    Tuple of (report lines, True if any phase regressed past threshold)
+  """
+  lines = []
+  regressed = False
+  old_runs = {r["engine"]: r for r in baseline.get("runs", [])}
+  for run in current["runs"]:
+    old = old_runs.get(run["engine"])
+    if old is None:
+      continue
+    for phase, stats in run["phases"].items():
+      old_seconds = old["phases"].get(phase, {}).get("seconds")
+      if not old_seconds:
+        continue
+      change = stats["seconds"] / old_seconds - 1
+      flag = ""
+      if change > threshold:
+        flag = "  REGRESSION"
+        regressed = True
+      lines.append(f"  {run['engine']:>9} {phase:<10} {change:+7.1%}{flag}")
+  return lines, regressed
+
+
+@app.command()
+def main(
+  files: int = typer.Option(200, help="Number of configs in the corpus"),
+  sections: int = typer.Option(2, help="Sections per config"),
+  attributes: int = typer.Option(3, help="Attributes per template/section"),
+  transformations: int = typer.Option(1, help="math_module transformations per attribute"),
+  reindex_filters: int = typer.Option(2, help="Reindexing filters per template/section"),
+  list_values: int = typer.Option(3, help="Items in list-valued hyperparameters"),
+  seed: int = typer.Option(0, help="Corpus generator seed"),
+  engine: list[str] = typer.Option(list(YAML_ENGINES), help="YAML engine(s) to benchmark"),
+  repeat: int = typer.Option(3, min=1, help="Repetitions per phase (fastest is kept)"),
+  output: Path | None = typer.Option(None, "--output", "-o", help="Write JSON results to this file"),
+  compare: Path | None = typer.Option(None, help="Baseline JSON results to compare against"),
+  threshold: float = typer.Option(0.10, help="Allowed slowdown before --compare fails"),
+) -> None:
+  """Benchmark parse/transform/dump throughput on a synthetic corpus."""
+  shape = CorpusShape(
+    files=files,
+    sections=sections,
+    attributes=attributes,
+    transformations=transformations,
+    reindex_filters=reindex_filters,
+    list_values=list_values,
+    seed=seed,
+  )
+
+  with tempfile.TemporaryDirectory(prefix="migratassert-bench-") as tmp:
+    paths = write_corpus(shape, Path(tmp))
+    runs = [run_benchmark(Path(tmp), paths, e, repeat) for e in engine]
+
+  results = {
+    "version": __version__,
+    "commit": git_revision(),
+    "python": platform.python_version(),
+    "shape": asdict(shape),
+    "runs": runs,
+    "peak_rss_kb": peak_rss_kb(),
+  }
+
+  for run in runs:
+    typer.echo(f"[{run['engine']}]")
+    for phase, stats in run["phases"].items():
+      typer.echo(
+        f"  {phase:<10} {stats['seconds']:9.4f}s "
+        f"{stats['files_per_sec']:10.1f} files/s {stats['mb_per_sec']:8.2f} MB/s"
+      )
+  typer.echo(f"Peak RSS: {results['peak_rss_kb'] / 1024:.1f} MiB")
+
+  if output is not None:
+    output.write_text(json.dumps(results, indent=2) + "\n")
+
+  if compare is not None:
+    lines, regressed = compare_results(json.loads(compare.read_text()), results, threshold)
+    typer.echo(f"Compared with {compare}:")
+    for line in lines:
+      typer.echo(line)
+    if regressed:
+      raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+  app()
@@ -0,0 +1,151 @@
+"""Synthetic v4.4.0 corpus generator for benchmarks."""
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from migratassert.migrate import get_yaml
+
+ORGANISMS = ["NCBITaxon:9606", "NCBITaxon:10090", "NCBITaxon:10116", "NCBITaxon:7227"]
+CLASSES = ["biolink:Gene", "biolink:Protein", "biolink:Disease", "biolink:ChemicalEntity"]
+PREDICATES = ["biolink:related_to", "biolink:associated_with", "biolink:treats"]
+ATTRIBUTE_NAMES = [
+  "p_value",
+  "sample_size",
+  "relationship_strength",
+  "multiple_testing_correction_method",
+  "assertion_method",
+]
+COMPARISONS = ["lt", "le", "gt", "ge", "eq", "ne"]
+
+
+@dataclass
+class CorpusShape:
+  """Size and shape of a synthetic v4.4.0 corpus."""
+
+  files: int = 200
+  sections: int = 2
+  attributes: int = 3
+  transformations: int = 1
+  reindex_filters: int = 2
+  list_values: int = 3
+  seed: int = 0
+
+
+def _encoding(
+  rng: random.Random,
+  shape: CorpusShape,
+  column: str,
+  hyperparameters: bool = True,
+) -> dict[str, Any]:
+  """Build one NodeEncoding block."""
+  encoding: dict[str, Any] = {
+    "encoding_method": "column_of_values",
+    "value_for_encoding": column,
+  }
+  if hyperparameters:
+    encoding["mapping_hyperparameters"] = {
+      "in_this_organism": rng.choice(ORGANISMS),
+      "classes_to_prioritize": rng.sample(CLASSES, min(shape.list_values, len(CLASSES))),
+      "classes_to_avoid": [CLASSES[-1]],
+      "substrings_to_remove": [f"(obsolete {i})" for i in range(shape.list_values)],
+      "regular_expressions": [f"^{column}_[0-9]+$"] * shape.list_values,
+      "explode_by_delimiter": ";",
+    }
+  return encoding
+
+
+def _attributes(rng: random.Random, shape: CorpusShape) -> dict[str, Any]:
+  """Build an attributes block with math_module transformations."""
+  attributes: dict[str, Any] = {}
+  for i in range(shape.attributes):
+    name = ATTRIBUTE_NAMES[i % len(ATTRIBUTE_NAMES)]
+    if i >= len(ATTRIBUTE_NAMES):
+      name = f"{name}_{i}"
+    attr = _encoding(rng, shape, f"attr_{i}", hyperparameters=False)
+    if shape.transformations:
+      attr["math_module_transformations"] = [
+        {"attribute": "log", "arguments": ["values", 10 + t]}
+        for t in range(shape.transformations)
+      ]
+    attributes[name] = attr
+  attributes["notes"] = "Synthetic benchmark notes that are long enough to be realistic"
+  return attributes
+
+
+def _block(rng: random.Random, shape: CorpusShape, index: int) -> dict[str, Any]:
+  """Build the location/triple/provenance/attributes blocks of a template or section."""
+  return {
+    "location": {
+      "where_to_download_data_from": f"https://example.com/data_{index}.xlsx",
+      "download_hyperparameters": {
+        "file_extension": "xlsx",
+        "which_excel_sheet_to_use": f"Sheet{index}",
+        "start_at_line_number": 2,
+      },
+    },
+    "triple": {
+      "triple_subject": _encoding(rng, shape, "subject"),
+      "triple_predicate": {
+        "encoding_method": "value",
+        "value_for_encoding": rng.choice(PREDICATES),
+      },
+      "triple_object": _encoding(rng, shape, "object"),
+    },
+    "provenance": {
+      "publication": f"PMC:{1000000 + index}",
+      "config_curator_name": "Benchmark Curator",
+      "config_curator_organization": "Institute for Systems Biology",
+      "config_curator_date": "01 JAN 2025",
+    },
+    "attributes": _attributes(rng, shape),
+    "reindexing": [
+      {
+        "when": "after",
+        "column": f"col_{f}",
+        "comparison": rng.choice(COMPARISONS),
+        "value_for_comparison": round(rng.random(), 3),
+      }
+      for f in range(shape.reindex_filters)
+    ],
+  }
+
+
+def generate_config(shape: CorpusShape, index: int) -> dict[str, Any]:
+  """Generate one synthetic v4.4.0 config.
+
+  Args:
+    shape: Corpus shape parameters
+    index: Position of the config within the corpus
+
+  Returns:
+    v4.4.0 config dict
+  """
+  rng = random.Random(shape.seed * 1_000_003 + index)
+  template = _block(rng, shape, index)
+  config: dict[str, Any] = {"template": template}
+  if shape.sections:
+    config["sections"] = [_block(rng, shape, s) for s in range(shape.sections)]
+  return config
+
+
+def write_corpus(shape: CorpusShape, outdir: Path) -> list[Path]:
+  """Write a synthetic corpus to disk.
+
+  Args:
+    shape: Corpus shape parameters
+    outdir: Directory to write v4.4.0 YAML files into
+
+  Returns:
+    Paths of the written files, in generation order
+  """
+  outdir.mkdir(parents=True, exist_ok=True)
+  yaml = get_yaml()
+  paths = []
+  for index in range(shape.files):
+    path = outdir / f"bench{index:06d}.yaml"
+    with open(path, "w") as f:
+      yaml.dump(generate_config(shape, index), f)
+    paths.append(path)
+  return paths
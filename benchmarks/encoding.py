@@ -0,0 +1,104 @@
+"""Microbenchmark for map_node_encoding: python -m benchmarks.encoding --help."""
+
+import random
+import timeit
+from typing import Any
+
+import typer
+
+from migratassert.encoding import (
+  DROPPED_FIELDS,
+  ENCODING_FIELD_MAP,
+  HYPERPARAMETER_FIELD_MAP,
+  METHOD_VALUE_MAP,
+  MapResult,
+  extract_taxon_id,
+  map_node_encoding,
+  map_transformations,
+  normalize_list_values,
+)
+
+from benchmarks.corpus import CorpusShape, _attributes, _encoding
+
+app = typer.Typer(
+  name="migratassert-bench-encoding",
+  help="Compare map_node_encoding against the pre-plan reference implementation",
+  add_completion=False,
+)
+
+
+def reference_map_node_encoding(
+  v440_encoding: dict[str, Any],
+  field_prefix: str = "",
+) -> MapResult:
+  """map_node_encoding as it was before the compiled plan (for comparison)."""
+  dropped: list[str] = []
+  tc3: dict[str, Any] = {}
+
+  for old_key, new_key in ENCODING_FIELD_MAP.items():
+    if old_key in v440_encoding:
+      value = v440_encoding[old_key]
+      if new_key == "method" and isinstance(value, str):
+        value = METHOD_VALUE_MAP.get(value, value)
+      tc3[new_key] = value
+
+  hyper = v440_encoding.get("mapping_hyperparameters", {})
+  for old_key, new_key in HYPERPARAMETER_FIELD_MAP.items():
+    if old_key in hyper:
+      value = hyper[old_key]
+      if new_key == "taxon" and isinstance(value, str):
+        value = extract_taxon_id(value)
+      elif new_key in ("prioritize", "avoid") and isinstance(value, list):
+        value = normalize_list_values(value)
+      tc3[new_key] = value
+
+  known_hyper_fields = set(HYPERPARAMETER_FIELD_MAP.keys()) | DROPPED_FIELDS
+  for key in hyper:
+    if key not in known_hyper_fields:
+      dropped.append(f"{field_prefix}{key}")
+    elif key in DROPPED_FIELDS:
+      dropped.append(f"{field_prefix}{key}")
+
+  if "math_module_transformations" in v440_encoding:
+    transforms = map_transformations(v440_encoding["math_module_transformations"])
+    if transforms:
+      tc3["transformations"] = transforms
+
+  return MapResult(mapped=tc3, dropped=dropped)
+
+
+def build_encodings(shape: CorpusShape, count: int) -> list[dict[str, Any]]:
+  """Build an attribute-heavy mix of node and attribute encodings."""
+  rng = random.Random(shape.seed)
+  encodings: list[dict[str, Any]] = []
+  while len(encodings) < count:
+    encodings.append(_encoding(rng, shape, "subject"))
+    encodings.extend(v for v in _attributes(rng, shape).values() if isinstance(v, dict))
+  return encodings[:count]
+
+
+@app.command()
+def main(
+  count: int = typer.Option(2000, help="Encodings per timed pass"),
+  attributes: int = typer.Option(8, help="Attributes per generated block"),
+  repeat: int = typer.Option(5, min=1, help="Timed passes (fastest is kept)"),
+) -> None:
+  """Time the compiled plan against the reference implementation."""
+  encodings = build_encodings(CorpusShape(attributes=attributes), count)
+
+  for encoding in encodings:
+    assert map_node_encoding(encoding, "x.") == reference_map_node_encoding(encoding, "x.")
+
+  def run(fn: Any) -> float:
+    timer = timeit.Timer(lambda: [fn(e, "x.") for e in encodings])
+    return min(timer.repeat(repeat=repeat, number=1)) / len(encodings)
+
+  reference = run(reference_map_node_encoding)
+  compiled = run(map_node_encoding)
+  typer.echo(f"reference: {reference * 1e6:8.2f} us/call")
+  typer.echo(f"compiled:  {compiled * 1e6:8.2f} us/call")
+  typer.echo(f"speedup:   {reference / compiled:8.2f}x")
+
+
+if __name__ == "__main__":
+  app()
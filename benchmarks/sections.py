@@ -0,0 +1,108 @@
+"""Benchmark transform_config on section-heavy configs: python -m benchmarks.sections --help."""
+
+import timeit
+from typing import Any
+
+import typer
+
+from migratassert.annotations import map_annotations
+from migratassert.provenance import map_provenance
+from migratassert.source import map_source
+from migratassert.statement import map_statement
+from migratassert.transform import TransformResult, transform_config
+
+from benchmarks.corpus import CorpusShape, generate_config
+
+app = typer.Typer(
+  name="migratassert-bench-sections",
+  help="Compare transform_config against the pre-plan reference on configs with many sections",
+  add_completion=False,
+)
+
+
+def _reference_block(
+  block: dict[str, Any],
+  file_stem: str | None,
+  dropped: list[str],
+) -> dict[str, Any]:
+  """The per-block dispatch transform_config repeated for template and sections."""
+  tc3: dict[str, Any] = {}
+  if "location" in block:
+    result = map_source(block["location"], reindexing=block.get("reindexing"), file_stem=file_stem)
+    tc3["source"] = result.mapped
+    dropped.extend(result.dropped)
+  if "triple" in block:
+    result = map_statement(block["triple"])
+    tc3["statement"] = result.mapped
+    dropped.extend(result.dropped)
+  if "provenance" in block:
+    result = map_provenance(block["provenance"])
+    tc3["provenance"] = result.mapped
+    dropped.extend(result.dropped)
+  if "attributes" in block:
+    result = map_annotations(block["attributes"])
+    tc3["annotations"] = result.mapped
+    dropped.extend(result.dropped)
+  return tc3
+
+
+def reference_transform_config(
+  v440_config: dict[str, Any],
+  file_stem: str | None = None,
+) -> TransformResult:
+  """transform_config as it was before the compiled block plan (for comparison)."""
+  dropped: list[str] = []
+  template = v440_config.get("template", {})
+  tc3_template: dict[str, Any] = {"syntax": "TC3"}
+  tc3_template.update(_reference_block(template, file_stem, dropped))
+  tc3_config: dict[str, Any] = {"template": tc3_template}
+
+  sections_source = v440_config.get("sections") or template.get("sections")
+  blocks = ["template"] * len(dropped)
+  if sections_source and sections_source != [None]:
+    tc3_sections = []
+    for index, section in enumerate(sections_source):
+      section_start = len(dropped)
+      tc3_section = _reference_block(section, None, dropped)
+      keys_requiring_transformation = {"location", "triple", "provenance", "attributes", "reindexing"}
+      for key, value in section.items():
+        if key not in keys_requiring_transformation:
+          tc3_section[key] = value
+      tc3_sections.append(tc3_section)
+      blocks.extend([f"sections[{index}]"] * (len(dropped) - section_start))
+    tc3_config["sections"] = tc3_sections
+
+  return TransformResult(config=tc3_config, dropped_fields=dropped, dropped_blocks=blocks)
+
+
+@app.command()
+def main(
+  configs: int = typer.Option(5, help="Configs per timed pass"),
+  sections: int = typer.Option(500, help="Sections per config"),
+  attributes: int = typer.Option(3, help="Attributes per template/section"),
+  repeat: int = typer.Option(5, min=1, help="Timed passes (fastest is kept)"),
+) -> None:
+  """Time the compiled block plan against the reference implementation."""
+  shape = CorpusShape(sections=sections, attributes=attributes)
+  corpus = [generate_config(shape, index) for index in range(configs)]
+  for config in corpus:
+    # Unknown section keys must still pass through in input order
+    for section in config["sections"]:
+      section["comment"] = "kept"
+
+  for config in corpus:
+    assert transform_config(config, "X") == reference_transform_config(config, "X")
+
+  def run(fn: Any) -> float:
+    timer = timeit.Timer(lambda: [fn(c, "X") for c in corpus])
+    return min(timer.repeat(repeat=repeat, number=1)) / (configs * (sections + 1))
+
+  reference = run(reference_transform_config)
+  compiled = run(transform_config)
+  typer.echo(f"reference: {reference * 1e6:8.2f} us/block")
+  typer.echo(f"compiled:  {compiled * 1e6:8.2f} us/block")
+  typer.echo(f"speedup:   {reference / compiled:8.2f}x")
+
+
+if __name__ == "__main__":
+  app()
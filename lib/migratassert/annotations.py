@@ -2,6 +2,7 @@
 
 from typing import Any
 
+from migratassert.cache import BLOCK_CACHE
 from migratassert.encoding import MapResult, map_node_encoding
 
 
@@ -32,11 +33,25 @@ def normalize_annotation_name(name: str) -> str:
   return name.replace("_", " ")
 
 
+def _map_annotation(
+  annotation_name: str,
+  attr_value: dict[str, Any],
+  field_prefix: str,
+) -> tuple[dict[str, Any], list[str], list[str]]:
+  """Map one encoding-style attribute to an annotation object."""
+  enc_result = map_node_encoding(attr_value, field_prefix=field_prefix)
+  # Build annotation object with 'annotation' key first
+  annotation_obj: dict[str, Any] = {"annotation": annotation_name}
+  annotation_obj.update(enc_result.mapped)
+  return (annotation_obj, enc_result.dropped, enc_result.warnings)
+
+
 def map_annotations(attributes: dict[str, Any]) -> MapResult:
   """Map v4.4.0 attributes to TC3 annotations.
 
   TC3 expects annotations as a list of objects, each with an
-  'annotation' key for the name.
+  'annotation' key for the name. Per-attribute results are memoized in
+  BLOCK_CACHE when it is enabled.
 
   Args:
     attributes: Source attributes dict (keys are attribute names,
@@ -46,21 +61,23 @@ def map_annotations(attributes: dict[str, Any]) -> MapResult:
     MapResult with TC3 annotations list
   """
   dropped: list[str] = []
+  warnings: list[str] = []
   annotations: list[dict[str, Any]] = []
 
   for attr_name, attr_value in attributes.items():
     annotation_name = normalize_annotation_name(attr_name)
 
     if isinstance(attr_value, dict):
-      enc_result = map_node_encoding(
+      field_prefix = f"attributes.{attr_name}."
+      annotation_obj, attr_dropped, attr_warnings = BLOCK_CACHE.lookup(
+        "annotation",
         attr_value,
-        field_prefix=f"attributes.{attr_name}.",
+        field_prefix,
+        lambda: _map_annotation(annotation_name, attr_value, field_prefix),
       )
-      # Build annotation object with 'annotation' key first
-      annotation_obj: dict[str, Any] = {"annotation": annotation_name}
-      annotation_obj.update(enc_result.mapped)
       annotations.append(annotation_obj)
-      dropped.extend(enc_result.dropped)
+      dropped.extend(attr_dropped)
+      warnings.extend(attr_warnings)
     else:
       # Plain value (like notes string) becomes method: value
       annotations.append({
@@ -69,4 +86,4 @@ def map_annotations(attributes: dict[str, Any]) -> MapResult:
         "encoding": attr_value,
       })
 
-  return MapResult(mapped=annotations, dropped=dropped)
+  return MapResult(mapped=annotations, dropped=dropped, warnings=warnings)
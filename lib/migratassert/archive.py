@@ -0,0 +1,227 @@
+"""Read v4.4.0 configs from and write TC3 configs to tar/zip archives.
+
+tarfile and zipfile are imported only when an archive is actually
+opened, so is_archive checks on ordinary directories stay cheap.
+"""
+
+import io
+import os
+import tempfile
+import time
+from collections.abc import Iterator, Sequence
+from fnmatch import fnmatch
+from pathlib import Path, PurePosixPath
+from typing import IO
+
+from migratassert.migrate import YAML_SUFFIXES
+from migratassert.writer import DEFAULT_FILE_MODE, fsync_file
+
+# Suffixes recognized as archives, for both input and output
+ARCHIVE_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".zip")
+
+# Earliest timestamp a zip member can carry (MS-DOS date/time)
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+def is_archive(path: Path) -> bool:
+  """Check whether a path names a supported archive by its suffix.
+
+  Args:
+    path: Input or output path (need not exist)
+
+  Returns:
+    True for .tar, .tar.gz, .tgz and .zip paths
+  """
+  return path.name.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def _member_path(name: str) -> str | None:
+  """Normalize a member name, rejecting ones that could escape the output."""
+  path = PurePosixPath(name)
+  if path.is_absolute() or ".." in path.parts:
+    return None
+  relative = path.as_posix()
+  return None if relative == "." else relative
+
+
+def member_selected(
+  name: str,
+  recursive: bool = False,
+  include: Sequence[str] = (),
+  exclude: Sequence[str] = (),
+) -> bool:
+  """Apply directory discovery rules to an archive member name.
+
+  Matches iter_yaml_files: without recursive only top-level members are
+  taken, exclude patterns apply to the member and each parent
+  directory, and include patterns apply to the member itself.
+
+  Args:
+    name: Normalized member path
+    recursive: If True, accept members in subdirectories
+    include: fnmatch patterns a member must match (if any are given)
+    exclude: fnmatch patterns for members and directories to skip
+
+  Returns:
+    True if the member should be migrated
+  """
+  parts = name.split("/")
+  if len(parts) > 1 and not recursive:
+    return False
+  if not parts[-1].endswith(YAML_SUFFIXES):
+    return False
+  for depth in range(1, len(parts) + 1):
+    prefix = "/".join(parts[:depth])
+    if any(fnmatch(prefix, pattern) for pattern in exclude):
+      return False
+  return not include or any(fnmatch(name, pattern) for pattern in include)
+
+
+def iter_archive_members(
+  archive: Path,
+  recursive: bool = False,
+  include: Sequence[str] = (),
+  exclude: Sequence[str] = (),
+) -> Iterator[tuple[Path, bytes]]:
+  """Stream selected YAML members out of an archive without extracting.
+
+  Tar archives (optionally compressed) are read as a stream, one member
+  at a time; zips are read through their central directory. Members are
+  yielded in archive order.
+
+  Args:
+    archive: .tar, .tar.gz, .tgz or .zip file
+    recursive: If True, include members in subdirectories
+    include: fnmatch patterns (member paths); if given, a member must
+      match at least one
+    exclude: fnmatch patterns for members and directories to skip
+
+  Yields:
+    Tuples of (archive / member_path, member bytes)
+  """
+  if archive.name.lower().endswith(".zip"):
+    import zipfile
+
+    with zipfile.ZipFile(archive) as zf:
+      for info in zf.infolist():
+        name = _member_path(info.filename)
+        if info.is_dir() or name is None:
+          continue
+        if member_selected(name, recursive, include, exclude):
+          yield (archive / name, zf.read(info))
+    return
+
+  import tarfile
+
+  with tarfile.open(archive, "r|*") as tar:
+    for member in tar:
+      name = _member_path(member.name)
+      if not member.isfile() or name is None:
+        continue
+      if member_selected(name, recursive, include, exclude):
+        stream = tar.extractfile(member)
+        if stream is not None:
+          yield (archive / name, stream.read())
+
+
+class ArchiveWriter:
+  """Collect migrated files into a .tar, .tar.gz, .tgz or .zip archive.
+
+  The archive is built in a temp file beside the destination and only
+  renamed into place by close(), so an interrupted run never leaves a
+  truncated archive behind.
+  """
+
+  def __init__(self, path: Path, fsync: bool = False, mtime: float | None = None) -> None:
+    import gzip
+    import tarfile
+    import zipfile
+
+    self.path = path
+    self._fsync = fsync
+    # Member (and gzip header) timestamps; pinned so reruns are identical
+    self._mtime = time.time() if mtime is None else mtime
+    # Zip stores naive dates: use UTC so time zones don't change the bytes
+    self._zip_date_time = max(time.gmtime(self._mtime)[:6], ZIP_EPOCH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    self._tmp_path = Path(tmp_name)
+    self._file: IO[bytes] = os.fdopen(fd, "wb")
+
+    lower = path.name.lower()
+    self._zip: zipfile.ZipFile | None = None
+    self._tar: tarfile.TarFile | None = None
+    self._gzip: gzip.GzipFile | None = None
+    if lower.endswith(".zip"):
+      self._zip = zipfile.ZipFile(self._file, "w", compression=zipfile.ZIP_DEFLATED)
+    elif lower.endswith((".tar.gz", ".tgz")):
+      # tarfile's "w:gz" stamps the gzip header with the current time
+      self._gzip = gzip.GzipFile(filename="", mode="wb", fileobj=self._file, mtime=int(self._mtime))
+      self._tar = tarfile.open(fileobj=self._gzip, mode="w")
+    else:
+      self._tar = tarfile.open(fileobj=self._file, mode="w")
+
+  def add(self, name: str, data: bytes) -> None:
+    """Add one file to the archive.
+
+    Args:
+      name: Member path (posix, relative)
+      data: File contents
+    """
+    import tarfile
+    import zipfile
+
+    if self._zip is not None:
+      zip_info = zipfile.ZipInfo(name, date_time=self._zip_date_time)
+      zip_info.compress_type = zipfile.ZIP_DEFLATED
+      zip_info.external_attr = 0o644 << 16
+      self._zip.writestr(zip_info, data)
+    else:
+      info = tarfile.TarInfo(name)
+      info.size = len(data)
+      info.mtime = int(self._mtime)
+      info.mode = 0o644
+      self._tar.addfile(info, io.BytesIO(data))
+
+  def close(self) -> None:
+    """Finish the archive and move it into place."""
+    try:
+      self._finish()
+      if self._fsync:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+      self._file.close()
+      os.chmod(self._tmp_path, DEFAULT_FILE_MODE)
+      os.replace(self._tmp_path, self.path)
+    except BaseException:
+      self.abort()
+      raise
+    if self._fsync:
+      fsync_file(self.path.parent)
+
+  def abort(self) -> None:
+    """Discard the partially written archive."""
+    try:
+      self._finish()
+    except Exception:
+      pass
+    self._file.close()
+    self._tmp_path.unlink(missing_ok=True)
+
+  def _finish(self) -> None:
+    if self._zip is not None:
+      self._zip.close()
+    elif self._tar is not None:
+      self._tar.close()
+      if self._gzip is not None:
+        self._gzip.close()
+
+  def __enter__(self) -> "ArchiveWriter":
+    return self
+
+  def __exit__(self, exc_type: object, *exc_info: object) -> None:
+    if exc_type is None:
+      self.close()
+    else:
+      self.abort()
+
@@ -0,0 +1,129 @@
+"""Content-keyed LRU cache for mapped encoding and annotation sub-blocks."""
+
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+_PLAIN_SCALARS = (str, int, float, bool, type(None))
+
+
+def canonical_key(value: Any) -> Any:
+  """Build a hashable, order-preserving key for a parsed YAML block.
+
+  Scalars are keyed by exact type as well as value, so 1, 1.0 and True
+  stay distinct. ruamel scalar subclasses also carry their formatting
+  state (e.g. ScalarFloat width), which affects the dumped output.
+
+  Args:
+    value: Parsed block (dicts, lists and scalars)
+
+  Returns:
+    Nested tuple usable as a dict key
+
+  Raises:
+    TypeError: If the block contains an unhashable scalar
+  """
+  if isinstance(value, dict):
+    return ("map", tuple((canonical_key(k), canonical_key(v)) for k, v in value.items()))
+  if isinstance(value, list):
+    return ("seq", tuple(canonical_key(v) for v in value))
+  value_type = type(value)
+  if value_type in _PLAIN_SCALARS:
+    return (value_type, value)
+  state = getattr(value, "__dict__", None)
+  return (value_type, value, tuple(sorted(state.items())) if state else ())
+
+
+def copy_tree(value: T) -> T:
+  """Copy the dict/list/tuple structure of a tree, sharing scalars.
+
+  Args:
+    value: Tree to copy
+
+  Returns:
+    Structurally independent copy
+  """
+  if isinstance(value, dict):
+    return {k: copy_tree(v) for k, v in value.items()}  # type: ignore[return-value]
+  if isinstance(value, list):
+    return [copy_tree(v) for v in value]  # type: ignore[return-value]
+  if isinstance(value, tuple):
+    return tuple(copy_tree(v) for v in value)  # type: ignore[return-value]
+  return value
+
+
+class BlockCache:
+  """Size-bounded LRU cache of mapped sub-blocks.
+
+  Entries are keyed on the canonical form of the input block plus a
+  namespace and field prefix. Stored values are private copies and every
+  hit returns a fresh copy, so callers may mutate what they get back.
+  A maxsize of 0 disables caching. Not thread-safe; each process (and
+  each pipeline conversion thread) uses it from a single thread.
+  """
+
+  def __init__(self, maxsize: int = 0) -> None:
+    self.maxsize = maxsize
+    self.hits = 0
+    self.misses = 0
+    self._entries: OrderedDict[Any, Any] = OrderedDict()
+
+  def lookup(
+    self,
+    namespace: str,
+    block: Any,
+    field_prefix: str,
+    compute: Callable[[], T],
+  ) -> T:
+    """Return the cached value for a block, computing it on a miss.
+
+    Args:
+      namespace: Which mapper produced the value (e.g. "encoding")
+      block: Input block the value is derived from
+      field_prefix: Prefix baked into dropped field names
+      compute: Produces the value on a miss
+
+    Returns:
+      Value owned by the caller
+    """
+    if self.maxsize <= 0:
+      return compute()
+    try:
+      key = (namespace, field_prefix, canonical_key(block))
+      cached = self._entries.get(key)
+    except TypeError:
+      return compute()
+
+    if cached is not None:
+      self.hits += 1
+      self._entries.move_to_end(key)
+      return copy_tree(cached)
+
+    self.misses += 1
+    value = compute()
+    self._entries[key] = copy_tree(value)
+    if len(self._entries) > self.maxsize:
+      self._entries.popitem(last=False)
+    return value
+
+  def clear(self) -> None:
+    """Drop all entries and reset counters."""
+    self._entries.clear()
+    self.hits = 0
+    self.misses = 0
+
+
+# Process-wide cache used by the mappers; disabled until configured
+BLOCK_CACHE = BlockCache()
+
+
+def configure_block_cache(maxsize: int) -> None:
+  """Resize the process-wide cache, dropping existing entries.
+
+  Args:
+    maxsize: Maximum number of entries (0 disables caching)
+  """
+  BLOCK_CACHE.clear()
+  BLOCK_CACHE.maxsize = maxsize
@@ -1,27 +1,55 @@
-"""Typer CLI entry point for migratassert."""
+"""Typer CLI entry point for migratassert.
 
+Only typer is imported up front; the migration stack (ruamel.yaml and
+friends) loads inside the command, so --help and option errors stay fast.
+"""
+
+from enum import Enum
 from pathlib import Path
 
 import typer
+from typer.core import TyperGroup
+
+
+class _MigrateByDefault(TyperGroup):
+  """Command group that runs `migrate` when no subcommand is named.
+
+  Keeps `migratassert-cli -i IN -o OUT` working alongside subcommands
+  such as `migratassert-cli query`.
+  """
+
+  def parse_args(self, ctx: typer.Context, args: list[str]) -> list[str]:
+    if args and args[0] not in self.commands and args[0] not in ctx.help_option_names:
+      args = ["migrate", *args]
+    return super().parse_args(ctx, args)
 
-from migratassert.migrate import run_migration
-from migratassert.report import print_report
 
 app = typer.Typer(
   name="migratassert-cli",
   help="Migrate Tablassert YAML configs from v4.4.0 to TC3 schema",
+  cls=_MigrateByDefault,
   add_completion=False,
+  # Plain help output; rich rendering roughly doubles --help start-up time
+  rich_markup_mode=None,
 )
 
+
+class YamlEngine(str, Enum):
+  """YAML load/dump engines selectable from the CLI."""
+
+  fast = "fast"
+  roundtrip = "roundtrip"
+
+
 @app.command()
 def migrate(
   indir: Path = typer.Option(
     ...,
     "-i",
     "--indir",
-    help="Directory containing v4.4.0 YAML files",
+    help="Directory (or .tar/.tar.gz/.tgz/.zip archive) containing v4.4.0 YAML files",
     exists=True,
-    file_okay=False,
+    file_okay=True,
     dir_okay=True,
     readable=True,
   ),
@@ -29,7 +57,7 @@ def migrate(
     ...,
     "-o",
     "--outdir",
-    help="Directory for migrated TC3 YAML files",
+    help="Directory (or .tar/.tar.gz/.tgz/.zip archive to create) for migrated TC3 YAML files",
   ),
   dry_run: bool = typer.Option(
     False,
@@ -37,32 +65,328 @@ def migrate(
     "-n",
     help="Show what would be migrated without writing files",
   ),
+  plan: bool = typer.Option(
+    False,
+    "--plan",
+    help="Capacity plan: parse and transform with the fast engine, then report estimated output size "
+    "and per-phase timings (writes nothing)",
+  ),
   verbose: bool = typer.Option(
     False,
     "--verbose",
     "-v",
     help="Show detailed migration info per file",
   ),
+  jobs: int = typer.Option(
+    1,
+    "--jobs",
+    "-j",
+    help="Number of worker processes to migrate files in parallel",
+    min=1,
+  ),
+  incremental: bool = typer.Option(
+    False,
+    "--incremental",
+    help="Skip sources unchanged since the last run (uses a manifest in --outdir)",
+  ),
+  events: Path | None = typer.Option(
+    None,
+    "--events",
+    help="Write one JSON event per migrated file to this JSON-lines file",
+    dir_okay=False,
+  ),
+  progress: bool = typer.Option(
+    False,
+    "--progress",
+    help="Show a running file count on stderr",
+  ),
+  stream: bool = typer.Option(
+    False,
+    "--stream",
+    help="Keep only aggregate counts in memory (per-file details go to --events)",
+  ),
+  yaml_engine: YamlEngine = typer.Option(
+    YamlEngine.roundtrip,
+    "--yaml-engine",
+    help=(
+      "YAML engine: 'roundtrip' (ruamel round-trip, keeps scalar spellings) or 'fast' "
+      "(C-backed safe loader; rewrites scalars such as 1e-5 -> 1e-05, 0.10 -> 0.1, 007 -> 7, "
+      "and block scalars as quoted strings)"
+    ),
+  ),
+  timings: bool = typer.Option(
+    False,
+    "--timings",
+    help="Show per-phase p50/p95/max timings and the slowest files",
+  ),
+  profile: Path | None = typer.Option(
+    None,
+    "--profile",
+    help="Write a cProfile/pstats dump of the run to this file (main process only)",
+    dir_okay=False,
+  ),
+  recursive: bool = typer.Option(
+    False,
+    "--recursive",
+    "-r",
+    help="Migrate subdirectories too, mirroring the tree under --outdir",
+  ),
+  include: list[str] = typer.Option(
+    [],
+    "--include",
+    help="Only migrate files whose path relative to --indir matches this glob (repeatable)",
+  ),
+  exclude: list[str] = typer.Option(
+    [],
+    "--exclude",
+    help="Skip files and directories whose path relative to --indir matches this glob (repeatable)",
+  ),
+  ordered: bool = typer.Option(
+    True,
+    "--ordered/--unordered",
+    help="Process files in name order (reproducible) or in filesystem order (streams fastest)",
+  ),
+  async_io: bool = typer.Option(
+    False,
+    "--async-io",
+    help="Overlap reads, conversions and writes in an asyncio pipeline (for network filesystems)",
+  ),
+  read_ahead: int = typer.Option(
+    16,
+    "--read-ahead",
+    help="With --async-io: number of source files prefetched ahead of conversion",
+    min=1,
+  ),
+  write_concurrency: int = typer.Option(
+    4,
+    "--write-concurrency",
+    help="With --async-io: number of concurrent output writers",
+    min=1,
+  ),
+  fsync_batch: int = typer.Option(
+    0,
+    "--fsync-batch",
+    help="With --async-io: fsync outputs and their directories every N files (0 disables)",
+    min=0,
+  ),
+  cache_size: int = typer.Option(
+    0,
+    "--cache-size",
+    help="Memoize up to N mapped encoding/annotation blocks per process (0 disables)",
+    min=0,
+  ),
+  multi_document: bool = typer.Option(
+    False,
+    "--multi-document",
+    help="Treat each input as a '---'-separated stream of configs and write a matching TC3 stream",
+  ),
+  fsync: bool = typer.Option(
+    False,
+    "--fsync",
+    help="Flush each output before renaming it into place and sync output directories once at the end",
+  ),
+  dropped_index: bool = typer.Option(
+    False,
+    "--dropped-index",
+    help="Record every dropped field in a SQLite index next to the output (see the query command)",
+  ),
+  publication_index: bool = typer.Option(
+    False,
+    "--publication-index",
+    help="Write a JSON index of each cited publication and the output files migrated from it",
+  ),
+  check_regex: bool = typer.Option(
+    False,
+    "--check-regex",
+    help="Compile every regular_expressions pattern once and flag invalid or backtracking-prone ones",
+  ),
+  validate: bool = typer.Option(
+    True,
+    "--validate/--no-validate",
+    help="Check every migrated config against the TC3 schema rules",
+  ),
+  taxon_snapshot: Path | None = typer.Option(
+    None,
+    "--taxon-snapshot",
+    help="NCBITaxon name -> ID snapshot (see the taxon-snapshot command) for organism names",
+    exists=True,
+    dir_okay=False,
+  ),
+  source_date_epoch: int | None = typer.Option(
+    None,
+    "--source-date-epoch",
+    help="Date contributors without config_curator_date (and archive members) at this Unix time "
+    "instead of now; defaults to $SOURCE_DATE_EPOCH when set",
+  ),
+  section_workers: int = typer.Option(
+    0,
+    "--section-workers",
+    help="Split the sections of very large configs across N extra processes per converter (0 disables)",
+    min=0,
+  ),
+  section_threshold: int = typer.Option(
+    1000,
+    "--section-threshold",
+    help="With --section-workers: sections a config needs before it is split",
+    min=1,
+  ),
 ) -> None:
   """Migrate Tablassert YAML configs from v4.4.0 to TC3 schema."""
-  if dry_run:
+  import cProfile
+
+  from migratassert.archive import is_archive
+  from migratassert.clock import capture_clock
+  from migratassert.dropped_index import default_index_path
+  from migratassert.migrate import run_migration
+  from migratassert.publication_index import default_publication_index_path
+  from migratassert.report import print_report
+  from migratassert.sinks import JsonlSink, ProgressSink, fan_out
+
+  if indir.is_file() and not is_archive(indir):
+    raise typer.BadParameter("must be a directory or a .tar/.tar.gz/.tgz/.zip archive", param_hint="--indir")
+
+  try:
+    # One snapshot for the whole run, shared with every worker
+    clock = capture_clock(source_date_epoch)
+  except ValueError as e:
+    raise typer.BadParameter(str(e), param_hint="--source-date-epoch") from None
+
+  if plan:
+    # Plain trees from the C-backed loader; nothing is dumped or written
+    dry_run = True
+    yaml_engine = YamlEngine.fast
+    timings = True
+    typer.echo(f"PLAN: Estimating migration of {indir} to {outdir}\n")
+  elif dry_run:
     typer.echo(
       f"DRY RUN: Would migrate files from {indir} to {outdir}\n"
     )
-  else:
+  elif not is_archive(outdir):
     outdir.mkdir(parents=True, exist_ok=True)
 
-  result = run_migration(
-    indir,
-    outdir,
-    dry_run=dry_run,
-  )
+  events_sink = JsonlSink(events) if events is not None else None
+  progress_sink = ProgressSink() if progress else None
+  profiler = cProfile.Profile() if profile is not None else None
+
+  try:
+    if profiler is not None:
+      profiler.enable()
+    result = run_migration(
+      indir,
+      outdir,
+      dry_run=dry_run,
+      jobs=jobs,
+      incremental=incremental,
+      sink=fan_out(events_sink, progress_sink),
+      keep_file_results=not stream,
+      yaml_engine=yaml_engine.value,
+      recursive=recursive,
+      include=include,
+      exclude=exclude,
+      ordered=ordered,
+      async_io=async_io,
+      read_ahead=read_ahead,
+      write_concurrency=write_concurrency,
+      fsync_batch=fsync_batch,
+      cache_size=cache_size,
+      fsync=fsync,
+      multi_document=multi_document,
+      dropped_index=default_index_path(outdir) if dropped_index else None,
+      section_workers=section_workers,
+      section_threshold=section_threshold,
+      check_regex=check_regex,
+      validate=validate,
+      taxon_snapshot=taxon_snapshot,
+      publication_index=default_publication_index_path(outdir) if publication_index else None,
+      clock=clock,
+    )
+  finally:
+    if profiler is not None:
+      profiler.disable()
+      profiler.dump_stats(profile)
+    if progress_sink is not None:
+      progress_sink.close()
+    if events_sink is not None:
+      events_sink.close()
 
-  print_report(result, verbose=verbose)
+  print_report(result, verbose=verbose, timings=timings)
 
   if result.files_failed > 0:
     raise typer.Exit(code=1)
 
 
+@app.command()
+def query(
+  field: str | None = typer.Argument(
+    None,
+    help="Dropped field path, or a glob such as 'triple.*'; omit to summarize every field",
+  ),
+  outdir: Path | None = typer.Option(
+    None,
+    "-o",
+    "--outdir",
+    help="Output directory (or archive) of a run made with --dropped-index",
+  ),
+  index: Path | None = typer.Option(
+    None,
+    "--index",
+    help="Index file to read instead of the one next to --outdir",
+    dir_okay=False,
+  ),
+  summary: bool = typer.Option(
+    False,
+    "--summary",
+    help="With FIELD: print per-field counts instead of every file that dropped it",
+  ),
+) -> None:
+  """Show which files and sections dropped a field, from a --dropped-index run."""
+  from migratassert.dropped_index import default_index_path, field_counts, field_locations
+
+  if index is None:
+    if outdir is None:
+      raise typer.BadParameter("pass --outdir or --index", param_hint="--index")
+    index = default_index_path(outdir)
+  if not index.is_file():
+    raise typer.BadParameter(f"no dropped-field index at {index}", param_hint="--index")
+
+  if field is None or summary:
+    counts = field_counts(index, field)
+    for name, occurrences, files in counts:
+      typer.echo(f"{occurrences:>7}  {files:>7} files  {name}")
+    if not counts:
+      raise typer.Exit(code=1)
+    return
+
+  locations = field_locations(index, field)
+  for name, source, document, block in locations:
+    where = f"{source}#{document}" if document else source
+    typer.echo(f"{where}  {block or '-'}  {name}")
+  if not locations:
+    raise typer.Exit(code=1)
+
+
+@app.command("taxon-snapshot")
+def taxon_snapshot(
+  names: Path = typer.Argument(
+    ...,
+    help="NCBI taxdump names.dmp",
+    exists=True,
+    dir_okay=False,
+  ),
+  output: Path = typer.Option(
+    ...,
+    "-o",
+    "--output",
+    help="Snapshot file to write (for migrate --taxon-snapshot)",
+    dir_okay=False,
+  ),
+) -> None:
+  """Build a sorted organism name -> NCBITaxon ID snapshot from names.dmp."""
+  from migratassert.taxon import read_names_dmp, write_taxon_snapshot
+
+  count = write_taxon_snapshot(read_names_dmp(names), output)
+  typer.echo(f"Wrote {count} names to {output}")
+
+
 if __name__ == "__main__":
   app()
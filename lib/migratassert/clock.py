@@ -0,0 +1,93 @@
+"""Run-wide clock snapshot for dates written into migrated configs.
+
+TC3 requires a date on every contributor, and v4.4.0 configs often
+have none. Reading the wall clock per contributor makes identical
+inputs migrate differently from run to run (and across midnight within
+one run), which defeats skip-if-identical writes and cached outputs.
+RUN_CLOCK instead holds one snapshot per run. run_migration captures it
+and hands it to every worker process.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+# Environment variable pinning the clock (https://reproducible-builds.org/specs/source-date-epoch/)
+SOURCE_DATE_EPOCH = "SOURCE_DATE_EPOCH"
+
+# strftime format of contributor dates, upper-cased (e.g. "09 JAN 2025")
+CONTRIBUTOR_DATE_FORMAT = "%d %b %Y"
+
+
+@dataclass(frozen=True)
+class ClockSnapshot:
+  """One instant, and the contributor date it formats to.
+
+  pinned is True when the epoch was given rather than read from the
+  system clock, i.e. when reruns produce the same dates.
+  """
+
+  epoch: float
+  contributor_date: str
+  pinned: bool = False
+
+
+def capture_clock(epoch: int | None = None) -> ClockSnapshot:
+  """Snapshot the clock once for a run.
+
+  A pinned epoch (the argument, else SOURCE_DATE_EPOCH) is formatted in
+  UTC so the date does not depend on the machine's time zone. The
+  current time is formatted in local time, as contributor dates always
+  have been.
+
+  Args:
+    epoch: Seconds since the Unix epoch to use instead of the current time
+
+  Returns:
+    ClockSnapshot for the run
+
+  Raises:
+    ValueError: If SOURCE_DATE_EPOCH is set but is not an integer
+  """
+  if epoch is None and os.environ.get(SOURCE_DATE_EPOCH, "").strip():
+    try:
+      epoch = int(os.environ[SOURCE_DATE_EPOCH])
+    except ValueError:
+      raise ValueError(f"{SOURCE_DATE_EPOCH} must be an integer, got {os.environ[SOURCE_DATE_EPOCH]!r}") from None
+  if epoch is None:
+    now = time.time()
+    moment = datetime.fromtimestamp(now)
+  else:
+    now = float(epoch)
+    moment = datetime.fromtimestamp(now, tz=timezone.utc)
+  return ClockSnapshot(now, moment.strftime(CONTRIBUTOR_DATE_FORMAT).upper(), pinned=epoch is not None)
+
+
+class RunClock:
+  """Process-wide clock snapshot; captured on first use unless configured."""
+
+  def __init__(self) -> None:
+    self.snapshot: ClockSnapshot | None = None
+
+  def current(self) -> ClockSnapshot:
+    """Return the configured snapshot, capturing one if there is none."""
+    if self.snapshot is None:
+      self.snapshot = capture_clock()
+    return self.snapshot
+
+  def contributor_date(self) -> str:
+    """Return the run's contributor date, e.g. "09 JAN 2025"."""
+    return self.current().contributor_date
+
+
+RUN_CLOCK = RunClock()
+
+
+def configure_run_clock(snapshot: ClockSnapshot | None) -> None:
+  """Install the run's clock snapshot in this process.
+
+  Args:
+    snapshot: From capture_clock, or None to capture on next use
+  """
+  RUN_CLOCK.snapshot = snapshot
@@ -0,0 +1,195 @@
+"""Persistent SQLite index of dropped fields across migrated files."""
+
+import sqlite3
+from pathlib import Path
+
+from migratassert.migrate import FileResult
+
+# Index filename written into the output directory
+INDEX_NAME = ".migratassert-dropped.sqlite"
+
+# Bumped when the table layout changes; older indexes are rebuilt
+INDEX_FORMAT = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+  key TEXT PRIMARY KEY,
+  value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+  id INTEGER PRIMARY KEY,
+  source TEXT NOT NULL,
+  document TEXT NOT NULL,
+  dest TEXT NOT NULL,
+  run INTEGER NOT NULL,
+  UNIQUE (source, document)
+);
+CREATE TABLE IF NOT EXISTS dropped (
+  field TEXT NOT NULL,
+  file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE,
+  block TEXT
+);
+CREATE INDEX IF NOT EXISTS dropped_by_field ON dropped (field);
+CREATE INDEX IF NOT EXISTS dropped_by_file ON dropped (file_id);
+"""
+
+
+def default_index_path(outdir: Path) -> Path:
+  """Return where a run writes its index for a given output location.
+
+  Args:
+    outdir: Output directory, or output archive path
+
+  Returns:
+    INDEX_NAME inside a directory, or "<archive>.dropped.sqlite" beside
+    an archive
+  """
+  from migratassert.archive import is_archive
+
+  if is_archive(outdir):
+    return outdir.with_name(f"{outdir.name}.dropped.sqlite")
+  return outdir / INDEX_NAME
+
+
+def _document_key(file_result: FileResult) -> str:
+  """Identify a document within its source ("" for single-document files)."""
+  if file_result.document_id is not None:
+    return file_result.document_id
+  if file_result.document_index is not None:
+    return str(file_result.document_index + 1)
+  return ""
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+  conn = sqlite3.connect(path)
+  conn.execute("PRAGMA foreign_keys = ON")
+  return conn
+
+
+class DroppedFieldIndex:
+  """Write dropped fields to SQLite as results arrive.
+
+  Rows are written per file and committed in batches, so a run holds no
+  per-file state in memory. Every file a run sees is stamped with the
+  run number; close() then deletes files from earlier runs that this
+  run did not see, e.g. sources that were removed. Incrementally skipped
+  files keep their rows from the run that migrated them. Use one index
+  per output location: a run prunes everything it did not migrate.
+  """
+
+  def __init__(self, path: Path, commit_every: int = 500) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    self._conn = _connect(path)
+    self._commit_every = commit_every
+    self._pending = 0
+
+    self._conn.executescript(_SCHEMA)
+    meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+    if meta and int(meta.get("format", 0)) != INDEX_FORMAT:
+      self._conn.executescript("DELETE FROM dropped; DELETE FROM files; DELETE FROM meta;")
+      meta = {}
+    self._run = int(meta.get("run", 0)) + 1
+    self._conn.executemany(
+      "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+      [("format", str(INDEX_FORMAT)), ("run", str(self._run))],
+    )
+
+  def add(self, file_result: FileResult, source: str, dest: str) -> None:
+    """Record one file's (or document's) dropped fields.
+
+    Args:
+      file_result: Result of migrating one file or document
+      source: Source path relative to the input root
+      dest: Output path relative to the output root
+    """
+    if file_result.skipped:
+      # Keep the rows (every document of a stream) from the run that
+      # migrated this unchanged source
+      updated = self._conn.execute(
+        "UPDATE files SET run = ? WHERE source = ?",
+        (self._run, source),
+      )
+      if updated.rowcount:
+        self._tick()
+        return
+
+    document = _document_key(file_result)
+
+    (file_id,) = self._conn.execute(
+      "INSERT INTO files (source, document, dest, run) VALUES (?, ?, ?, ?) "
+      "ON CONFLICT (source, document) DO UPDATE SET dest = excluded.dest, run = excluded.run "
+      "RETURNING id",
+      (source, document, dest, self._run),
+    ).fetchone()
+    self._conn.execute("DELETE FROM dropped WHERE file_id = ?", (file_id,))
+
+    # Skipped files restored from the manifest have no block attribution
+    blocks = file_result.dropped_blocks or [None] * len(file_result.dropped_fields)
+    self._conn.executemany(
+      "INSERT INTO dropped (field, file_id, block) VALUES (?, ?, ?)",
+      [(name, file_id, block) for name, block in zip(file_result.dropped_fields, blocks)],
+    )
+    self._tick()
+
+  def _tick(self) -> None:
+    self._pending += 1
+    if self._pending >= self._commit_every:
+      self._conn.commit()
+      self._pending = 0
+
+  def close(self, prune: bool = True) -> None:
+    """Commit and close the index.
+
+    Args:
+      prune: If True, delete files this run did not see (pass False
+        when the run was interrupted)
+    """
+    if prune:
+      self._conn.execute("DELETE FROM files WHERE run < ?", (self._run,))
+    self._conn.commit()
+    self._conn.close()
+
+
+def field_counts(path: Path, pattern: str | None = None) -> list[tuple[str, int, int]]:
+  """Summarize an index by dropped field.
+
+  Args:
+    path: Index file
+    pattern: Optional SQLite GLOB pattern (e.g. "triple.*") to filter fields
+
+  Returns:
+    (field, occurrences, distinct files) tuples, most frequent first
+  """
+  conn = _connect(path)
+  try:
+    return conn.execute(
+      "SELECT field, COUNT(*), COUNT(DISTINCT file_id) FROM dropped "
+      "WHERE ? IS NULL OR field GLOB ? "
+      "GROUP BY field ORDER BY COUNT(*) DESC, field",
+      (pattern, pattern),
+    ).fetchall()
+  finally:
+    conn.close()
+
+
+def field_locations(path: Path, pattern: str) -> list[tuple[str, str, str, str | None]]:
+  """List every place a dropped field (or GLOB pattern) occurred.
+
+  Args:
+    path: Index file
+    pattern: Exact field path or SQLite GLOB pattern
+
+  Returns:
+    (field, source, document, block) tuples ordered by source
+  """
+  conn = _connect(path)
+  try:
+    return conn.execute(
+      "SELECT dropped.field, files.source, files.document, dropped.block "
+      "FROM dropped JOIN files ON files.id = dropped.file_id "
+      "WHERE dropped.field GLOB ? "
+      "ORDER BY files.source, files.document, dropped.block, dropped.field",
+      (pattern,),
+    ).fetchall()
+  finally:
+    conn.close()
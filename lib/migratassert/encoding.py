@@ -1,8 +1,13 @@
 """NodeEncoding transformation (shared by statement and annotations)."""
 
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from typing import Any
 
+from migratassert.cache import BLOCK_CACHE
+# extract_taxon_id lives in taxon; re-exported for existing callers
+from migratassert.taxon import TAXON_TABLE, extract_taxon_id
+
 
 @dataclass
 class MapResult:
@@ -10,21 +15,7 @@ class MapResult:
 
   mapped: dict[str, Any]
   dropped: list[str] = field(default_factory=list)
-
-
-def extract_taxon_id(curie: str) -> int:
-  """Extract integer taxon ID from CURIE like 'NCBITaxon:9606'.
-
-  Args:
-    curie: CURIE string (e.g., 'NCBITaxon:9606') or plain integer string
-
-  Returns:
-    Integer taxon ID
-  """
-  if ":" in curie:
-    _, taxon_str = curie.rsplit(":", 1)
-    return int(taxon_str)
-  return int(curie)
+  warnings: list[str] = field(default_factory=list)
 
 
 def map_transformations(
@@ -111,52 +102,166 @@ HYPERPARAMETER_FIELD_MAP = {
 DROPPED_FIELDS = set()
 
 
+def _convert_taxon(value: Any) -> Any:
+  """Convert taxon CURIE strings (or, with a snapshot, names) to integer IDs."""
+  if isinstance(value, str):
+    return TAXON_TABLE.resolve(value)
+  return value
+
+
+def _convert_class_list(value: Any) -> Any:
+  """Strip biolink: prefix from prioritize and avoid lists."""
+  if isinstance(value, list):
+    return normalize_list_values(value)
+  return value
+
+
+def _convert_method(value: Any) -> Any:
+  """Normalize method values (column_of_values -> column)."""
+  if isinstance(value, str):
+    return METHOD_VALUE_MAP.get(value, value)
+  return value
+
+
+# Value converters keyed by TC3 field name; unlisted fields copy as-is
+FIELD_CONVERTERS: dict[str, Callable[[Any], Any]] = {
+  "method": _convert_method,
+  "taxon": _convert_taxon,
+  "prioritize": _convert_class_list,
+  "avoid": _convert_class_list,
+}
+
+# A plan step: (output rank, TC3 key, converter), or None to drop the key
+PlanStep = tuple[int, str, Callable[[Any], Any] | None] | None
+
+
+def compile_encoding_plan() -> tuple[
+  list[tuple[str, str, Callable[[Any], Any] | None]],
+  dict[str, PlanStep],
+]:
+  """Build the dispatch tables used by map_node_encoding.
+
+  Runs once at import; call again (via recompile_encoding_plan) after
+  changing ENCODING_FIELD_MAP, HYPERPARAMETER_FIELD_MAP, DROPPED_FIELDS
+  or FIELD_CONVERTERS.
+
+  Returns:
+    Tuple of (encoding steps in output order, hyperparameter steps keyed
+    by v4.4.0 key with their output rank)
+  """
+  encoding_steps = [
+    (old_key, new_key, FIELD_CONVERTERS.get(new_key))
+    for old_key, new_key in ENCODING_FIELD_MAP.items()
+  ]
+  hyper_steps: dict[str, PlanStep] = {
+    old_key: (rank, new_key, FIELD_CONVERTERS.get(new_key))
+    for rank, (old_key, new_key) in enumerate(HYPERPARAMETER_FIELD_MAP.items())
+  }
+  for old_key in DROPPED_FIELDS:
+    hyper_steps[old_key] = None
+  return encoding_steps, hyper_steps
+
+
+ENCODING_PLAN, HYPERPARAMETER_PLAN = compile_encoding_plan()
+
+
+def recompile_encoding_plan() -> None:
+  """Rebuild the module-level plan after editing the mapping tables."""
+  global ENCODING_PLAN, HYPERPARAMETER_PLAN
+  ENCODING_PLAN, HYPERPARAMETER_PLAN = compile_encoding_plan()
+
+
+def _rank(entry: tuple[int, str, Any]) -> int:
+  return entry[0]
+
+
 def map_node_encoding(
   v440_encoding: dict[str, Any],
   field_prefix: str = "",
 ) -> MapResult:
   """Map v4.4.0 encoding fields to TC3 NodeEncoding.
 
+  Results are memoized in BLOCK_CACHE when it is enabled.
+
   Args:
     v440_encoding: Source encoding dict with encoding_method,
       value_for_encoding, mapping_hyperparameters, etc.
     field_prefix: Prefix for dropped field names (e.g., "subject.")
 
   Returns:
-    MapResult with mapped TC3 NodeEncoding and dropped field names
+    MapResult with mapped TC3 NodeEncoding, dropped field names and
+    warnings for values a converter could not normalize
+  """
+  mapped, dropped, warnings = BLOCK_CACHE.lookup(
+    "encoding",
+    v440_encoding,
+    field_prefix,
+    lambda: compute_node_encoding(v440_encoding, field_prefix),
+  )
+  return MapResult(mapped=mapped, dropped=dropped, warnings=warnings)
+
+
+def _convert(
+  convert: Callable[[Any], Any] | None,
+  value: Any,
+  field_name: str,
+  warnings: list[str],
+) -> Any:
+  """Apply a converter, keeping the value as-is (with a warning) on ValueError."""
+  if convert is None:
+    return value
+  try:
+    return convert(value)
+  except ValueError as e:
+    warnings.append(f"{field_name}: {e}")
+    return value
+
+
+def compute_node_encoding(
+  v440_encoding: dict[str, Any],
+  field_prefix: str = "",
+) -> tuple[dict[str, Any], list[str], list[str]]:
+  """Uncached body of map_node_encoding.
+
+  Uses the precompiled plan, so hyperparameters cost a single pass over
+  the keys actually present. Output keys follow HYPERPARAMETER_FIELD_MAP
+  order regardless of input order. A converter that rejects its value
+  with ValueError leaves the value unconverted and adds a warning
+  instead of failing the config.
+
+  Args:
+    v440_encoding: Source encoding dict
+    field_prefix: Prefix for dropped field names
+
+  Returns:
+    Tuple of (mapped TC3 NodeEncoding, dropped field names, warnings)
   """
   dropped: list[str] = []
+  warnings: list[str] = []
   tc3: dict[str, Any] = {}
 
-  for old_key, new_key in ENCODING_FIELD_MAP.items():
+  for old_key, new_key, convert in ENCODING_PLAN:
     if old_key in v440_encoding:
-      value = v440_encoding[old_key]
-      # Normalize method values (column_of_values -> column)
-      if new_key == "method" and isinstance(value, str):
-        value = METHOD_VALUE_MAP.get(value, value)
-      tc3[new_key] = value
+      tc3[new_key] = _convert(convert, v440_encoding[old_key], f"{field_prefix}{old_key}", warnings)
 
   hyper = v440_encoding.get("mapping_hyperparameters", {})
-  for old_key, new_key in HYPERPARAMETER_FIELD_MAP.items():
-    if old_key in hyper:
-      value = hyper[old_key]
-      if new_key == "taxon" and isinstance(value, str):
-        value = extract_taxon_id(value)
-      # Strip biolink: prefix from prioritize and avoid lists
-      elif new_key in ("prioritize", "avoid") and isinstance(value, list):
-        value = normalize_list_values(value)
-      tc3[new_key] = value
-
-  known_hyper_fields = set(HYPERPARAMETER_FIELD_MAP.keys()) | DROPPED_FIELDS
-  for key in hyper:
-    if key not in known_hyper_fields:
-      dropped.append(f"{field_prefix}{key}")
-    elif key in DROPPED_FIELDS:
+  entries: list[tuple[int, str, Any]] = []
+  for key, value in hyper.items():
+    step = HYPERPARAMETER_PLAN.get(key)
+    if step is None:
       dropped.append(f"{field_prefix}{key}")
+      continue
+    rank, new_key, convert = step
+    entries.append((rank, new_key, _convert(convert, value, f"{field_prefix}{key}", warnings)))
+
+  if len(entries) > 1:
+    entries.sort(key=_rank)
+  for _, new_key, value in entries:
+    tc3[new_key] = value
 
   if "math_module_transformations" in v440_encoding:
     transforms = map_transformations(v440_encoding["math_module_transformations"])
     if transforms:
       tc3["transformations"] = transforms
 
-  return MapResult(mapped=tc3, dropped=dropped)
+  return (tc3, dropped, warnings)
@@ -0,0 +1,120 @@
+"""Estimate dumped TC3 size without running the YAML emitter.
+
+Models the block layout get_yaml produces (2-space mappings, sequences
+offset by 2 with items indented by 4, no line folding). Strings follow a
+simplified version of the emitter's quoting rules, so the estimate is
+close but not exact: it is meant for capacity planning, not for
+predicting a file's bytes.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any
+
+# Plain scalars the YAML resolver would read back as something other
+# than a string, so the emitter quotes them
+_IMPLICIT = re.compile(
+  r"""^(?:
+    [-+]?(?:\d[\d_]*)?\.?\d[\d_]*(?:[eE][-+]?\d+)?
+    |[-+]?\.(?:inf|Inf|INF)|\.(?:nan|NaN|NAN)
+    |0[xob][0-9a-fA-F_]+
+    |true|True|TRUE|false|False|FALSE|yes|Yes|YES|no|No|NO|on|On|ON|off|Off|OFF
+    |null|Null|NULL|~
+    |\d{4}-\d\d?-\d\d?(?:[Tt ].*)?
+  )$""",
+  re.VERBOSE,
+)
+
+# Characters that cannot start a plain scalar
+_INDICATORS = frozenset("?:,[]{}#&*!|>'\"%@`")
+
+
+def _needs_quotes(text: str) -> bool:
+  if not text or text != text.strip() or text[0] in _INDICATORS:
+    return True
+  if text[0] == "-" and (len(text) == 1 or text[1] == " "):
+    return True
+  return ": " in text or " #" in text or text.endswith(":") or bool(_IMPLICIT.match(text))
+
+
+def scalar_bytes(value: Any) -> int:
+  """Estimate the bytes of one scalar as the emitter would write it.
+
+  Args:
+    value: String, number, boolean, None or date
+
+  Returns:
+    Length of the scalar's text, including any quotes
+  """
+  if value is None:
+    # Written as the empty scalar
+    return 0
+  if value is True:
+    return 4
+  if value is False:
+    return 5
+  if isinstance(value, (int, float)):
+    return len(repr(value))
+  if not isinstance(value, str):
+    return len(str(value))
+  return _string_bytes(value)
+
+
+# Keys and enum-like values repeat across every block
+@lru_cache(maxsize=4096)
+def _string_bytes(text: str) -> int:
+  if "\n" in text or not text.isprintable():
+    # Double-quoted with escapes
+    return len(text.encode("unicode_escape")) + text.count('"') + 2
+  if _needs_quotes(text):
+    return len(text.encode("utf-8")) + text.count("'") + 2
+  return len(text.encode("utf-8"))
+
+
+def _mapping_bytes(mapping: dict[Any, Any], indent: int) -> int:
+  total = 0
+  for key, value in mapping.items():
+    # "key:" then the value on the same line or indented below it
+    total += indent + scalar_bytes(key) + 1 + _value_bytes(value, indent + 2)
+  return total
+
+
+def _sequence_bytes(items: list[Any], indent: int) -> int:
+  total = 0
+  for item in items:
+    # "- " then the item, whose first line shares the dash's line
+    total += indent + 2
+    if isinstance(item, dict) and item:
+      total += _mapping_bytes(item, indent + 2) - (indent + 2)
+    elif isinstance(item, list) and item:
+      total += 2 + _sequence_bytes(item, indent + 4) - (indent + 4)
+    elif isinstance(item, (dict, list)):
+      total += 3
+    else:
+      total += scalar_bytes(item) + 1
+  return total
+
+
+def _value_bytes(value: Any, indent: int) -> int:
+  if isinstance(value, dict):
+    return 1 + _mapping_bytes(value, indent) if value else 4
+  if isinstance(value, list):
+    return 1 + _sequence_bytes(value, indent) if value else 4
+  if value is None:
+    # "key:" has no space before its newline
+    return 1
+  return 1 + scalar_bytes(value) + 1
+
+
+def estimate_yaml_bytes(tree: dict[str, Any]) -> int:
+  """Estimate the UTF-8 size of a transformed config once dumped.
+
+  Args:
+    tree: Output of transform_config (plain or round-trip containers)
+
+  Returns:
+    Estimated size in bytes of get_yaml's dump of tree
+  """
+  if not tree:
+    return 3
+  return _mapping_bytes(tree, 0)
@@ -0,0 +1,170 @@
+"""Content-hash manifest for incremental migration."""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from migratassert import __version__
+from migratassert.annotations import ANNOTATION_NAME_MAP
+from migratassert.encoding import (
+  ENCODING_FIELD_MAP,
+  HYPERPARAMETER_FIELD_MAP,
+  METHOD_VALUE_MAP,
+)
+from migratassert.source import EXTENSION_TO_KIND
+from migratassert.taxon import TAXON_TABLE
+
+# Manifest filename written into the output directory
+MANIFEST_NAME = ".migratassert-manifest.json"
+
+# Bumped when the manifest layout changes
+MANIFEST_FORMAT = 2
+
+
+def hash_bytes(data: bytes) -> str:
+  """Return the hex SHA-256 digest of raw bytes."""
+  return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: Path) -> str:
+  """Return the hex SHA-256 digest of a file's contents.
+
+  Args:
+    path: File to hash
+
+  Returns:
+    Hex digest string
+  """
+  return hash_bytes(path.read_bytes())
+
+
+def mapping_tables_hash(options: dict[str, Any] | None = None) -> str:
+  """Hash the mapping tables and run options that determine migration output.
+
+  Any change to these tables, to the taxon snapshot in use or to the
+  options invalidates every manifest entry.
+
+  Args:
+    options: JSON-serializable run options that change the output
+      (YAML engine, multi-document mode, pinned clock)
+
+  Returns:
+    Hex digest of the canonical JSON form of the mapping tables
+  """
+  tables: dict[str, Any] = {
+    "ENCODING_FIELD_MAP": ENCODING_FIELD_MAP,
+    "HYPERPARAMETER_FIELD_MAP": HYPERPARAMETER_FIELD_MAP,
+    "METHOD_VALUE_MAP": METHOD_VALUE_MAP,
+    "ANNOTATION_NAME_MAP": ANNOTATION_NAME_MAP,
+    "EXTENSION_TO_KIND": EXTENSION_TO_KIND,
+  }
+  snapshot = TAXON_TABLE.fingerprint()
+  if snapshot is not None:
+    tables["TAXON_SNAPSHOT"] = snapshot
+  if options:
+    tables["OPTIONS"] = options
+  canonical = json.dumps(tables, sort_keys=True, separators=(",", ":"))
+  return hash_bytes(canonical.encode("utf-8"))
+
+
+@dataclass
+class ManifestEntry:
+  """Record of one successfully migrated source file."""
+
+  source_hash: str
+  dest_name: str
+  dropped_fields: list[str] = field(default_factory=list)
+  publications: list[str] = field(default_factory=list)
+
+
+@dataclass
+class Manifest:
+  """Source hashes from the last run, keyed by path relative to indir."""
+
+  tool_version: str = __version__
+  mapping_hash: str = field(default_factory=mapping_tables_hash)
+  entries: dict[str, ManifestEntry] = field(default_factory=dict)
+
+  def is_current(self, options: dict[str, Any] | None = None) -> bool:
+    """Check whether this manifest was written by the same tool, tables and options."""
+    return (
+      self.tool_version == __version__
+      and self.mapping_hash == mapping_tables_hash(options)
+    )
+
+  def lookup(self, key: str, source_hash: str, outdir: Path) -> ManifestEntry | None:
+    """Return the entry for an unchanged source whose output still exists.
+
+    Args:
+      key: Source path relative to indir
+      source_hash: Current content hash of the source file
+      outdir: Output directory the entry's dest_name is relative to
+
+    Returns:
+      Matching ManifestEntry, or None if the file must be migrated
+    """
+    entry = self.entries.get(key)
+    if entry is None or entry.source_hash != source_hash:
+      return None
+    if not (outdir / entry.dest_name).exists():
+      return None
+    return entry
+
+
+def load_manifest(outdir: Path, options: dict[str, Any] | None = None) -> Manifest:
+  """Load the manifest from an output directory.
+
+  A missing, unreadable, or stale manifest yields an empty one so
+  every file is migrated.
+
+  Args:
+    outdir: Output directory containing the manifest
+    options: Output-changing options of this run (see mapping_tables_hash)
+
+  Returns:
+    Manifest (empty if none usable was found)
+  """
+  path = outdir / MANIFEST_NAME
+  try:
+    raw = json.loads(path.read_text())
+  except (OSError, ValueError):
+    return Manifest()
+
+  if raw.get("format") != MANIFEST_FORMAT:
+    return Manifest()
+
+  manifest = Manifest(
+    tool_version=raw.get("tool_version", ""),
+    mapping_hash=raw.get("mapping_hash", ""),
+    entries={
+      key: ManifestEntry(**value)
+      for key, value in raw.get("entries", {}).items()
+    },
+  )
+  if not manifest.is_current(options):
+    return Manifest()
+  return manifest
+
+
+def save_manifest(manifest: Manifest, outdir: Path) -> None:
+  """Write the manifest into an output directory.
+
+  Args:
+    manifest: Manifest to persist
+    outdir: Output directory
+  """
+  payload = {
+    "format": MANIFEST_FORMAT,
+    "tool_version": manifest.tool_version,
+    "mapping_hash": manifest.mapping_hash,
+    "entries": {
+      key: asdict(entry) for key, entry in sorted(manifest.entries.items())
+    },
+  }
+  outdir.mkdir(parents=True, exist_ok=True)
+  path = outdir / MANIFEST_NAME
+  tmp_path = path.with_name(f"{path.name}.tmp")
+  tmp_path.write_text(json.dumps(payload, indent=2) + "\n")
+  tmp_path.replace(path)
@@ -1,14 +1,61 @@
 """Batch migration orchestration with 2-space YAML indentation."""
 
+import os
+from collections import deque
+from collections.abc import Callable, Generator, Iterable, Iterator, Sequence
 from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from functools import cache
 from io import StringIO
 from pathlib import Path
 from typing import Any
 
 from ruamel.yaml import YAML
 from ruamel.yaml.comments import CommentedMap, CommentedSeq
+from ruamel.yaml.emitter import Emitter
+from ruamel.yaml.error import YAMLError
+from ruamel.yaml.representer import (
+  BaseRepresenter,
+  RoundTripRepresenter,
+  SafeRepresenter,
+)
 
-from migratassert.transform import transform_config
+from migratassert.cache import BLOCK_CACHE, configure_block_cache
+from migratassert.clock import ClockSnapshot, capture_clock, configure_run_clock
+from migratassert.estimate import estimate_yaml_bytes
+from migratassert.manifest import (
+  Manifest,
+  ManifestEntry,
+  hash_bytes,
+  load_manifest,
+  mapping_tables_hash,
+  save_manifest,
+)
+from migratassert.publication_index import (
+  PUBLICATION_SCAN,
+  PublicationIndex,
+  configure_publication_scan,
+  find_publications,
+)
+from migratassert.regex_check import REGEX_CHECK, configure_regex_check, find_regex_issues
+from migratassert.section_pool import (
+  DEFAULT_SECTION_THRESHOLD,
+  SECTION_POOL,
+  configure_section_pool,
+  has_anchored_scalars,
+  splice_sections,
+)
+from migratassert.taxon import configure_taxon_table
+from migratassert.timing import Distribution, PhaseTimer, TopN
+from migratassert.transform import find_sections, transform_config
+from migratassert.validate import (
+  SCHEMA_VALIDATION,
+  RuleStats,
+  ValidationReport,
+  configure_schema_validation,
+  validate_config,
+)
+from migratassert.writer import fsync_file, write_atomic
 
 
 @dataclass
@@ -19,7 +66,25 @@ class FileResult:
   dest_path: Path
   success: bool
   dropped_fields: list[str] = field(default_factory=list)
+  dropped_blocks: list[str] = field(default_factory=list)
   error: str | None = None
+  skipped: bool = False
+  unchanged: bool = False
+  phase_wall: dict[str, float] = field(default_factory=dict)
+  phase_cpu: dict[str, float] = field(default_factory=dict)
+  input_bytes: int = 0
+  output_bytes: int = 0
+  section_count: int = 0
+  annotation_count: int = 0
+  cache_hits: int = 0
+  cache_misses: int = 0
+  output_text: str | None = None
+  document_index: int | None = None
+  document_id: str | None = None
+  regex_issues: list[str] = field(default_factory=list)
+  warnings: list[str] = field(default_factory=list)
+  publications: list[str] = field(default_factory=list)
+  validation: ValidationReport | None = None
 
 
 @dataclass
@@ -29,11 +94,107 @@ class MigrationResult:
   files_processed: int = 0
   files_succeeded: int = 0
   files_failed: int = 0
+  files_skipped: int = 0
+  files_unchanged: int = 0
   file_results: list[FileResult] = field(default_factory=list)
   all_dropped_fields: dict[str, int] = field(default_factory=dict)
+  failures: list[tuple[str, str]] = field(default_factory=list)
+  # Without keep_file_results only the first STREAM_SAMPLE_SIZE of
+  # regex_issues and of warnings are kept
+  regex_issues: list[tuple[str, str]] = field(default_factory=list)
+  regex_issue_count: int = 0
+  warnings: list[tuple[str, str]] = field(default_factory=list)
+  warning_count: int = 0
+  files_invalid: int = 0
+  publication_count: int = 0
+  rule_stats: dict[str, RuleStats] = field(default_factory=dict)
+  keep_file_results: bool = True
+  phase_wall: dict[str, Distribution] = field(default_factory=dict)
+  phase_cpu: dict[str, Distribution] = field(default_factory=dict)
+  file_stats: dict[str, Distribution] = field(default_factory=dict)
+  slowest_files: TopN = field(default_factory=TopN)
+  cache_hits: int = 0
+  cache_misses: int = 0
+  # Total dumped bytes; estimated (see migratassert.estimate) on dry runs
+  output_bytes: int = 0
+  output_estimated: bool = False
 
 
-def get_yaml() -> YAML:
+# Per-file details (regex issues, warnings) kept for the report when per-file results
+# are discarded; the rest reach the caller only through the sink
+STREAM_SAMPLE_SIZE = 20
+
+# Receives each FileResult as soon as it is available
+FileResultSink = Callable[[FileResult], None]
+
+# (source_path, dest_path, file_stem) for one file to migrate, plus the
+# source bytes when they don't come from source_path (archive members)
+MigrationTask = tuple[Path, Path, str] | tuple[Path, Path, str, bytes]
+
+
+def unpack_task(task: MigrationTask) -> tuple[Path, Path, str, bytes | None]:
+  """Split a MigrationTask into (source_path, dest_path, file_stem, raw).
+
+  raw is None when the source should be read from source_path.
+  """
+  if len(task) == 4:
+    return task  # type: ignore[return-value]
+  source_path, dest_path, file_stem = task  # type: ignore[misc]
+  return (source_path, dest_path, file_stem, None)
+
+
+class _PlainTreeMixin:
+  """Represent every dict and list as a fresh block-style container.
+
+  Transformed configs mix plain containers with CommentedMap/CommentedSeq
+  carried over from the round-trip loader. Ignoring their comments, flow
+  style, anchors and object identity here gives the same output as
+  rebuilding the whole tree before dumping, without the copy.
+  """
+
+  def ignore_aliases(self, data: Any) -> bool:
+    if isinstance(data, (dict, list)):
+      return True
+    return super().ignore_aliases(data)
+
+  def represent_plain_dict(self, data: Any) -> Any:
+    # Passing items (not the mapping) keeps insertion order
+    return BaseRepresenter.represent_mapping(
+      self, "tag:yaml.org,2002:map", list(data.items())
+    )
+
+  def represent_plain_list(self, data: Any) -> Any:
+    return BaseRepresenter.represent_sequence(self, "tag:yaml.org,2002:seq", data)
+
+  def represent_none(self, data: Any) -> Any:
+    # Always the empty scalar ("key:", "- "), as the round-trip dump of a
+    # rebuilt tree wrote it. RoundTripRepresenter.represent_none writes
+    # "null" while represented_objects is empty, which ignore_aliases
+    # above now keeps it.
+    return self.represent_scalar("tag:yaml.org,2002:null", "")
+
+
+class RoundTripTreeRepresenter(_PlainTreeMixin, RoundTripRepresenter):
+  """Round-trip representer that formats transformed trees directly."""
+
+
+class SafeTreeRepresenter(_PlainTreeMixin, SafeRepresenter):
+  """Safe representer that formats transformed trees directly."""
+
+
+for _representer in (RoundTripTreeRepresenter, SafeTreeRepresenter):
+  for _mapping_type in (dict, CommentedMap):
+    _representer.add_representer(_mapping_type, _PlainTreeMixin.represent_plain_dict)
+  for _sequence_type in (list, CommentedSeq):
+    _representer.add_representer(_sequence_type, _PlainTreeMixin.represent_plain_list)
+  _representer.add_representer(type(None), _PlainTreeMixin.represent_none)
+
+
+# Supported YAML load/dump engines
+YAML_ENGINES = ("roundtrip", "fast")
+
+
+def get_yaml(engine: str = "roundtrip") -> YAML:
   """Get configured YAML instance with 2-space indentation.
 
   Uses sequence=4 with offset=2 to ensure list item mappings
@@ -41,54 +202,144 @@ def get_yaml() -> YAML:
 
   Sets width to 4096 to prevent automatic line wrapping in string values,
   which can cause YAML parsing issues with certain parsers.
+
+  The "fast" engine loads with the safe loader (libyaml-backed when
+  ruamel.yaml.clib is installed) into plain dicts and lists, and dumps
+  through the pure-Python emitter, since the libyaml emitter ignores the
+  sequence offset. Layout and indentation match "roundtrip", but scalars
+  are re-spelled from their loaded values instead of kept as written:
+  1e-5 becomes 1e-05, 0.10 becomes 0.1, 007 and 0x1F become 7 and 31,
+  and block scalars become quoted strings. Outputs of the two engines
+  are therefore only byte-identical for sources without such scalars.
+
+  Args:
+    engine: One of YAML_ENGINES
+
+  Returns:
+    Configured YAML instance
   """
-  yaml = YAML()
+  if engine == "roundtrip":
+    yaml = YAML()
+    yaml.Representer = RoundTripTreeRepresenter
+  elif engine == "fast":
+    yaml = YAML(typ="safe")
+    yaml.Emitter = Emitter
+    yaml.Representer = SafeTreeRepresenter
+  else:
+    raise ValueError(
+      f"Unknown YAML engine {engine!r}, expected one of: {', '.join(YAML_ENGINES)}"
+    )
   yaml.indent(mapping=2, sequence=4, offset=2)
   yaml.default_flow_style = False
   yaml.width = 4096
   return yaml
 
 
-def to_commented(data: Any, parent_key: str = "") -> Any:
-  """Convert plain Python dicts/lists to ruamel.yaml CommentedMap/CommentedSeq.
+def engine_name(yaml: YAML) -> str:
+  """Return the YAML_ENGINES name of an instance from get_yaml."""
+  return "fast" if "safe" in yaml.typ else "roundtrip"
+
+
+@cache
+def _pure_safe_yaml() -> YAML:
+  """Pure-Python safe loader used when libyaml rejects a document."""
+  return YAML(typ="safe", pure=True)
 
-  This ensures proper YAML indentation and flow style control.
+
+def load_yaml(yaml: YAML, source: bytes | str) -> Any:
+  """Load a YAML document with the given instance.
+
+  libyaml implements YAML 1.1 scanning and rejects some valid YAML 1.2
+  input (e.g. `[biolink:Gene]` flow sequences), so the fast engine
+  retries such documents with the pure-Python safe loader.
 
   Args:
-    data: Data structure to convert
-    parent_key: Key path for context (used to determine flow style)
+    yaml: Instance from get_yaml
+    source: Document bytes or text
 
   Returns:
-    Converted data with CommentedMap/CommentedSeq for proper formatting
+    Parsed document
   """
-  if isinstance(data, dict):
-    cm = CommentedMap()
-    for k, v in data.items():
-      cm[k] = to_commented(v, parent_key=k)
-    return cm
-  elif isinstance(data, list):
-    cs = CommentedSeq()
-    for item in data:
-      cs.append(to_commented(item, parent_key=parent_key))
-    return cs
-  return data
+  try:
+    return yaml.load(source)
+  except YAMLError:
+    if "safe" not in yaml.typ:
+      raise
+    return _pure_safe_yaml().load(source)
 
 
-def dump_yaml(data: dict[str, Any]) -> str:
+def dump_yaml(data: dict[str, Any], engine: str = "roundtrip") -> str:
   """Dump data to YAML string with 2-space indentation.
 
   Args:
     data: Dictionary to dump
+    engine: One of YAML_ENGINES
 
   Returns:
     YAML string with 2-space indentation
   """
-  yaml = get_yaml()
+  yaml = get_yaml(engine)
   stream = StringIO()
-  yaml.dump(to_commented(data), stream)
+  yaml.dump(data, stream)
   return stream.getvalue()
 
 
+# Suffixes treated as v4.4.0 YAML configs
+YAML_SUFFIXES = (".yaml", ".yml")
+
+
+def iter_yaml_files(
+  indir: Path,
+  recursive: bool = False,
+  include: Sequence[str] = (),
+  exclude: Sequence[str] = (),
+  ordered: bool = True,
+) -> Iterator[Path]:
+  """Stream YAML files from a directory tree as they are found.
+
+  Walks with os.scandir so migration can start before the listing is
+  complete. Only one directory's entries are held at a time.
+
+  Args:
+    indir: Directory to search
+    recursive: If True, descend into subdirectories
+    include: fnmatch patterns (relative posix paths); if given, a file
+      must match at least one
+    exclude: fnmatch patterns (relative posix paths) for files to skip
+      and directories not to descend into
+    ordered: If True, visit entries sorted by name for a reproducible
+      order; otherwise use filesystem order
+
+  Yields:
+    Paths of YAML files
+  """
+  pending = [indir]
+  while pending:
+    directory = pending.pop()
+    with os.scandir(directory) as it:
+      entries = list(it) if ordered else it
+      if ordered:
+        entries.sort(key=lambda e: e.name)
+      subdirs = []
+      for entry in entries:
+        path = Path(entry.path)
+        relative = path.relative_to(indir).as_posix()
+        if any(fnmatch(relative, pattern) for pattern in exclude):
+          continue
+        # Symlinked directories are not followed, to avoid cycles
+        if entry.is_dir(follow_symlinks=False):
+          if recursive:
+            subdirs.append(path)
+          continue
+        if not entry.name.endswith(YAML_SUFFIXES) or not entry.is_file():
+          continue
+        if include and not any(fnmatch(relative, pattern) for pattern in include):
+          continue
+        yield path
+      # Reversed so the stack pops subdirectories in name order
+      pending.extend(reversed(subdirs))
+
+
 def discover_yaml_files(indir: Path) -> list[Path]:
   """Find all YAML files in directory (non-recursive).
 
@@ -98,8 +349,88 @@ def discover_yaml_files(indir: Path) -> list[Path]:
   Returns:
     List of YAML file paths sorted by name
   """
-  yaml_files = list(indir.glob("*.yaml")) + list(indir.glob("*.yml"))
-  return sorted(yaml_files, key=lambda p: p.name)
+  return list(iter_yaml_files(indir))
+
+
+# Top-level key naming each document of a multi-document stream
+DOCUMENT_ID_KEY = "document_id"
+
+
+def document_id_comment(file_result: FileResult) -> str:
+  """Comment line naming a document in the output stream.
+
+  TC3 has no DOCUMENT_ID_KEY, so the id is kept as a comment rather
+  than a key that schema validation would not check.
+
+  Args:
+    file_result: Result of converting one document
+
+  Returns:
+    e.g. "# document_id: alam1\n", or "" for an unnamed document
+  """
+  if file_result.document_id is None:
+    return ""
+  document_id = " ".join(file_result.document_id.splitlines())
+  return f"# {DOCUMENT_ID_KEY}: {document_id}\n"
+
+
+def result_name(file_result: FileResult, full_path: bool = False) -> str:
+  """Name a result for reports: the file name, plus the document if any.
+
+  Args:
+    file_result: Result of migrating one file or document
+    full_path: If True, use the whole source path instead of its name
+
+  Returns:
+    e.g. "alam1.yaml" or "batch.yaml#ALAM1"
+  """
+  name = str(file_result.source_path) if full_path else file_result.source_path.name
+  if file_result.document_index is None:
+    return name
+  if file_result.document_id is not None:
+    return f"{name}#{file_result.document_id}"
+  return f"{name}#{file_result.document_index + 1}"
+
+
+def split_documents(raw: bytes) -> list[bytes]:
+  """Split a multi-document YAML stream into single-document chunks.
+
+  Chunks break at "---" lines (directives and comments before the
+  marker stay with the document that follows) and after "..." lines,
+  so each chunk parses on its own. Chunks without content are dropped.
+
+  Args:
+    raw: YAML stream bytes
+
+  Returns:
+    One byte string per document, in stream order
+  """
+  chunks: list[bytes] = []
+  current: list[bytes] = []
+  has_content = False
+
+  def flush() -> None:
+    nonlocal has_content
+    if has_content:
+      chunks.append(b"".join(current))
+    current.clear()
+    has_content = False
+
+  for line in raw.splitlines(keepends=True):
+    marker = line[:3]
+    at_marker = marker in (b"---", b"...") and line[3:4] in (b"", b" ", b"\t", b"\n", b"\r")
+    if at_marker and marker == b"---" and has_content:
+      flush()
+    current.append(line)
+    if at_marker and marker == b"...":
+      flush()
+    elif not at_marker and not line.lstrip().startswith((b"#", b"%")) and line.strip():
+      has_content = True
+    elif at_marker and line[3:].strip():
+      # Content on the marker line itself, e.g. "--- {a: 1}"
+      has_content = True
+  flush()
+  return chunks
 
 
 def migrate_file(
@@ -107,6 +438,10 @@ def migrate_file(
   dest_path: Path,
   dry_run: bool = False,
   file_stem: str | None = None,
+  yaml: YAML | None = None,
+  fsync: bool = False,
+  raw: bytes | None = None,
+  collect_output: bool = False,
 ) -> FileResult:
   """Migrate a single YAML file.
 
@@ -115,74 +450,924 @@ def migrate_file(
     dest_path: Path for output TC3 YAML file
     dry_run: If True, don't write output file
     file_stem: Optional file stem for default local field generation
+    yaml: Optional preconfigured YAML instance to reuse across files
+    fsync: If True, flush the output to disk before renaming it into place
+    raw: Source bytes, when already in memory (source_path is not read)
+    collect_output: If True, keep the dumped YAML on
+      FileResult.output_text instead of writing dest_path
 
   Returns:
     FileResult with migration details
   """
-  yaml = get_yaml()
+  (file_result,) = migrate_documents(
+    source_path,
+    dest_path,
+    dry_run=dry_run,
+    file_stem=file_stem,
+    yaml=yaml,
+    fsync=fsync,
+    raw=raw,
+    collect_output=collect_output,
+  )
+  return file_result
 
-  try:
-    with open(source_path) as f:
-      v440_config = yaml.load(f)
 
-    result = transform_config(v440_config, file_stem=file_stem)
+def migrate_documents(
+  source_path: Path,
+  dest_path: Path,
+  dry_run: bool = False,
+  file_stem: str | None = None,
+  yaml: YAML | None = None,
+  fsync: bool = False,
+  raw: bytes | None = None,
+  collect_output: bool = False,
+  multi_document: bool = False,
+) -> list[FileResult]:
+  """Migrate a YAML file, optionally as a multi-document stream.
 
-    if not dry_run:
-      dest_path.parent.mkdir(parents=True, exist_ok=True)
-      with open(dest_path, "w") as f:
-        yaml.dump(to_commented(result.config), f)
+  In multi-document mode each "---"-separated v4.4.0 document gets its
+  own FileResult, and the documents that convert successfully are
+  written to dest_path as one TC3 stream in the same order. A document
+  can name itself with a top-level DOCUMENT_ID_KEY; the id is kept in
+  its output and used (uppercased) in place of file_stem for source
+  defaults. Unnamed documents use f"{file_stem}_{n}". Read and write
+  timings for the stream are recorded on the first document's result.
 
-    return FileResult(
-      source_path=source_path,
-      dest_path=dest_path,
-      success=True,
-      dropped_fields=result.dropped_fields,
-    )
+  Args:
+    source_path: Path to v4.4.0 YAML file
+    dest_path: Path for output TC3 YAML file
+    dry_run: If True, don't write output file
+    file_stem: Optional file stem for default local field generation
+    yaml: Optional preconfigured YAML instance to reuse across files
+    fsync: If True, flush the output to disk before renaming it into place
+    raw: Source bytes, when already in memory (source_path is not read)
+    collect_output: If True, keep the dumped YAML on the first
+      FileResult's output_text instead of writing dest_path
+    multi_document: If True, treat the file as a multi-document stream
 
-  except Exception as e:
-    return FileResult(
-      source_path=source_path,
-      dest_path=dest_path,
+  Returns:
+    One FileResult, or one per document in multi-document mode
+  """
+  if yaml is None:
+    yaml = get_yaml()
+
+  file_result = FileResult(source_path=source_path, dest_path=dest_path, success=False)
+  timer = PhaseTimer(file_result.phase_wall, file_result.phase_cpu)
+
+  if raw is None:
+    try:
+      with timer.phase("read"):
+        raw = source_path.read_bytes()
+    except Exception as e:
+      file_result.error = str(e)
+      return [file_result]
+
+  if multi_document:
+    results, text = convert_documents(raw, file_result, yaml, file_stem=file_stem, render=not dry_run)
+  else:
+    results = [file_result]
+    text = convert_source(raw, file_result, yaml, file_stem=file_stem, render=not dry_run)
+
+  if collect_output:
+    file_result.output_text = text
+  elif text is not None:
+    try:
+      with timer.phase("write"):
+        unchanged = not write_output(dest_path, text, fsync=fsync)
+    except Exception as e:
+      for doc_result in results:
+        doc_result.success = False
+        doc_result.error = str(e)
+    else:
+      for doc_result in results:
+        doc_result.unchanged = unchanged
+
+  return results
+
+
+def convert_documents(
+  raw: bytes,
+  file_result: FileResult,
+  yaml: YAML,
+  file_stem: str | None = None,
+  render: bool = True,
+) -> tuple[list[FileResult], str | None]:
+  """Convert every document of a multi-document stream.
+
+  Each document goes through convert_source separately, so one bad
+  document fails alone and the rest are still converted.
+
+  Args:
+    raw: YAML stream bytes
+    file_result: Result used for the first document (further results
+      copy its paths)
+    yaml: Instance from get_yaml
+    file_stem: Stem of the stream, for unnamed documents
+    render: If False, stop after transforming (dry run)
+
+  Returns:
+    Tuple of (one FileResult per document, TC3 stream text or None when
+    not rendered or no document converted)
+  """
+  chunks = split_documents(raw)
+  if not chunks:
+    file_result.success = True
+    return ([file_result], "" if render else None)
+
+  results: list[FileResult] = []
+  texts: list[str] = []
+  for index, chunk in enumerate(chunks):
+    doc_result = file_result if index == 0 else FileResult(
+      source_path=file_result.source_path,
+      dest_path=file_result.dest_path,
       success=False,
-      error=str(e),
     )
+    text = convert_source(
+      chunk,
+      doc_result,
+      yaml,
+      file_stem=file_stem,
+      render=render,
+      document_index=index,
+    )
+    results.append(doc_result)
+    if text is not None:
+      texts.append(text)
+
+  if not render or not texts:
+    return (results, None)
+  return (results, "---\n".join(texts))
+
+
+def convert_source(
+  raw: bytes,
+  file_result: FileResult,
+  yaml: YAML,
+  file_stem: str | None = None,
+  render: bool = True,
+  document_index: int | None = None,
+) -> str | None:
+  """Parse, transform and optionally dump one source document.
+
+  Does no disk I/O, so pipelines can schedule reads and writes
+  separately. Phase timings, sizes, counts, dropped fields and success
+  or error are recorded on file_result.
+
+  Args:
+    raw: Source document bytes
+    file_result: Result to fill in for this source
+    yaml: Instance from get_yaml
+    file_stem: Optional file stem for default local field generation
+    render: If False, estimate output_bytes instead of dumping (dry run)
+    document_index: Position in a multi-document stream; enables
+      DOCUMENT_ID_KEY handling (see migrate_documents)
+
+  Returns:
+    Dumped TC3 YAML text, or None when not rendered or on failure
+  """
+  timer = PhaseTimer(file_result.phase_wall, file_result.phase_cpu)
+  file_result.input_bytes = len(raw)
+  hits_before, misses_before = BLOCK_CACHE.hits, BLOCK_CACHE.misses
+  file_result.document_index = document_index
+
+  try:
+    with timer.phase("parse"):
+      v440_config = load_yaml(yaml, raw)
+    if REGEX_CHECK.enabled:
+      with timer.phase("regex"):
+        file_result.regex_issues = find_regex_issues(v440_config)
+    if PUBLICATION_SCAN.enabled:
+      file_result.publications = find_publications(v440_config)
+
+    document_id = None
+    if document_index is not None:
+      if isinstance(v440_config, dict):
+        document_id = v440_config.pop(DOCUMENT_ID_KEY, None)
+      if document_id is not None:
+        file_result.document_id = str(document_id)
+        file_stem = file_result.document_id.upper()
+      elif file_stem is not None:
+        file_stem = f"{file_stem}_{document_index + 1}"
+
+    with timer.phase("transform"):
+      # Very large configs render their sections on SECTION_POOL while
+      # the template is transformed and dumped here
+      chunks = None
+      if render and isinstance(v440_config, dict):
+        sections = find_sections(v440_config)
+        if sections is not None and SECTION_POOL.wants(len(sections)) and not has_anchored_scalars(v440_config):
+          chunks = SECTION_POOL.submit(sections, engine_name(yaml), SCHEMA_VALIDATION.enabled)
+      result = transform_config(v440_config, file_stem=file_stem, include_sections=chunks is None)
+    if SCHEMA_VALIDATION.enabled:
+      with timer.phase("validate"):
+        file_result.validation = validate_config(result.config)
+    file_result.section_count, file_result.annotation_count = count_blocks(result.config)
+
+    text = None
+    if render:
+      with timer.phase("dump"):
+        stream = StringIO()
+        stream.write(document_id_comment(file_result))
+        yaml.dump(result.config, stream)
+        if chunks is not None:
+          split = [chunk.result() for chunk in chunks]
+          stream.writelines(splice_sections(split))
+          for chunk in split:
+            result.dropped_fields.extend(chunk.dropped_fields)
+            result.dropped_blocks.extend(chunk.dropped_blocks)
+            file_result.annotation_count += chunk.annotation_count
+            result.warnings.extend(chunk.warnings)
+            if chunk.validation is not None and file_result.validation is not None:
+              file_result.validation.merge(chunk.validation)
+          file_result.section_count = len(sections)
+        text = stream.getvalue()
+      file_result.output_bytes = len(text.encode("utf-8"))
+    else:
+      with timer.phase("estimate"):
+        comment = document_id_comment(file_result)
+        file_result.output_bytes = len(comment.encode("utf-8")) + estimate_yaml_bytes(result.config)
+
+  except Exception as e:
+    file_result.error = str(e)
+    return None
+
+  finally:
+    file_result.cache_hits = BLOCK_CACHE.hits - hits_before
+    file_result.cache_misses = BLOCK_CACHE.misses - misses_before
+
+  file_result.success = True
+  file_result.dropped_fields = result.dropped_fields
+  file_result.dropped_blocks = result.dropped_blocks
+  file_result.warnings = result.warnings
+  return text
+
+
+def write_output(dest_path: Path, text: str, fsync: bool = False) -> bool:
+  """Atomically write migrated YAML text unless dest_path already matches.
+
+  Args:
+    dest_path: Output path; parent directories are created as needed
+    text: Dumped TC3 YAML
+    fsync: If True, flush the output to disk before renaming it into place
+
+  Returns:
+    True if the file was written, False if it was already identical
+  """
+  return write_atomic(dest_path, text.encode("utf-8"), fsync=fsync)
+
+
+def count_blocks(tc3_config: dict[str, Any]) -> tuple[int, int]:
+  """Count sections and annotations in a transformed TC3 config.
+
+  Args:
+    tc3_config: Output of transform_config
+
+  Returns:
+    Tuple of (section_count, annotation_count)
+  """
+  sections = tc3_config.get("sections") or []
+  blocks = [tc3_config.get("template", {}), *sections]
+  annotations = sum(len(block.get("annotations") or []) for block in blocks)
+  return (len(sections), annotations)
+
+
+def plan_destination(
+  source_path: Path,
+  outdir: Path,
+  indir: Path | None = None,
+) -> tuple[Path, str]:
+  """Compute output path and file stem for a source file.
+
+  Uses the uppercase stem for the output filename
+  (e.g., alam1.yaml -> ALAM1.yaml). When indir is given, the source's
+  subdirectory under indir is mirrored under outdir.
+
+  Args:
+    source_path: Path to v4.4.0 YAML file
+    outdir: Directory for TC3 output files
+    indir: Optional input root to mirror subdirectories from
+
+  Returns:
+    Tuple of (dest_path, uppercase_stem)
+  """
+  uppercase_stem = source_path.stem.upper()
+  dest_name = f"{uppercase_stem}{source_path.suffix}"
+  if indir is not None:
+    outdir = outdir / source_path.parent.relative_to(indir)
+  return (outdir / dest_name, uppercase_stem)
+
+
+# Per-process YAML instance, set by init_worker in pool workers
+_worker_yaml: YAML | None = None
+
+
+def init_worker(
+  yaml_engine: str,
+  cache_size: int = 0,
+  section_workers: int = 0,
+  section_threshold: int = DEFAULT_SECTION_THRESHOLD,
+  check_regex: bool = False,
+  validate: bool = True,
+  taxon_snapshot: Path | None = None,
+  clock: ClockSnapshot | None = None,
+  scan_publications: bool = False,
+) -> None:
+  """Set up per-process state reused by every task in a pool worker.
+
+  Args:
+    yaml_engine: One of YAML_ENGINES
+    cache_size: Size of this worker's BLOCK_CACHE (0 disables it)
+    section_workers: Size of this worker's SECTION_POOL (0 disables it)
+    section_threshold: Sections a config needs before SECTION_POOL is used
+    check_regex: If True, validate regular_expressions (see REGEX_CHECK)
+    validate: If True, validate transformed configs (see SCHEMA_VALIDATION)
+    taxon_snapshot: NCBITaxon snapshot for this worker's TAXON_TABLE
+    clock: The run's clock snapshot (see RUN_CLOCK)
+    scan_publications: If True, collect publications (see PUBLICATION_SCAN)
+  """
+  global _worker_yaml
+  _worker_yaml = get_yaml(yaml_engine)
+  configure_block_cache(cache_size)
+  configure_section_pool(section_workers, section_threshold)
+  configure_regex_check(check_regex)
+  configure_schema_validation(validate)
+  configure_taxon_table(taxon_snapshot)
+  configure_run_clock(clock)
+  configure_publication_scan(scan_publications)
+
+
+def _migrate_batch(
+  tasks: tuple[MigrationTask, ...],
+  dry_run: bool,
+  fsync: bool,
+  collect_output: bool,
+  multi_document: bool,
+) -> list[FileResult]:
+  """Pool entry point: migrate a batch of planned files with the worker's YAML."""
+  results = []
+  for task in tasks:
+    results.extend(migrate_in_worker(task, dry_run, fsync, collect_output, multi_document))
+  return results
+
+
+def migrate_in_worker(
+  task: MigrationTask,
+  dry_run: bool = False,
+  fsync: bool = False,
+  collect_output: bool = False,
+  multi_document: bool = False,
+  clock: ClockSnapshot | None = None,
+) -> list[FileResult]:
+  """Pool entry point: migrate_documents with the worker's YAML instance.
+
+  Also usable in-process once init_worker has run there. A long-lived
+  caller passes a fresh clock per task, so contributor dates follow the
+  calendar instead of the process start.
+  """
+  if clock is not None:
+    configure_run_clock(clock)
+  source_path, dest_path, file_stem, raw = unpack_task(task)
+  return migrate_documents(
+    source_path,
+    dest_path,
+    dry_run=dry_run,
+    file_stem=file_stem,
+    yaml=_worker_yaml,
+    fsync=fsync,
+    raw=raw,
+    collect_output=collect_output,
+    multi_document=multi_document,
+  )
+
+
+def convert_in_worker(
+  raw: bytes,
+  file_result: FileResult,
+  file_stem: str | None,
+  render: bool,
+  multi_document: bool = False,
+) -> tuple[list[FileResult], str | None]:
+  """Pool entry point: convert one source with the worker's YAML instance.
+
+  Returns:
+    Tuple of (results, one per document in multi-document mode, and
+    the dumped text)
+  """
+  if multi_document:
+    return convert_documents(raw, file_result, _worker_yaml, file_stem=file_stem, render=render)
+  text = convert_source(raw, file_result, _worker_yaml, file_stem=file_stem, render=render)
+  return ([file_result], text)
+
+
+# Files per pool submission, to amortize pickling overhead
+POOL_BATCH_SIZE = 8
+
+
+def iter_file_results(
+  items: Iterable[MigrationTask | FileResult],
+  dry_run: bool = False,
+  jobs: int = 1,
+  yaml_engine: str = "roundtrip",
+  cache_size: int = 0,
+  fsync: bool = False,
+  collect_output: bool = False,
+  multi_document: bool = False,
+  section_workers: int = 0,
+  section_threshold: int = DEFAULT_SECTION_THRESHOLD,
+  check_regex: bool = False,
+  validate: bool = True,
+  taxon_snapshot: Path | None = None,
+  clock: ClockSnapshot | None = None,
+  scan_publications: bool = False,
+) -> Generator[FileResult, None, None]:
+  """Migrate planned files, yielding results in input order.
+
+  Items are consumed lazily; with a pool only a bounded window of
+  batches is in flight at once, so discovery can stream into workers.
+
+  Args:
+    items: MigrationTasks to migrate, or already-resolved FileResults to
+      pass through in place
+    dry_run: If True, don't write files
+    jobs: Number of worker processes (1 runs serially in-process)
+    yaml_engine: One of YAML_ENGINES
+    cache_size: BLOCK_CACHE size for each worker process (the serial
+      path uses the already-configured in-process cache)
+    fsync: If True, flush each output to disk before renaming it into place
+    collect_output: If True, return dumped YAML on FileResult.output_text
+      instead of writing it
+    multi_document: If True, treat each source as a multi-document
+      stream (see migrate_documents)
+    section_workers: SECTION_POOL size for each worker process (the
+      serial path uses the already-configured in-process pool)
+    section_threshold: Sections a config needs before SECTION_POOL is used
+    check_regex: REGEX_CHECK setting for each worker process (the serial
+      path uses the in-process setting)
+    validate: SCHEMA_VALIDATION setting for each worker process
+    taxon_snapshot: TAXON_TABLE snapshot for each worker process
+    clock: RUN_CLOCK snapshot for each worker process
+    scan_publications: PUBLICATION_SCAN setting for each worker process
+
+  Yields:
+    FileResult for each item (one per document in multi-document
+    mode), in the same order as items
+  """
+  if jobs <= 1:
+    yaml = get_yaml(yaml_engine)
+    for item in items:
+      if isinstance(item, FileResult):
+        yield item
+        continue
+      source_path, dest_path, file_stem, raw = unpack_task(item)
+      yield from migrate_documents(
+        source_path,
+        dest_path,
+        dry_run=dry_run,
+        file_stem=file_stem,
+        yaml=yaml,
+        fsync=fsync,
+        raw=raw,
+        collect_output=collect_output,
+        multi_document=multi_document,
+      )
+    return
+
+  # Only pool runs pay for importing multiprocessing
+  from concurrent.futures import Future, ProcessPoolExecutor
+
+  max_in_flight = jobs * 4
+  window: deque[Future[list[FileResult]] | FileResult] = deque()
+  batch: list[MigrationTask] = []
+
+  def drain(limit: int) -> Iterator[FileResult]:
+    while len(window) > limit:
+      head = window.popleft()
+      if isinstance(head, FileResult):
+        yield head
+      else:
+        yield from head.result()
+
+  with ProcessPoolExecutor(
+    max_workers=jobs,
+    initializer=init_worker,
+    initargs=(
+      yaml_engine,
+      cache_size,
+      section_workers,
+      section_threshold,
+      check_regex,
+      validate,
+      taxon_snapshot,
+      clock,
+      scan_publications,
+    ),
+  ) as executor:
+
+    def submit(tasks: list[MigrationTask]) -> Future[list[FileResult]]:
+      return executor.submit(
+        _migrate_batch, tuple(tasks), dry_run, fsync, collect_output, multi_document
+      )
+
+    try:
+      for item in items:
+        if isinstance(item, FileResult):
+          if batch:
+            window.append(submit(batch))
+            batch = []
+          window.append(item)
+        else:
+          batch.append(item)
+          if len(batch) >= POOL_BATCH_SIZE:
+            window.append(submit(batch))
+            batch = []
+        yield from drain(max_in_flight)
+      if batch:
+        window.append(submit(batch))
+      yield from drain(0)
+    except GeneratorExit:
+      # Closed early: drop the batches that have not started
+      executor.shutdown(wait=True, cancel_futures=True)
+      raise
+
+
+def record_file_result(result: MigrationResult, file_result: FileResult) -> None:
+  """Fold a single FileResult into the aggregate MigrationResult.
+
+  The FileResult itself is only retained when result.keep_file_results
+  is set; counters, the dropped-field histogram and failures always are.
+  Without it, regex issues and warnings are counted but only a sample
+  of STREAM_SAMPLE_SIZE of each is kept.
+
+  Args:
+    result: Aggregate result to update in place
+    file_result: Result of migrating one file
+  """
+  result.files_processed += 1
+  if result.keep_file_results:
+    result.file_results.append(file_result)
+
+  if file_result.success:
+    result.files_succeeded += 1
+    result.cache_hits += file_result.cache_hits
+    result.cache_misses += file_result.cache_misses
+    if file_result.unchanged:
+      result.files_unchanged += 1
+    if file_result.skipped:
+      result.files_skipped += 1
+    else:
+      result.output_bytes += file_result.output_bytes
+      record_file_timings(result, file_result)
+    for field_name in file_result.dropped_fields:
+      result.all_dropped_fields[field_name] = (
+        result.all_dropped_fields.get(field_name, 0) + 1
+      )
+    result.regex_issue_count += len(file_result.regex_issues)
+    for issue in file_result.regex_issues:
+      if result.keep_file_results or len(result.regex_issues) < STREAM_SAMPLE_SIZE:
+        result.regex_issues.append((result_name(file_result), issue))
+    result.warning_count += len(file_result.warnings)
+    for warning in file_result.warnings:
+      if result.keep_file_results or len(result.warnings) < STREAM_SAMPLE_SIZE:
+        result.warnings.append((result_name(file_result), warning))
+    if file_result.validation is not None:
+      if file_result.validation.violations:
+        result.files_invalid += 1
+      for name, stats in file_result.validation.rules.items():
+        result.rule_stats.setdefault(name, RuleStats()).add(stats)
+  else:
+    result.files_failed += 1
+    result.failures.append((result_name(file_result), file_result.error or ""))
+
+
+def record_file_timings(result: MigrationResult, file_result: FileResult) -> None:
+  """Fold one file's phase timings and sizes into the run distributions.
+
+  Args:
+    result: Aggregate result to update in place
+    file_result: Result of migrating one file
+  """
+  for phase, seconds in file_result.phase_wall.items():
+    result.phase_wall.setdefault(phase, Distribution()).add(seconds)
+  for phase, seconds in file_result.phase_cpu.items():
+    result.phase_cpu.setdefault(phase, Distribution()).add(seconds)
+
+  stats = {
+    "input bytes": file_result.input_bytes,
+    "output bytes": file_result.output_bytes,
+    "sections": file_result.section_count,
+    "annotations": file_result.annotation_count,
+  }
+  for name, value in stats.items():
+    result.file_stats.setdefault(name, Distribution()).add(value)
+
+  result.slowest_files.add(sum(file_result.phase_wall.values()), result_name(file_result, full_path=True))
 
 
 def run_migration(
   indir: Path,
   outdir: Path,
   dry_run: bool = False,
+  jobs: int = 1,
+  incremental: bool = False,
+  sink: FileResultSink | None = None,
+  keep_file_results: bool = True,
+  yaml_engine: str = "roundtrip",
+  recursive: bool = False,
+  include: Sequence[str] = (),
+  exclude: Sequence[str] = (),
+  ordered: bool = True,
+  async_io: bool = False,
+  read_ahead: int = 16,
+  write_concurrency: int = 4,
+  fsync_batch: int = 0,
+  cache_size: int = 0,
+  fsync: bool = False,
+  multi_document: bool = False,
+  dropped_index: Path | None = None,
+  section_workers: int = 0,
+  section_threshold: int = DEFAULT_SECTION_THRESHOLD,
+  check_regex: bool = False,
+  validate: bool = True,
+  taxon_snapshot: Path | None = None,
+  publication_index: Path | None = None,
+  clock: ClockSnapshot | None = None,
 ) -> MigrationResult:
-  """Run batch migration on all YAML files in directory.
+  """Run batch migration on all YAML files in a directory or archive.
 
   Args:
-    indir: Directory containing v4.4.0 files
-    outdir: Directory for TC3 output files
-    dry_run: If True, don't write files
+    indir: Directory containing v4.4.0 files, or a .tar, .tar.gz, .tgz
+      or .zip archive whose members are migrated without extracting
+    outdir: Directory for TC3 output files, or an archive path to write
+      all outputs into (members are named as they would be on disk)
+    dry_run: If True, don't write files; output sizes are estimated
+      from the transformed trees instead of dumped
+    jobs: Number of worker processes; results are identical to the
+      serial path regardless of this value
+    incremental: If True, skip sources whose content hash matches the
+      manifest in outdir and refresh the manifest afterwards (requires
+      a directory outdir)
+    sink: Optional callable receiving each FileResult as it completes
+    keep_file_results: If False, only aggregates are kept in memory and
+      per-file results reach the caller solely through sink
+    yaml_engine: One of YAML_ENGINES
+    recursive: If True, migrate subdirectories into a mirrored tree
+    include: fnmatch patterns a file's relative path must match
+    exclude: fnmatch patterns for relative paths to skip
+    ordered: If True, process files in name order for reproducible runs
+      (archive members are always taken in archive order)
+    async_io: If True, use the asyncio pipeline that overlaps reads,
+      conversions and writes (see migratassert.pipeline)
+    read_ahead: Pipeline only; sources prefetched ahead of conversion
+    write_concurrency: Pipeline only; number of concurrent writers
+    fsync_batch: Pipeline only; fsync outputs every this many files
+      (0 disables fsync)
+    cache_size: Entries in the per-process LRU cache of mapped
+      encoding and annotation sub-blocks (0 disables it)
+    fsync: If True, flush each written file before it is renamed into
+      place, then sync every output directory that received a new file
+      once at the end of the run
+    multi_document: If True, each source is a multi-document stream
+      migrated into a matching TC3 stream, with one FileResult per
+      document (see migrate_documents)
+    dropped_index: If given, record every dropped field in this SQLite
+      index (see migratassert.dropped_index); ignored on dry runs
+    section_workers: Processes each converting process may use to map
+      the sections of one very large config (0 disables; see
+      migratassert.transform.SECTION_POOL)
+    section_threshold: Sections a config needs before they are split
+    check_regex: If True, compile every regular_expressions pattern and
+      flag invalid or backtracking-prone ones on FileResult.regex_issues
+    validate: If True, check every transformed config against the TC3
+      rules in migratassert.validate.SCHEMA_RULES (FileResult.validation)
+    taxon_snapshot: Optional NCBITaxon name -> ID snapshot (see
+      migratassert.taxon.write_taxon_snapshot) used to resolve
+      in_this_organism values given as organism names
+    publication_index: If set, write a JSON index of canonical
+      publications and the output files citing them to this path
+      (see migratassert.publication_index; not written on a dry run)
+    clock: Clock snapshot for contributor dates and archive timestamps;
+      captured once at the start of the run if None (see
+      migratassert.clock.capture_clock, which honors SOURCE_DATE_EPOCH)
 
   Returns:
     MigrationResult with aggregate statistics
+
+  Raises:
+    ValueError: If incremental is combined with an archive outdir
   """
-  result = MigrationResult()
-  yaml_files = discover_yaml_files(indir)
+  from migratassert.archive import ArchiveWriter, is_archive, iter_archive_members
 
-  for source_path in yaml_files:
-    # Use uppercase stem for output filename (e.g., alam1.yaml -> ALAM1.yaml)
-    uppercase_stem = source_path.stem.upper()
-    dest_name = f"{uppercase_stem}{source_path.suffix}"
-    dest_path = outdir / dest_name
-    file_result = migrate_file(source_path, dest_path, dry_run=dry_run, file_stem=uppercase_stem)
+  archive_in = is_archive(indir) and indir.is_file()
+  archive_out = is_archive(outdir)
+  if incremental and archive_out:
+    raise ValueError("Incremental migration needs a directory output, not an archive")
 
-    result.files_processed += 1
-    result.file_results.append(file_result)
+  get_yaml(yaml_engine)  # Fail fast on an unknown engine name
+  configure_block_cache(cache_size)
+  configure_section_pool(section_workers, section_threshold)
+  configure_regex_check(check_regex)
+  configure_schema_validation(validate)
+  configure_taxon_table(taxon_snapshot)
+  clock = capture_clock() if clock is None else clock
+  configure_run_clock(clock)
+  # Only the publication index reads what this collects
+  scan_publications = publication_index is not None and not dry_run
+  configure_publication_scan(scan_publications)
+  result = MigrationResult(keep_file_results=keep_file_results, output_estimated=dry_run)
+  # Outputs from a run with other values for these would differ
+  output_options = {
+    "yaml_engine": yaml_engine,
+    "multi_document": multi_document,
+    "source_date_epoch": clock.epoch if clock.pinned else None,
+    # Entries from a run without the index have no publications to reuse
+    "publications": scan_publications,
+  }
+  previous = load_manifest(outdir, output_options) if incremental else None
+  manifest = Manifest(mapping_hash=mapping_tables_hash(output_options))
+  source_hashes: dict[Path, str] = {}
+  written_dirs: set[Path] = set()
+
+  # Never re-migrate our own output when it lives inside indir
+  if recursive and not archive_in and outdir.resolve().is_relative_to(indir.resolve()):
+    relative_outdir = outdir.resolve().relative_to(indir.resolve()).as_posix()
+    if relative_outdir != ".":
+      exclude = (*exclude, relative_outdir)
+
+  def sources() -> Iterator[tuple[Path, bytes | None]]:
+    if archive_in:
+      yield from iter_archive_members(indir, recursive=recursive, include=include, exclude=exclude)
+      return
+    for source_path in iter_yaml_files(
+      indir,
+      recursive=recursive,
+      include=include,
+      exclude=exclude,
+      ordered=ordered,
+    ):
+      yield (source_path, None)
+
+  def work_items() -> Iterator[MigrationTask | FileResult]:
+    for source_path, raw in sources():
+      dest_path, file_stem = plan_destination(source_path, outdir, indir)
+      task: MigrationTask = (
+        (source_path, dest_path, file_stem)
+        if raw is None
+        else (source_path, dest_path, file_stem, raw)
+      )
+      if previous is None:
+        yield task
+        continue
 
-    if file_result.success:
-      result.files_succeeded += 1
-      for field_name in file_result.dropped_fields:
-        result.all_dropped_fields[field_name] = (
-          result.all_dropped_fields.get(field_name, 0) + 1
+      key = source_path.relative_to(indir).as_posix()
+      if raw is None:
+        # Read once: hash these bytes and, if changed, migrate them
+        try:
+          raw = source_path.read_bytes()
+        except OSError as e:
+          yield FileResult(source_path=source_path, dest_path=dest_path, success=False, error=str(e))
+          continue
+        task = (source_path, dest_path, file_stem, raw)
+      source_hash = hash_bytes(raw)
+      entry = previous.lookup(key, source_hash, outdir)
+      if entry is None:
+        source_hashes[source_path] = source_hash
+        yield task
+        continue
+
+      manifest.entries[key] = entry
+      yield FileResult(
+        source_path=source_path,
+        dest_path=dest_path,
+        success=True,
+        dropped_fields=list(entry.dropped_fields),
+        publications=list(entry.publications),
+        skipped=True,
+      )
+
+  if async_io:
+    from migratassert.pipeline import iter_pipeline_results
+
+    file_results = iter_pipeline_results(
+      work_items(),
+      dry_run=dry_run,
+      yaml_engine=yaml_engine,
+      jobs=jobs,
+      read_ahead=read_ahead,
+      write_concurrency=write_concurrency,
+      fsync_batch=fsync_batch,
+      cache_size=cache_size,
+      fsync=fsync,
+      collect_output=archive_out,
+      multi_document=multi_document,
+      section_workers=section_workers,
+      section_threshold=section_threshold,
+      check_regex=check_regex,
+      validate=validate,
+      taxon_snapshot=taxon_snapshot,
+      clock=clock,
+      scan_publications=scan_publications,
+    )
+  else:
+    file_results = iter_file_results(
+      work_items(),
+      dry_run=dry_run,
+      jobs=jobs,
+      yaml_engine=yaml_engine,
+      cache_size=cache_size,
+      fsync=fsync,
+      collect_output=archive_out,
+      multi_document=multi_document,
+      section_workers=section_workers,
+      section_threshold=section_threshold,
+      check_regex=check_regex,
+      validate=validate,
+      taxon_snapshot=taxon_snapshot,
+      clock=clock,
+      scan_publications=scan_publications,
+    )
+
+  archive = ArchiveWriter(outdir, fsync=fsync, mtime=clock.epoch) if archive_out and not dry_run else None
+  index = None
+  if dropped_index is not None and not dry_run:
+    from migratassert.dropped_index import DroppedFieldIndex
+
+    index = DroppedFieldIndex(dropped_index)
+  publications = PublicationIndex() if publication_index is not None and not dry_run else None
+  try:
+    for file_result in file_results:
+      if file_result.output_text is not None:
+        if archive is not None:
+          member = file_result.dest_path.relative_to(outdir).as_posix()
+          archive.add(member, file_result.output_text.encode("utf-8"))
+        file_result.output_text = None
+
+      record_file_result(result, file_result)
+      if sink is not None:
+        sink(file_result)
+      if index is not None:
+        index.add(
+          file_result,
+          source=file_result.source_path.relative_to(indir).as_posix(),
+          dest=file_result.dest_path.relative_to(outdir).as_posix(),
         )
-    else:
-      result.files_failed += 1
+      if publications is not None and file_result.success:
+        publications.add(file_result.publications, file_result.dest_path.relative_to(outdir).as_posix())
+
+      written = file_result.success and not (dry_run or file_result.skipped or file_result.unchanged)
+      if fsync and written and not archive_out:
+        written_dirs.add(file_result.dest_path.parent)
+
+      if previous is not None and not file_result.skipped:
+        key = file_result.source_path.relative_to(indir).as_posix()
+        if file_result.document_index:
+          # Later document of a stream: the stream is current only if
+          # every document converted
+          entry = manifest.entries.get(key)
+          if entry is not None and file_result.success:
+            entry.dropped_fields.extend(file_result.dropped_fields)
+            entry.publications.extend(file_result.publications)
+          elif entry is not None:
+            del manifest.entries[key]
+          continue
+        # Unreadable sources never got a hash and stay out of the manifest
+        source_hash = source_hashes.pop(file_result.source_path, None)
+        if file_result.success and source_hash is not None:
+          manifest.entries[key] = ManifestEntry(
+            source_hash=source_hash,
+            dest_name=file_result.dest_path.relative_to(outdir).as_posix(),
+            dropped_fields=list(file_result.dropped_fields),
+            publications=list(file_result.publications),
+          )
+  except BaseException:
+    if archive is not None:
+      archive.abort()
+    if index is not None:
+      index.close(prune=False)
+    raise
+  finally:
+    # Stop converting (and writing) as soon as this loop exits early
+    file_results.close()
+    # Later runs (and library callers) must not inherit this run's
+    # settings, cached blocks or clock snapshot
+    configure_block_cache(0)
+    configure_section_pool(0)
+    configure_regex_check(False)
+    configure_schema_validation(True)
+    configure_taxon_table()
+    configure_run_clock(None)
+    configure_publication_scan(False)
+  if archive is not None:
+    archive.close()
+  if index is not None:
+    index.close()
+  if publications is not None:
+    publications.save(publication_index)
+    result.publication_count = len(publications.files)
+
+  if previous is not None and not dry_run:
+    save_manifest(manifest, outdir)
+
+  for directory in sorted(written_dirs):
+    fsync_file(directory)
 
   return result
@@ -0,0 +1,20 @@
+"""Readable labels for locations inside parsed configs."""
+
+
+def format_path(path: tuple[str | int, ...]) -> str:
+  """Format a config location the way reports print it.
+
+  Args:
+    path: Keys and indexes from the document root,
+      e.g. ("sections", 1, "annotations", 0, "method")
+
+  Returns:
+    Dotted path with indexes in brackets, e.g. "sections[1].annotations[0].method"
+  """
+  parts: list[str] = []
+  for part in path:
+    if isinstance(part, int):
+      parts[-1] += f"[{part}]"
+    else:
+      parts.append(part)
+  return ".".join(parts)
@@ -0,0 +1,383 @@
+"""Asyncio pipeline overlapping source reads, transforms and output writes."""
+
+import asyncio
+import queue
+import threading
+from collections.abc import Generator, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from migratassert.clock import ClockSnapshot
+from migratassert.migrate import (
+  FileResult,
+  MigrationTask,
+  convert_documents,
+  convert_in_worker,
+  convert_source,
+  get_yaml,
+  init_worker,
+  unpack_task,
+  write_output,
+)
+from migratassert.section_pool import DEFAULT_SECTION_THRESHOLD
+from migratassert.timing import PhaseTimer
+from migratassert.writer import fsync_file
+
+# Marks the end of the task stream and of the result stream
+_DONE = object()
+
+# Results buffered for the consumer before the pipeline waits on it
+RESULT_QUEUE_SIZE = 64
+
+
+@dataclass
+class _Failure:
+  """Wraps an exception raised inside the pipeline thread."""
+
+  error: BaseException
+
+
+@dataclass
+class _Job:
+  """One file moving through the pipeline.
+
+  file_result carries the file's read and write timings; documents
+  holds every result for the file (more than one in multi-document mode).
+  """
+
+  index: int
+  file_result: FileResult
+  file_stem: str | None = None
+  read: "asyncio.Future[bytes] | None" = None
+  converted: "asyncio.Future[tuple[list[FileResult], str | None]] | None" = None
+  text: str | None = None
+  resolved: bool = False
+  documents: list[FileResult] = field(default_factory=list)
+
+
+def _read_source(path: Path, file_result: FileResult) -> bytes:
+  """Read source bytes, timing the read on the file's result."""
+  timer = PhaseTimer(file_result.phase_wall, file_result.phase_cpu)
+  with timer.phase("read"):
+    return path.read_bytes()
+
+
+def _write_dest(path: Path, text: str, file_result: FileResult, fsync: bool) -> None:
+  """Write output text, timing the write on the file's result."""
+  timer = PhaseTimer(file_result.phase_wall, file_result.phase_cpu)
+  with timer.phase("write"):
+    file_result.unchanged = not write_output(path, text, fsync=fsync)
+
+
+def fsync_paths(paths: list[Path]) -> None:
+  """Flush written files and their parent directories to stable storage.
+
+  Each distinct directory is synced once per batch.
+
+  Args:
+    paths: Files written since the last batch
+  """
+  directories = set()
+  for path in paths:
+    fsync_file(path)
+    directories.add(path.parent)
+  for directory in directories:
+    fsync_file(directory)
+
+
+async def _run_pipeline(
+  items: Iterable[MigrationTask | FileResult],
+  emit: Any,
+  stop: threading.Event,
+  dry_run: bool,
+  yaml_engine: str,
+  jobs: int,
+  read_ahead: int,
+  write_concurrency: int,
+  fsync_batch: int,
+  cache_size: int,
+  fsync: bool,
+  collect_output: bool,
+  multi_document: bool,
+  section_workers: int,
+  section_threshold: int,
+  check_regex: bool,
+  validate: bool,
+  taxon_snapshot: Path | None,
+  clock: ClockSnapshot | None,
+  scan_publications: bool,
+) -> None:
+  """Run the read -> convert -> write stages, emitting results in order.
+
+  Once stop is set no new source is read, converted or written; jobs
+  already in flight drain without output.
+  """
+  loop = asyncio.get_running_loop()
+  read_queue: asyncio.Queue[_Job | None] = asyncio.Queue(maxsize=read_ahead)
+  convert_queue: asyncio.Queue[_Job | None] = asyncio.Queue(maxsize=max(1, jobs) * 2)
+  write_queue: asyncio.Queue[_Job | None] = asyncio.Queue(maxsize=write_concurrency * 2)
+
+  executor: Executor
+  if jobs > 1:
+    executor = ProcessPoolExecutor(
+      max_workers=jobs,
+      initializer=init_worker,
+      initargs=(
+        yaml_engine,
+        cache_size,
+        section_workers,
+        section_threshold,
+        check_regex,
+        validate,
+        taxon_snapshot,
+        clock,
+        scan_publications,
+      ),
+    )
+  else:
+    # A single thread owns the YAML instance
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="migratassert-convert")
+    yaml = get_yaml(yaml_engine)
+
+  def convert_locally(
+    raw: bytes,
+    file_result: FileResult,
+    file_stem: str | None,
+    render: bool,
+    multi_document: bool,
+  ) -> tuple[list[FileResult], str | None]:
+    if multi_document:
+      return convert_documents(raw, file_result, yaml, file_stem=file_stem, render=render)
+    return ([file_result], convert_source(raw, file_result, yaml, file_stem=file_stem, render=render))
+
+  convert_fn = convert_in_worker if jobs > 1 else convert_locally
+
+  pending: dict[int, list[FileResult]] = {}
+  next_index = 0
+  unsynced: list[Path] = []
+
+  def finish(job: _Job) -> None:
+    nonlocal next_index
+    pending[job.index] = job.documents or [job.file_result]
+    while next_index in pending:
+      for file_result in pending.pop(next_index):
+        emit(file_result)
+      next_index += 1
+
+  async def reader() -> None:
+    iterator = iter(items)
+    index = 0
+    while not stop.is_set():
+      # Discovery and hashing may touch the disk, so keep them off the loop
+      item = await asyncio.to_thread(next, iterator, _DONE)
+      if item is _DONE:
+        break
+      if isinstance(item, FileResult):
+        job = _Job(index=index, file_result=item, resolved=True)
+      else:
+        source_path, dest_path, file_stem, raw = unpack_task(item)
+        file_result = FileResult(source_path=source_path, dest_path=dest_path, success=False)
+        job = _Job(index=index, file_result=file_result, file_stem=file_stem)
+        if raw is None:
+          job.read = asyncio.create_task(
+            asyncio.to_thread(_read_source, source_path, file_result)
+          )
+        else:
+          job.read = loop.create_future()
+          job.read.set_result(raw)
+      await read_queue.put(job)
+      index += 1
+    await read_queue.put(None)
+
+  async def converter() -> None:
+    while (job := await read_queue.get()) is not None:
+      if stop.is_set():
+        continue
+      if not job.resolved:
+        try:
+          raw = await job.read
+        except Exception as e:
+          job.file_result.error = str(e)
+          job.resolved = True
+        else:
+          job.converted = loop.run_in_executor(
+            executor,
+            convert_fn,
+            raw,
+            job.file_result,
+            job.file_stem,
+            not dry_run,
+            multi_document,
+          )
+      await convert_queue.put(job)
+    await convert_queue.put(None)
+
+  async def collector() -> None:
+    while (job := await convert_queue.get()) is not None:
+      if job.converted is not None:
+        try:
+          job.documents, job.text = await job.converted
+          # Process pools hand back copies, so rebind to the returned result
+          job.file_result = job.documents[0]
+        except Exception as e:
+          job.file_result.error = str(e)
+      await write_queue.put(job)
+    for _ in range(write_concurrency):
+      await write_queue.put(None)
+
+  async def writer() -> None:
+    while (job := await write_queue.get()) is not None:
+      if stop.is_set():
+        continue
+      if collect_output:
+        job.file_result.output_text = job.text
+      elif job.text is not None:
+        try:
+          await asyncio.to_thread(
+            _write_dest, job.file_result.dest_path, job.text, job.file_result, fsync
+          )
+        except Exception as e:
+          for file_result in job.documents or [job.file_result]:
+            file_result.success = False
+            file_result.error = str(e)
+        else:
+          for file_result in job.documents:
+            file_result.unchanged = job.file_result.unchanged
+          if fsync_batch > 0 and not job.file_result.unchanged:
+            unsynced.append(job.file_result.dest_path)
+            if len(unsynced) >= fsync_batch:
+              batch = unsynced[:]
+              unsynced.clear()
+              await asyncio.to_thread(fsync_paths, batch)
+      finish(job)
+
+  try:
+    await asyncio.gather(
+      reader(),
+      converter(),
+      collector(),
+      *(writer() for _ in range(write_concurrency)),
+    )
+    if unsynced:
+      await asyncio.to_thread(fsync_paths, unsynced)
+  finally:
+    executor.shutdown(wait=True)
+
+
+def iter_pipeline_results(
+  items: Iterable[MigrationTask | FileResult],
+  dry_run: bool = False,
+  yaml_engine: str = "roundtrip",
+  jobs: int = 1,
+  read_ahead: int = 16,
+  write_concurrency: int = 4,
+  fsync_batch: int = 0,
+  cache_size: int = 0,
+  fsync: bool = False,
+  collect_output: bool = False,
+  multi_document: bool = False,
+  section_workers: int = 0,
+  section_threshold: int = DEFAULT_SECTION_THRESHOLD,
+  check_regex: bool = False,
+  validate: bool = True,
+  taxon_snapshot: Path | None = None,
+  clock: ClockSnapshot | None = None,
+  scan_publications: bool = False,
+) -> Generator[FileResult, None, None]:
+  """Migrate planned files through the asyncio pipeline.
+
+  Source bytes are prefetched up to read_ahead files ahead of the
+  converter, conversions run on one thread (or a process pool when
+  jobs > 1), and finished YAML is written by concurrent writers. The
+  pipeline runs on a background thread; results are yielded here in
+  the same order as items, like iter_file_results. At most
+  RESULT_QUEUE_SIZE results wait for the consumer; closing the
+  generator early stops the pipeline before it returns.
+
+  Args:
+    items: MigrationTasks to migrate, or already-resolved FileResults to
+      pass through in place
+    dry_run: If True, don't write files
+    yaml_engine: One of YAML_ENGINES
+    jobs: Number of conversion worker processes (1 uses a thread)
+    read_ahead: Maximum number of sources read ahead of conversion
+    write_concurrency: Number of concurrent writers
+    fsync_batch: fsync written files and their directories every this
+      many files (0 disables fsync)
+    cache_size: BLOCK_CACHE size for each worker process when jobs > 1
+    fsync: If True, flush each output to disk before renaming it into place
+    collect_output: If True, return dumped YAML on FileResult.output_text
+      instead of writing it
+    multi_document: If True, treat each source as a multi-document
+      stream (see migrate_documents)
+    section_workers: SECTION_POOL size for each worker process when
+      jobs > 1 (the single converter thread uses the in-process pool)
+    section_threshold: Sections a config needs before SECTION_POOL is used
+    check_regex: REGEX_CHECK setting for each worker process when jobs > 1
+    validate: SCHEMA_VALIDATION setting for each worker process when jobs > 1
+    taxon_snapshot: TAXON_TABLE snapshot for each worker process when jobs > 1
+    clock: RUN_CLOCK snapshot for each worker process when jobs > 1
+    scan_publications: PUBLICATION_SCAN setting for each worker process
+      when jobs > 1
+
+  Yields:
+    FileResult for each item (one per document in multi-document
+    mode), in the same order as items
+  """
+  results: queue.Queue[Any] = queue.Queue(maxsize=RESULT_QUEUE_SIZE)
+  stop = threading.Event()
+
+  def run() -> None:
+    try:
+      asyncio.run(
+        _run_pipeline(
+          items,
+          results.put,
+          stop,
+          dry_run=dry_run,
+          yaml_engine=yaml_engine,
+          jobs=jobs,
+          read_ahead=max(1, read_ahead),
+          write_concurrency=max(1, write_concurrency),
+          fsync_batch=fsync_batch,
+          cache_size=cache_size,
+          fsync=fsync,
+          collect_output=collect_output,
+          multi_document=multi_document,
+          section_workers=section_workers,
+          section_threshold=section_threshold,
+          check_regex=check_regex,
+          validate=validate,
+          taxon_snapshot=taxon_snapshot,
+          clock=clock,
+          scan_publications=scan_publications,
+        )
+      )
+    except BaseException as e:
+      results.put(_Failure(e))
+    else:
+      results.put(_DONE)
+
+  thread = threading.Thread(target=run, name="migratassert-pipeline", daemon=True)
+  thread.start()
+  try:
+    while True:
+      item = results.get()
+      if item is _DONE:
+        break
+      if isinstance(item, _Failure):
+        raise item.error
+      yield item
+  finally:
+    # The consumer may stop early (a failing sink, a closed generator):
+    # stop the stages, and drain the queue so a pipeline blocked on a
+    # full queue can finish
+    stop.set()
+    while thread.is_alive():
+      try:
+        results.get(timeout=0.05)
+      except queue.Empty:
+        pass
+    thread.join()
@@ -1,13 +1,37 @@
 """Map provenance block to TC3 format."""
 
-from datetime import datetime
+import re
+from functools import lru_cache
 from typing import Any
 
+from migratassert.clock import RUN_CLOCK
 from migratassert.encoding import MapResult
 
 # Known publication CURIE prefixes
 PUBLICATION_REPOS = {"PMC", "PMID", "DOI"}
 
+# Distinct publication strings kept normalized per process
+PUBLICATION_CACHE_SIZE = 4096
+
+# URL forms of publication IDs -> repo
+_PUBLICATION_URLS = [
+  (re.compile(r"(?:https?://)?(?:dx\.)?doi\.org/(10\..+)", re.IGNORECASE), "DOI"),
+  (
+    re.compile(r"(?:https?://)?(?:www\.)?(?:pubmed\.ncbi\.nlm\.nih\.gov|ncbi\.nlm\.nih\.gov/pubmed)/(\d+)/?", re.IGNORECASE),
+    "PMID",
+  ),
+  (
+    re.compile(
+      r"(?:https?://)?(?:www\.)?(?:pmc\.ncbi\.nlm\.nih\.gov|ncbi\.nlm\.nih\.gov/pmc)/articles/PMC(\d+)/?",
+      re.IGNORECASE,
+    ),
+    "PMC",
+  ),
+]
+
+# A DOI written without a prefix
+_BARE_DOI = re.compile(r"10\.\d{4,9}/\S+")
+
 
 def parse_publication_curie(curie: str) -> tuple[str, str]:
   """Parse publication CURIE into repo and ID.
@@ -24,25 +48,83 @@ def parse_publication_curie(curie: str) -> tuple[str, str]:
   return (repo.upper(), pub_id)
 
 
-def map_provenance(provenance: dict[str, Any]) -> MapResult:
+@lru_cache(maxsize=PUBLICATION_CACHE_SIZE)
+def normalize_publication(publication: str) -> tuple[str, str, str | None]:
+  """Canonicalize a publication CURIE or URL, memoized.
+
+  URL forms (doi.org, PubMed and PMC article links) and bare DOIs become
+  CURIEs. DOIs are case-insensitive, so they are lowercased. A "PMC"
+  prefix repeated in a PMC ID is removed.
+
+  Args:
+    publication: Value of provenance.publication
+
+  Returns:
+    Tuple of (repo, publication_id, problem). repo is "" unless it is
+    in PUBLICATION_REPOS; problem describes a value that could not be
+    fully validated, or is None
+  """
+  text = publication.strip()
+  for pattern, url_repo in _PUBLICATION_URLS:
+    match = pattern.fullmatch(text)
+    if match:
+      repo, pub_id = url_repo, match.group(1)
+      break
+  else:
+    if _BARE_DOI.fullmatch(text):
+      repo, pub_id = ("DOI", text)
+    else:
+      repo, pub_id = parse_publication_curie(text)
+      pub_id = pub_id.strip()
+
+  if repo == "DOI":
+    return (repo, pub_id.lower(), None)
+  if repo == "PMC" and pub_id[:3].upper() == "PMC":
+    pub_id = pub_id[3:]
+  if repo in ("PMC", "PMID"):
+    problem = None if pub_id.isdecimal() else f"malformed {repo} ID {pub_id!r}"
+    return (repo, pub_id, problem)
+  if not repo:
+    return ("", pub_id, f"no publication repo in {publication!r}")
+  expected = ", ".join(sorted(PUBLICATION_REPOS))
+  return ("", pub_id, f"unknown publication repo {repo!r} (expected {expected})")
+
+
+def publication_key(publication: Any) -> str:
+  """Return the canonical "REPO:id" for a publication value.
+
+  Values without a known repo are returned stripped but otherwise as
+  written, so unrelated IDs never collide.
+  """
+  text = str(publication)
+  repo, pub_id, _ = normalize_publication(text)
+  return f"{repo}:{pub_id}" if repo else text.strip()
+
+
+def map_provenance(provenance: dict[str, Any], contributor_date: str | None = None) -> MapResult:
   """Map v4.4.0 provenance to TC3 provenance.
 
   Args:
     provenance: Source provenance dict with publication,
       config_curator_name, config_curator_organization,
       config_curator_date (optional)
+    contributor_date: Date for a contributor without config_curator_date;
+      defaults to the run's date from RUN_CLOCK
 
   Returns:
     MapResult with TC3 provenance block
   """
   dropped: list[str] = []
+  warnings: list[str] = []
   tc3_prov: dict[str, Any] = {}
 
   if "publication" in provenance:
-    repo, pub_id = parse_publication_curie(provenance["publication"])
-    if repo in PUBLICATION_REPOS:
+    repo, pub_id, problem = normalize_publication(str(provenance["publication"]))
+    if repo:
       tc3_prov["repo"] = repo
     tc3_prov["publication"] = pub_id
+    if problem is not None:
+      warnings.append(f"provenance.publication: {problem}")
 
   if "config_curator_name" in provenance:
     contributor: dict[str, Any] = {
@@ -54,7 +136,7 @@ def map_provenance(provenance: dict[str, Any]) -> MapResult:
     if "config_curator_date" in provenance:
       contributor["date"] = provenance["config_curator_date"]
     else:
-      contributor["date"] = datetime.now().strftime("%d %b %Y").upper()
+      contributor["date"] = contributor_date or RUN_CLOCK.contributor_date()
 
     if "config_curator_organization" in provenance:
       contributor["organizations"] = [provenance["config_curator_organization"]]
@@ -64,4 +146,4 @@ def map_provenance(provenance: dict[str, Any]) -> MapResult:
 
     tc3_prov["contributors"] = [contributor]
 
-  return MapResult(mapped=tc3_prov, dropped=dropped)
+  return MapResult(mapped=tc3_prov, dropped=dropped, warnings=warnings)
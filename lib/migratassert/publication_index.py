@@ -0,0 +1,115 @@
+"""Corpus-wide index of publications and the files migrated from them."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+from migratassert.provenance import publication_key
+from migratassert.transform import find_sections
+from migratassert.writer import write_atomic
+
+# Index filename written into the output directory
+PUBLICATION_INDEX_NAME = ".migratassert-publications.json"
+
+# Bumped when the file layout changes
+PUBLICATION_INDEX_FORMAT = 1
+
+
+def default_publication_index_path(outdir: Path) -> Path:
+  """Return where a run writes its publication index.
+
+  Args:
+    outdir: Output directory, or output archive path
+
+  Returns:
+    PUBLICATION_INDEX_NAME inside a directory, or
+    "<archive>.publications.json" beside an archive
+  """
+  from migratassert.archive import is_archive
+
+  if is_archive(outdir):
+    return outdir.with_name(f"{outdir.name}.publications.json")
+  return outdir / PUBLICATION_INDEX_NAME
+
+
+def find_publications(v440_config: Any) -> list[str]:
+  """List the distinct canonical publications a v4.4.0 config cites.
+
+  Args:
+    v440_config: Parsed v4.4.0 document
+
+  Returns:
+    publication_key values from the template and every section, in
+    document order
+  """
+  if not isinstance(v440_config, dict):
+    return []
+  template = v440_config.get("template") or {}
+  blocks = [template, *(find_sections(v440_config) or [])]
+  found: dict[str, None] = {}
+  for block in blocks:
+    provenance = block.get("provenance") if isinstance(block, dict) else None
+    if isinstance(provenance, dict) and provenance.get("publication") is not None:
+      found[publication_key(provenance["publication"])] = None
+  return list(found)
+
+
+class PublicationScan:
+  """Process-wide switch for collecting publications; disabled until configured."""
+
+  def __init__(self) -> None:
+    self.enabled = False
+
+
+PUBLICATION_SCAN = PublicationScan()
+
+
+def configure_publication_scan(enabled: bool) -> None:
+  """Enable or disable collecting publications in this process.
+
+  Args:
+    enabled: If True, convert_source records every source's
+      publications on FileResult.publications
+  """
+  PUBLICATION_SCAN.enabled = enabled
+
+
+class PublicationIndex:
+  """Publication -> migrated files, built as results stream in."""
+
+  def __init__(self) -> None:
+    self.files: dict[str, dict[str, None]] = {}
+
+  def add(self, publications: list[str], dest: str) -> None:
+    """Record that an output file was migrated from these publications.
+
+    Args:
+      publications: Canonical publications (see find_publications)
+      dest: Output path relative to the output directory
+    """
+    for publication in publications:
+      self.files.setdefault(publication, {})[dest] = None
+
+  def save(self, path: Path) -> None:
+    """Write the index as JSON, replacing any previous one.
+
+    Args:
+      path: Index file to write
+    """
+    payload = {
+      "format": PUBLICATION_INDEX_FORMAT,
+      "publications": {publication: list(files) for publication, files in sorted(self.files.items())},
+    }
+    write_atomic(path, (json.dumps(payload, indent=2) + "\n").encode("utf-8"))
+
+
+def load_publication_index(path: Path) -> dict[str, list[str]]:
+  """Read a publication index written by PublicationIndex.save.
+
+  Args:
+    path: Index file
+
+  Returns:
+    Output files keyed by canonical publication
+  """
+  return json.loads(path.read_text())["publications"]
@@ -0,0 +1,223 @@
+"""Optional validation of migrated regular_expressions hyperparameters.
+
+Patterns are copied into TC3 `regex` unchanged, so a broken pattern only
+surfaces when Tablassert applies it to a large table. REGEX_CHECK compiles
+each distinct pattern once per process and flags ones that fail to
+compile or whose shape is prone to catastrophic backtracking.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from migratassert.paths import format_path
+
+# v4.4.0 hyperparameter holding a pattern or list of patterns
+REGEX_KEY = "regular_expressions"
+
+# Key holding the pattern in a {pattern: ..., replacement: ...} entry
+PATTERN_KEY = "pattern"
+
+# Distinct patterns kept compiled per process
+PATTERN_CACHE_SIZE = 8192
+
+# Characters used to compare what alternatives can start with
+_ASCII = frozenset(map(chr, range(128)))
+
+try:
+  # CPython's private parser, used only for the backtracking heuristics;
+  # without it (another interpreter, or a release that moves it) patterns
+  # are still compiled and invalid ones still flagged
+  import re._constants as sre
+  import re._parser as sre_parse
+
+  _REPEATS = (sre.MAX_REPEAT, sre.MIN_REPEAT)
+  _CATEGORIES = {
+    sre.CATEGORY_DIGIT: r"\d",
+    sre.CATEGORY_NOT_DIGIT: r"\D",
+    sre.CATEGORY_SPACE: r"\s",
+    sre.CATEGORY_NOT_SPACE: r"\S",
+    sre.CATEGORY_WORD: r"\w",
+    sre.CATEGORY_NOT_WORD: r"\W",
+  }
+except (ImportError, AttributeError):
+  sre = sre_parse = None
+
+
+@dataclass(frozen=True)
+class PatternCheck:
+  """Verdict on one pattern: the compiled pattern and any problem found."""
+
+  compiled: re.Pattern[str] | None
+  problem: str | None
+
+
+def _category_chars(category: Any) -> frozenset[str]:
+  return frozenset(
+    char for char in _ASCII if re.fullmatch(_CATEGORIES.get(category, "(?!)"), char)
+  )
+
+
+def _first_chars(item: tuple[Any, Any]) -> frozenset[str] | None:
+  """ASCII characters a branch's first item can match, or None if unknown."""
+  op, av = item
+  if op is sre.ANY:
+    return _ASCII
+  if op is sre.LITERAL:
+    return frozenset(chr(av))
+  if op is sre.NOT_LITERAL:
+    return _ASCII - {chr(av)}
+  if op is sre.IN:
+    chars: set[str] = set()
+    negate = False
+    for set_op, set_av in av:
+      if set_op is sre.NEGATE:
+        negate = True
+      elif set_op is sre.LITERAL:
+        chars.add(chr(set_av))
+      elif set_op is sre.RANGE:
+        chars.update(chr(code) for code in range(set_av[0], min(set_av[1], 127) + 1))
+      elif set_op is sre.CATEGORY:
+        chars |= _category_chars(set_av)
+      else:
+        return None
+    return _ASCII - chars if negate else frozenset(chars)
+  return None
+
+
+def _overlapping_branches(branches: list[Any]) -> bool:
+  """Check whether two alternatives could start matching the same character."""
+  seen: set[str] = set()
+  unknown: set[str] = set()
+  for branch in branches:
+    if not branch:
+      continue
+    chars = _first_chars(branch[0])
+    if chars is None:
+      # Fall back to comparing the items themselves
+      key = repr(branch[0])
+      if key in unknown:
+        return True
+      unknown.add(key)
+    elif seen & chars:
+      return True
+    else:
+      seen |= chars
+  return False
+
+
+def _backtracking_risk(items: Any, in_repeat: bool = False) -> str | None:
+  """Find nested unbounded quantifiers or ambiguous quantified alternations."""
+  for op, av in items:
+    if op in _REPEATS:
+      _, high, body = av
+      unbounded = high == sre.MAXREPEAT
+      if unbounded and in_repeat:
+        return "nested quantifier"
+      risk = _backtracking_risk(body, in_repeat or unbounded)
+    elif op is sre.SUBPATTERN:
+      risk = _backtracking_risk(av[3], in_repeat)
+    elif op is sre.BRANCH:
+      if in_repeat and _overlapping_branches(av[1]):
+        return "quantified alternation with overlapping branches"
+      risk = next(filter(None, (_backtracking_risk(b, in_repeat) for b in av[1])), None)
+    elif op in (sre.ASSERT, sre.ASSERT_NOT):
+      risk = _backtracking_risk(av[1], in_repeat)
+    else:
+      # Atomic groups and possessive repeats never backtrack into themselves
+      risk = None
+    if risk is not None:
+      return risk
+  return None
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def check_pattern(pattern: str) -> PatternCheck:
+  """Compile a pattern and check it for backtracking hazards, memoized.
+
+  Args:
+    pattern: Regular expression text
+
+  Returns:
+    PatternCheck; problem is None for a valid, low-risk pattern
+  """
+  try:
+    compiled = re.compile(pattern)
+  except re.error as e:
+    return PatternCheck(None, f"invalid regex: {e}")
+  if sre_parse is None:
+    return PatternCheck(compiled, None)
+  risk = _backtracking_risk(sre_parse.parse(pattern))
+  if risk is not None:
+    return PatternCheck(compiled, f"possible catastrophic backtracking: {risk}")
+  return PatternCheck(compiled, None)
+
+
+def find_regex_issues(config: Any) -> list[str]:
+  """Check every regular_expressions value in a parsed v4.4.0 config.
+
+  Args:
+    config: Parsed v4.4.0 document
+
+  Returns:
+    One "path: problem (pattern)" line per flagged pattern, in document
+    order, e.g. "template.triple.triple_subject.mapping_hyperparameters.
+    regular_expressions[0]: invalid regex: ..."
+  """
+  issues: list[str] = []
+  stack: list[tuple[Any, tuple[str | int, ...]]] = [(config, ())]
+  while stack:
+    node, path = stack.pop()
+    if isinstance(node, dict):
+      for key, value in reversed(list(node.items())):
+        if key == REGEX_KEY:
+          issues.extend(_check_value(value, (*path, key)))
+        elif isinstance(value, (dict, list)):
+          stack.append((value, (*path, str(key))))
+    elif isinstance(node, list):
+      for index in range(len(node) - 1, -1, -1):
+        if isinstance(node[index], (dict, list)):
+          stack.append((node[index], (*path, index)))
+  return issues
+
+
+def _patterns(value: Any, path: tuple[str | int, ...]) -> list[tuple[tuple[str | int, ...], str]]:
+  """Collect (path, pattern) pairs from a string, {pattern: ...} entry or list of either."""
+  if isinstance(value, str):
+    return [(path, value)]
+  if isinstance(value, dict):
+    pattern = value.get(PATTERN_KEY)
+    return [((*path, PATTERN_KEY), pattern)] if isinstance(pattern, str) else []
+  if isinstance(value, list):
+    return [pair for index, item in enumerate(value) for pair in _patterns(item, (*path, index))]
+  return []
+
+
+def _check_value(value: Any, path: tuple[str | int, ...]) -> list[str]:
+  """Check every pattern in a regular_expressions value; other values are left alone."""
+  issues = []
+  for pattern_path, pattern in _patterns(value, path):
+    problem = check_pattern(str(pattern)).problem
+    if problem is not None:
+      issues.append(f"{format_path(pattern_path)}: {problem} ({str(pattern)!r})")
+  return issues
+
+
+class RegexCheck:
+  """Process-wide switch for regex validation; disabled until configured."""
+
+  def __init__(self) -> None:
+    self.enabled = False
+
+
+REGEX_CHECK = RegexCheck()
+
+
+def configure_regex_check(enabled: bool) -> None:
+  """Enable or disable regex validation in this process.
+
+  Args:
+    enabled: If True, convert_source checks every source's patterns
+  """
+  REGEX_CHECK.enabled = enabled
@@ -1,6 +1,21 @@
 """Migration report generation."""
 
-from migratassert.migrate import MigrationResult
+from migratassert.migrate import MigrationResult, result_name
+from migratassert.timing import Distribution
+
+
+def format_bytes(size: float) -> str:
+  """Format a byte count with a binary unit (e.g. "1.5 MiB")."""
+  for unit in ("B", "KiB", "MiB", "GiB"):
+    if size < 1024 or unit == "GiB":
+      break
+    size /= 1024
+  return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+
+
+def _omitted(count: int) -> list[str]:
+  """Line noting details left out of a streamed run's report, if any."""
+  return [f"  ... and {count} more (per-file details are in the events)"] if count > 0 else []
 
 
 def format_report(result: MigrationResult) -> str:
@@ -20,8 +35,30 @@ def format_report(result: MigrationResult) -> str:
     f"Files processed: {result.files_processed}",
     f"  Succeeded: {result.files_succeeded}",
     f"  Failed: {result.files_failed}",
-    "",
   ]
+  if result.files_skipped:
+    lines.append(f"  Skipped (unchanged): {result.files_skipped}")
+  if result.files_unchanged:
+    lines.append(f"  Output identical (not rewritten): {result.files_unchanged}")
+  lines.append("")
+
+  if result.output_estimated and result.files_succeeded > result.files_skipped:
+    lines.append(
+      f"Estimated output size: {format_bytes(result.output_bytes)} ({result.output_bytes} bytes)"
+    )
+    lines.append("")
+
+  if result.publication_count:
+    lines.append(f"Publication index: {result.publication_count} publications")
+    lines.append("")
+
+  lookups = result.cache_hits + result.cache_misses
+  if lookups:
+    lines.append(
+      f"Block cache: {result.cache_hits} hits, {result.cache_misses} misses "
+      f"({result.cache_hits / lookups:.1%} hit rate)"
+    )
+    lines.append("")
 
   if result.all_dropped_fields:
     lines.append("Dropped fields (across all files):")
@@ -32,31 +69,124 @@ def format_report(result: MigrationResult) -> str:
       lines.append(f"  {field_name}: {count} occurrences")
     lines.append("")
 
-  if result.files_failed > 0:
+  if result.warning_count:
+    lines.append("Warnings (values kept unconverted):")
+    for name, warning in result.warnings:
+      lines.append(f"  {name}: {warning}")
+    lines.extend(_omitted(result.warning_count - len(result.warnings)))
+    lines.append("")
+
+  if result.regex_issue_count:
+    lines.append("Regex issues:")
+    for name, issue in result.regex_issues:
+      lines.append(f"  {name}: {issue}")
+    lines.extend(_omitted(result.regex_issue_count - len(result.regex_issues)))
+    lines.append("")
+
+  violations = {name: stats.violations for name, stats in result.rule_stats.items() if stats.violations}
+  if violations:
+    lines.append(f"TC3 schema violations ({result.files_invalid} files):")
+    for name, count in sorted(violations.items(), key=lambda x: (-x[1], x[0])):
+      lines.append(f"  {name}: {count} violations")
+    lines.append("")
+
+  if result.failures:
     lines.append("Failed files:")
-    for fr in result.file_results:
-      if not fr.success:
-        lines.append(f"  {fr.source_path.name}: {fr.error}")
+    for name, error in result.failures:
+      lines.append(f"  {name}: {error}")
     lines.append("")
 
   lines.append("=" * 60)
   return "\n".join(lines)
 
 
-def print_report(result: MigrationResult, verbose: bool = False) -> None:
+def format_timing_report(result: MigrationResult) -> str:
+  """Format per-phase timing and size distributions.
+
+  Args:
+    result: MigrationResult from batch migration
+
+  Returns:
+    Formatted p50/p95/max tables and the slowest files
+  """
+  lines = ["Phase timings (ms, per file):"]
+  lines.append(f"  {'phase':<10} {'wall p50':>10} {'p95':>10} {'max':>10} {'cpu p50':>10} {'p95':>10} {'max':>10}")
+  for phase, wall in result.phase_wall.items():
+    cpu = result.phase_cpu.get(phase, Distribution())
+    row = [
+      wall.percentile(50), wall.percentile(95), wall.maximum,
+      cpu.percentile(50), cpu.percentile(95), cpu.maximum,
+    ]
+    lines.append(f"  {phase:<10} " + " ".join(f"{v * 1000:>10.2f}" for v in row))
+  lines.append("")
+
+  lines.append("File sizes and counts:")
+  lines.append(f"  {'stat':<13} {'p50':>10} {'p95':>10} {'max':>10} {'total':>12}")
+  for name, dist in result.file_stats.items():
+    row = [dist.percentile(50), dist.percentile(95), dist.maximum]
+    lines.append(
+      f"  {name:<13} " + " ".join(f"{v:>10.0f}" for v in row) + f" {dist.total:>12.0f}"
+    )
+  lines.append("")
+
+  if result.rule_stats:
+    lines.append("Schema rules (total):")
+    lines.append(f"  {'rule':<18} {'checks':>10} {'violations':>10} {'ms':>10} {'us/check':>10}")
+    for name, stats in sorted(result.rule_stats.items(), key=lambda x: -x[1].seconds):
+      per_check = stats.seconds / stats.checks * 1e6 if stats.checks else 0.0
+      lines.append(
+        f"  {name:<18} {stats.checks:>10} {stats.violations:>10} "
+        f"{stats.seconds * 1000:>10.2f} {per_check:>10.2f}"
+      )
+    lines.append("")
+
+  slowest = result.slowest_files.items()
+  if slowest:
+    lines.append("Slowest files (wall ms):")
+    for seconds, name in slowest:
+      lines.append(f"  {seconds * 1000:>10.2f}  {name}")
+    lines.append("")
+
+  return "\n".join(lines)
+
+
+def print_report(
+  result: MigrationResult,
+  verbose: bool = False,
+  timings: bool = False,
+) -> None:
   """Print migration report to stdout.
 
   Args:
     result: MigrationResult from batch migration
     verbose: If True, show per-file details
+    timings: If True, show per-phase timing tables
   """
   print(format_report(result))
 
+  if timings and result.phase_wall:
+    print()
+    print(format_timing_report(result))
+
   if verbose and result.file_results:
     print("\nPer-file details:")
     for fr in result.file_results:
-      status = "OK" if fr.success else "FAILED"
-      print(f"  [{status}] {fr.source_path.name}")
+      if not fr.success:
+        status = "FAILED"
+      elif fr.skipped:
+        status = "SKIPPED"
+      elif fr.unchanged:
+        status = "UNCHANGED"
+      else:
+        status = "OK"
+      print(f"  [{status}] {result_name(fr)}")
       if fr.dropped_fields:
         for field_name in fr.dropped_fields:
           print(f"         dropped: {field_name}")
+      for warning in fr.warnings:
+        print(f"         warning: {warning}")
+      for issue in fr.regex_issues:
+        print(f"         regex: {issue}")
+      if fr.validation is not None:
+        for violation in fr.validation.violations:
+          print(f"         schema: {violation}")
@@ -0,0 +1,188 @@
+"""Transform and dump the sections of very large configs across processes.
+
+A config with thousands of sections keeps one converter busy long after
+the rest of a batch is done, and almost all of that time is the YAML
+dump. SECTION_POOL splits such a config's sections into one chunk per
+worker; each worker maps and dumps its chunk, and the parent splices
+the chunk texts after the dumped template. Chunks are merged in order,
+so the output text and dropped_fields are identical to the serial path.
+"""
+
+import math
+from collections.abc import Iterator
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from io import StringIO
+from pathlib import Path
+from typing import Any
+
+from migratassert.clock import RUN_CLOCK, ClockSnapshot, configure_run_clock
+from migratassert.taxon import TAXON_TABLE, configure_taxon_table
+from migratassert.transform import map_sections
+from migratassert.validate import ValidationReport, validate_sections
+
+# Sections a config needs before SECTION_POOL splits it
+DEFAULT_SECTION_THRESHOLD = 1000
+
+# Key the sections list is dumped under, at the end of the document
+_SECTIONS_KEY = "sections"
+
+
+@dataclass
+class SectionChunk:
+  """One worker's share of a split config."""
+
+  text: str
+  dropped_fields: list[str]
+  dropped_blocks: list[str]
+  annotation_count: int
+  warnings: list[str]
+  validation: ValidationReport | None = None
+
+
+def render_sections(
+  sections: list[dict[str, Any]],
+  start: int,
+  yaml_engine: str,
+  validate: bool = False,
+) -> SectionChunk:
+  """Pool task: map a chunk of sections and dump it as "sections:" YAML.
+
+  Args:
+    sections: Consecutive v4.4.0 sections
+    start: Index of the first section within the config
+    yaml_engine: One of YAML_ENGINES (matches the parent's dump)
+    validate: If True, also validate the mapped sections
+
+  Returns:
+    SectionChunk whose text is a complete "sections:" mapping
+  """
+  # migrate imports this module, so import its YAML factory on use
+  from migratassert.migrate import get_yaml
+
+  tc3_sections, dropped, blocks, warnings = map_sections(sections, start)
+  stream = StringIO()
+  get_yaml(yaml_engine).dump({_SECTIONS_KEY: tc3_sections}, stream)
+  annotations = sum(len(section.get("annotations") or []) for section in tc3_sections)
+  validation = validate_sections(tc3_sections, start) if validate else None
+  return SectionChunk(stream.getvalue(), dropped, blocks, annotations, warnings, validation)
+
+
+def init_section_worker(taxon_snapshot: Path | None, clock: ClockSnapshot) -> None:
+  """Give a section worker the parent's taxon snapshot and run clock."""
+  configure_taxon_table(taxon_snapshot)
+  configure_run_clock(clock)
+
+
+def has_anchored_scalars(value: Any) -> bool:
+  """Check whether a parsed tree holds scalars carrying a YAML anchor.
+
+  The round-trip engine dumps aliased scalars as &anchor / *alias pairs,
+  which only come out right when both ends are dumped together. Shared
+  mappings and lists are always written out in full, so they are safe.
+
+  Args:
+    value: Parsed YAML document
+
+  Returns:
+    True if any scalar has an anchor
+  """
+  stack = [value]
+  while stack:
+    node = stack.pop()
+    if isinstance(node, dict):
+      stack.extend(node.values())
+    elif isinstance(node, list):
+      stack.extend(node)
+    else:
+      anchor = getattr(node, "anchor", None)
+      if anchor is not None and anchor.value is not None:
+        return True
+  return False
+
+
+class SectionPool:
+  """Optional process pool for the sections of very large configs.
+
+  Disabled until configured, and started on first use, so processes
+  that never meet a config with threshold or more sections never fork.
+  """
+
+  def __init__(self) -> None:
+    self.workers = 0
+    self.threshold = DEFAULT_SECTION_THRESHOLD
+    self._executor: Executor | None = None
+    self._finalizer: Any = None
+
+  def wants(self, section_count: int) -> bool:
+    """Check whether a config with this many sections should be split."""
+    return self.workers > 1 and section_count >= self.threshold
+
+  def submit(
+    self,
+    sections: list[dict[str, Any]],
+    yaml_engine: str,
+    validate: bool = False,
+  ) -> list["Future[SectionChunk]"]:
+    """Start rendering sections in one chunk per worker.
+
+    Args:
+      sections: All of a config's v4.4.0 sections
+      yaml_engine: One of YAML_ENGINES
+      validate: If True, each chunk also validates its sections
+
+    Returns:
+      Futures in section order
+    """
+    if self._executor is None:
+      from concurrent.futures import ProcessPoolExecutor
+      from multiprocessing.util import Finalize
+
+      # Workers resolve taxa and date contributors as this process does
+      snapshot = TAXON_TABLE.snapshot.path if TAXON_TABLE.snapshot is not None else None
+      self._executor = ProcessPoolExecutor(
+        max_workers=self.workers,
+        initializer=init_section_worker,
+        initargs=(snapshot, RUN_CLOCK.current()),
+      )
+      # In a --jobs worker, multiprocessing's exit handler joins every
+      # child process, so stop this pool first or the worker never
+      # exits. The priority runs this before the queue finalizers
+      # (priority 10) that would drop the pool's shutdown sentinels.
+      self._finalizer = Finalize(self, self.shutdown, exitpriority=100)
+    size = math.ceil(len(sections) / self.workers)
+    return [
+      self._executor.submit(render_sections, list(sections[start:start + size]), start, yaml_engine, validate)
+      for start in range(0, len(sections), size)
+    ]
+
+  def shutdown(self) -> None:
+    """Stop the pool's processes, if started."""
+    if self._finalizer is not None:
+      self._finalizer.cancel()
+      self._finalizer = None
+    if self._executor is not None:
+      self._executor.shutdown(wait=True, cancel_futures=True)
+      self._executor = None
+
+
+# Process-wide section pool; disabled until configured
+SECTION_POOL = SectionPool()
+
+
+def configure_section_pool(workers: int, threshold: int = DEFAULT_SECTION_THRESHOLD) -> None:
+  """Resize the process-wide section pool, stopping any running one.
+
+  Args:
+    workers: Processes to split large configs across (0 or 1 disables)
+    threshold: Minimum number of sections before a config is split
+  """
+  SECTION_POOL.shutdown()
+  SECTION_POOL.workers = workers
+  SECTION_POOL.threshold = max(1, threshold)
+
+
+def splice_sections(chunks: list[SectionChunk]) -> Iterator[str]:
+  """Yield chunk texts as one "sections:" mapping, dropping repeated headers."""
+  for position, chunk in enumerate(chunks):
+    yield chunk.text if position == 0 else chunk.text.partition("\n")[2]
@@ -0,0 +1,323 @@
+"""Long-lived migration service speaking JSON lines over stdio or a Unix socket."""
+
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, TextIO
+
+import typer
+
+from migratassert import __version__
+from migratassert.cli import YamlEngine
+from migratassert.clock import capture_clock
+from migratassert.migrate import (
+  FileResult,
+  MigrationTask,
+  init_worker,
+  migrate_in_worker,
+)
+from migratassert.sinks import file_result_event
+
+# Source path reported for requests that send YAML inline
+INLINE_SOURCE = Path("<inline>")
+
+app = typer.Typer(
+  name="migratassert-server",
+  help="Serve v4.4.0 -> TC3 migrations from a warm process over JSON lines",
+  add_completion=False,
+  rich_markup_mode=None,
+)
+
+
+def error_response(request_id: Any, message: str) -> dict[str, Any]:
+  """Build the response for a request that could not be served."""
+  return {"id": request_id, "ok": False, "error": message}
+
+
+def migration_response(request_id: Any, results: list[FileResult]) -> dict[str, Any]:
+  """Build the response for a completed migrate request.
+
+  Args:
+    request_id: Echoed from the request
+    results: One FileResult, or one per document in multi-document mode
+
+  Returns:
+    Response with the TC3 text (when not written to a dest) and one
+    event per result, as written by JsonlSink
+  """
+  output = results[0].output_text
+  for file_result in results:
+    file_result.output_text = None
+  return {
+    "id": request_id,
+    "ok": all(r.success for r in results),
+    "output": output,
+    "results": [file_result_event(r) for r in results],
+  }
+
+
+def parse_task(request: dict[str, Any]) -> tuple[MigrationTask, bool]:
+  """Turn a migrate request into a MigrationTask.
+
+  Requests name a source "path" or carry "yaml" text inline. An optional
+  "dest" is written atomically (skipped when unchanged); without it the
+  TC3 text is returned. "file_stem" defaults to the uppercased stem of
+  path, and "multi_document" selects stream mode.
+
+  Args:
+    request: Decoded request object
+
+  Returns:
+    Tuple of (task, True if the output should be returned inline)
+
+  Raises:
+    ValueError: If the request is malformed
+  """
+  dest = request.get("dest")
+  if "yaml" in request:
+    if not isinstance(request["yaml"], str):
+      raise ValueError("'yaml' must be a string")
+    source_path = INLINE_SOURCE
+    raw: bytes | None = request["yaml"].encode("utf-8")
+    file_stem = request.get("file_stem")
+  elif "path" in request:
+    source_path = Path(request["path"])
+    raw = None
+    file_stem = request.get("file_stem", source_path.stem.upper())
+  else:
+    raise ValueError("migrate requests need 'path' or 'yaml'")
+
+  dest_path = Path(dest) if dest is not None else source_path
+  if raw is None:
+    task: MigrationTask = (source_path, dest_path, file_stem)
+  else:
+    task = (source_path, dest_path, file_stem, raw)
+  return (task, dest is None)
+
+
+class MigrationService:
+  """Warm migration state shared by every request.
+
+  With jobs=1 requests are converted in this process one at a time,
+  reusing a single YAML instance and block cache. With jobs > 1 they run
+  on a process pool whose workers keep their own, so independent
+  requests convert concurrently.
+  """
+
+  def __init__(
+    self,
+    yaml_engine: str = "roundtrip",
+    jobs: int = 1,
+    cache_size: int = 0,
+  ) -> None:
+    self._lock = threading.Lock()
+    self._executor: ProcessPoolExecutor | None = None
+    if jobs > 1:
+      self._executor = ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=init_worker,
+        initargs=(yaml_engine, cache_size),
+      )
+      # Start every worker now rather than on the first requests
+      wait([self._executor.submit(os.getpid) for _ in range(jobs)])
+    else:
+      init_worker(yaml_engine, cache_size)
+
+  def submit(self, request: dict[str, Any]) -> "Future[dict[str, Any]]":
+    """Start serving one request.
+
+    Args:
+      request: Decoded request; "op" is "migrate" (default) or "ping"
+
+    Returns:
+      Future resolving to the response object
+    """
+    request_id = request.get("id")
+    response: Future[dict[str, Any]] = Future()
+    op = request.get("op", "migrate")
+    if op == "ping":
+      response.set_result({"id": request_id, "ok": True, "version": __version__})
+      return response
+    if op != "migrate":
+      response.set_result(error_response(request_id, f"unknown op: {op!r}"))
+      return response
+
+    try:
+      task, inline = parse_task(request)
+      # Date each request when it arrives, not when the server started
+      clock = capture_clock()
+    except ValueError as e:
+      response.set_result(error_response(request_id, str(e)))
+      return response
+    multi_document = bool(request.get("multi_document", False))
+
+    if self._executor is None:
+      with self._lock:
+        results = migrate_in_worker(task, collect_output=inline, multi_document=multi_document, clock=clock)
+      response.set_result(migration_response(request_id, results))
+      return response
+
+    converted = self._executor.submit(
+      migrate_in_worker, task, collect_output=inline, multi_document=multi_document, clock=clock
+    )
+
+    def done(future: "Future[list[FileResult]]") -> None:
+      try:
+        response.set_result(migration_response(request_id, future.result()))
+      except Exception as e:
+        response.set_result(error_response(request_id, str(e)))
+
+    converted.add_done_callback(done)
+    return response
+
+  def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+    """Serve one request and wait for its response."""
+    return self.submit(request).result()
+
+  def close(self) -> None:
+    """Stop the worker pool, if any."""
+    if self._executor is not None:
+      self._executor.shutdown(wait=True)
+
+
+def serve_stream(service: MigrationService, instream: TextIO, outstream: TextIO) -> bool:
+  """Serve JSON-lines requests from one stream until EOF or shutdown.
+
+  Responses are written as they complete, so with a worker pool they
+  may arrive out of order; clients match them by "id".
+
+  Args:
+    service: Shared service
+    instream: One JSON request per line
+    outstream: Receives one JSON response per line
+
+  Returns:
+    True if a {"op": "shutdown"} request ended the stream
+  """
+  write_lock = threading.Lock()
+  in_flight: set[Future[dict[str, Any]]] = set()
+
+  def send(response: dict[str, Any]) -> None:
+    with write_lock:
+      outstream.write(json.dumps(response) + "\n")
+      outstream.flush()
+
+  shutdown_id: Any = None
+  stop = False
+  for line in instream:
+    if not line.strip():
+      continue
+    try:
+      request = json.loads(line)
+      if not isinstance(request, dict):
+        raise ValueError("request must be a JSON object")
+    except ValueError as e:
+      send(error_response(None, f"invalid request: {e}"))
+      continue
+    if request.get("op") == "shutdown":
+      shutdown_id = request.get("id")
+      stop = True
+      break
+    future = service.submit(request)
+    in_flight.add(future)
+    future.add_done_callback(lambda f: send(f.result()))
+
+  wait(in_flight)
+  if stop:
+    send({"id": shutdown_id, "ok": True})
+  return stop
+
+
+def _remove_stale_socket(socket_path: Path) -> None:
+  """Delete a socket file left by a dead server; refuse to steal a live one."""
+  if not socket_path.exists():
+    return
+  probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  try:
+    probe.connect(str(socket_path))
+  except ConnectionRefusedError:
+    socket_path.unlink()
+  else:
+    raise OSError(f"A server is already listening on {socket_path}")
+  finally:
+    probe.close()
+
+
+def serve_unix(service: MigrationService, socket_path: Path) -> None:
+  """Serve JSON-lines requests on a Unix socket until a shutdown request.
+
+  Each connection is handled on its own thread and may send any number
+  of requests.
+
+  Args:
+    service: Shared service
+    socket_path: Filesystem path to listen on
+  """
+  _remove_stale_socket(socket_path)
+
+  class Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+      reader = io.TextIOWrapper(self.rfile, encoding="utf-8")
+      writer = io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=True)
+      if serve_stream(service, reader, writer):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+  server = socketserver.ThreadingUnixStreamServer(str(socket_path), Handler)
+  server.daemon_threads = True
+  try:
+    server.serve_forever()
+  finally:
+    server.server_close()
+    socket_path.unlink(missing_ok=True)
+
+
+@app.command()
+def serve(
+  socket_path: Path | None = typer.Option(
+    None,
+    "--socket",
+    help="Listen on this Unix socket instead of stdin/stdout",
+    dir_okay=False,
+  ),
+  jobs: int = typer.Option(
+    1,
+    "--jobs",
+    "-j",
+    help="Worker processes for concurrent requests (1 converts in the server process)",
+    min=1,
+  ),
+  yaml_engine: YamlEngine = typer.Option(
+    YamlEngine.roundtrip,
+    "--yaml-engine",
+    help=(
+      "YAML engine: 'roundtrip' (ruamel round-trip, keeps scalar spellings) or 'fast' "
+      "(C-backed safe loader; rewrites scalars such as 1e-5 -> 1e-05, 0.10 -> 0.1, 007 -> 7, "
+      "and block scalars as quoted strings)"
+    ),
+  ),
+  cache_size: int = typer.Option(
+    0,
+    "--cache-size",
+    help="Memoize up to N mapped encoding/annotation blocks per process (0 disables)",
+    min=0,
+  ),
+) -> None:
+  """Serve migrate requests as JSON lines on stdin/stdout or a Unix socket."""
+  service = MigrationService(yaml_engine=yaml_engine.value, jobs=jobs, cache_size=cache_size)
+  try:
+    if socket_path is None:
+      serve_stream(service, sys.stdin, sys.stdout)
+    else:
+      serve_unix(service, socket_path)
+  finally:
+    service.close()
+
+
+if __name__ == "__main__":
+  app()
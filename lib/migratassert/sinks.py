@@ -0,0 +1,105 @@
+"""Per-file result sinks for streaming migration runs."""
+
+import json
+import sys
+from pathlib import Path
+from typing import Any, TextIO
+
+from migratassert.migrate import FileResult, FileResultSink
+
+
+def file_result_event(file_result: FileResult) -> dict[str, Any]:
+  """Convert a FileResult into a JSON-serializable event.
+
+  Args:
+    file_result: Result of migrating one file
+
+  Returns:
+    Event dict with paths as strings
+  """
+  return {
+    "source": str(file_result.source_path),
+    "dest": str(file_result.dest_path),
+    "document_index": file_result.document_index,
+    "document_id": file_result.document_id,
+    "success": file_result.success,
+    "skipped": file_result.skipped,
+    "unchanged": file_result.unchanged,
+    "error": file_result.error,
+    "dropped_fields": file_result.dropped_fields,
+    "regex_issues": file_result.regex_issues,
+    "warnings": file_result.warnings,
+    "publications": file_result.publications,
+    "schema_violations": file_result.validation.violations if file_result.validation else [],
+  }
+
+
+class JsonlSink:
+  """Write one JSON event per FileResult to a JSON-lines file."""
+
+  def __init__(self, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    self._stream: TextIO = open(path, "w")
+
+  def __call__(self, file_result: FileResult) -> None:
+    self._stream.write(json.dumps(file_result_event(file_result)))
+    self._stream.write("\n")
+
+  def close(self) -> None:
+    self._stream.close()
+
+  def __enter__(self) -> "JsonlSink":
+    return self
+
+  def __exit__(self, *exc_info: object) -> None:
+    self.close()
+
+
+class ProgressSink:
+  """Render a single updating progress line to a terminal stream."""
+
+  def __init__(self, stream: TextIO = sys.stderr, every: int = 100) -> None:
+    self._stream = stream
+    self._every = every
+    self.processed = 0
+    self.failed = 0
+
+  def __call__(self, file_result: FileResult) -> None:
+    self.processed += 1
+    if not file_result.success:
+      self.failed += 1
+    if self.processed % self._every == 0:
+      self._render()
+
+  def _render(self) -> None:
+    self._stream.write(f"\rMigrated {self.processed} files ({self.failed} failed)")
+    self._stream.flush()
+
+  def close(self) -> None:
+    """Render the final count and end the progress line."""
+    if self.processed:
+      self._render()
+      self._stream.write("\n")
+      self._stream.flush()
+
+
+def fan_out(*sinks: FileResultSink | None) -> FileResultSink | None:
+  """Combine several sinks into one, ignoring None entries.
+
+  Args:
+    sinks: Sinks to call in order for each FileResult
+
+  Returns:
+    Combined sink, the only sink given, or None if there are none
+  """
+  active = [s for s in sinks if s is not None]
+  if not active:
+    return None
+  if len(active) == 1:
+    return active[0]
+
+  def emit(file_result: FileResult) -> None:
+    for s in active:
+      s(file_result)
+
+  return emit
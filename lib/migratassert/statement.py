@@ -15,6 +15,7 @@ def map_statement(triple: dict[str, Any]) -> MapResult:
     MapResult with TC3 statement block
   """
   dropped: list[str] = []
+  warnings: list[str] = []
   statement: dict[str, Any] = {}
 
   if "triple_subject" in triple:
@@ -24,6 +25,7 @@ def map_statement(triple: dict[str, Any]) -> MapResult:
     )
     statement["subject"] = subj_result.mapped
     dropped.extend(subj_result.dropped)
+    warnings.extend(subj_result.warnings)
 
   if "triple_predicate" in triple:
     pred = triple["triple_predicate"]
@@ -41,5 +43,6 @@ def map_statement(triple: dict[str, Any]) -> MapResult:
     )
     statement["object"] = obj_result.mapped
     dropped.extend(obj_result.dropped)
+    warnings.extend(obj_result.warnings)
 
-  return MapResult(mapped=statement, dropped=dropped)
+  return MapResult(mapped=statement, dropped=dropped, warnings=warnings)
@@ -0,0 +1,213 @@
+"""Taxon normalization for in_this_organism values.
+
+A corpus names a handful of taxa (9606, 10090, ...) over and over, so
+TAXON_TABLE memoizes every distinct value it has resolved, with the keys
+interned. Values that are not numeric CURIEs can be resolved by name
+through an optional NCBITaxon snapshot. The snapshot is a sorted
+"name<TAB>id" file that is memory-mapped and binary-searched, so it is
+never parsed into memory, and worker processes share its pages.
+"""
+
+import hashlib
+import mmap
+import sys
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+# Distinct values memoized per process; later misses are resolved uncached
+TAXON_MEMO_SIZE = 65536
+
+# names.dmp name classes read_names_dmp keeps by default
+SNAPSHOT_NAME_CLASSES = ("scientific name", "genbank common name", "common name")
+
+
+def extract_taxon_id(curie: str) -> int:
+  """Extract integer taxon ID from CURIE like 'NCBITaxon:9606'.
+
+  Args:
+    curie: CURIE string (e.g., 'NCBITaxon:9606') or plain integer string
+
+  Returns:
+    Integer taxon ID
+
+  Raises:
+    ValueError: If the ID part is not an integer
+  """
+  if ":" in curie:
+    _, taxon_str = curie.rsplit(":", 1)
+    return int(taxon_str)
+  return int(curie)
+
+
+def _snapshot_key(name: str) -> bytes:
+  return " ".join(name.split()).lower().encode("utf-8")
+
+
+class TaxonSnapshot:
+  """Memory-mapped NCBITaxon name -> ID table.
+
+  Lines are "name<TAB>id", with names lowercased, whitespace collapsed
+  and sorted bytewise (see write_taxon_snapshot).
+  """
+
+  def __init__(self, path: Path) -> None:
+    self.path = path
+    with open(path, "rb") as f:
+      size = f.seek(0, 2)
+      # mmap cannot map an empty file
+      self._data: bytes | mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+    self._digest: str | None = None
+
+  def lookup(self, name: str) -> int | None:
+    """Binary-search the snapshot for a taxon name (case-insensitive).
+
+    Args:
+      name: Organism name, e.g. "Homo sapiens"
+
+    Returns:
+      Taxon ID, or None if the name is not in the snapshot
+    """
+    key = _snapshot_key(name)
+    data = self._data
+    lo, hi = 0, len(data)
+    while lo < hi:
+      start = data.rfind(b"\n", 0, (lo + hi) // 2) + 1
+      end = data.find(b"\n", start)
+      if end == -1:
+        end = len(data)
+      line_key, _, value = data[start:end].partition(b"\t")
+      if line_key == key:
+        return int(value)
+      if line_key < key:
+        lo = end + 1
+      else:
+        hi = start
+    return None
+
+  def digest(self) -> str:
+    """Return the hex SHA-256 of the snapshot, computed once."""
+    if self._digest is None:
+      self._digest = hashlib.sha256(self._data).hexdigest()
+    return self._digest
+
+  def close(self) -> None:
+    """Unmap the snapshot."""
+    if isinstance(self._data, mmap.mmap):
+      self._data.close()
+    self._data = b""
+
+
+class TaxonTable:
+  """Process-wide memo of resolved taxon values, with an optional snapshot."""
+
+  def __init__(self) -> None:
+    self.maxsize = TAXON_MEMO_SIZE
+    self.snapshot: TaxonSnapshot | None = None
+    self._memo: dict[str, int | None] = {}
+
+  def resolve(self, value: str) -> int:
+    """Resolve a CURIE, integer string or (with a snapshot) organism name.
+
+    Args:
+      value: in_this_organism value
+
+    Returns:
+      Integer taxon ID
+
+    Raises:
+      ValueError: If the value cannot be resolved
+    """
+    try:
+      taxon = self._memo[value]
+    except KeyError:
+      taxon = self._resolve(value)
+      if len(self._memo) < self.maxsize:
+        # str() because the round-trip loader's block scalars are str
+        # subclasses, which cannot be interned
+        self._memo[sys.intern(str(value))] = taxon
+    if taxon is None:
+      raise ValueError(f"cannot resolve taxon {value!r}")
+    return taxon
+
+  def _resolve(self, value: str) -> int | None:
+    try:
+      return extract_taxon_id(value)
+    except ValueError:
+      pass
+    if self.snapshot is None:
+      return None
+    taxon = self.snapshot.lookup(value)
+    if taxon is None and ":" in value:
+      taxon = self.snapshot.lookup(value.rsplit(":", 1)[1])
+    return taxon
+
+  def fingerprint(self) -> str | None:
+    """Identify the snapshot in use (None without one), for manifests."""
+    return None if self.snapshot is None else self.snapshot.digest()
+
+  def clear(self) -> None:
+    """Drop memoized values and unmap any snapshot."""
+    self._memo.clear()
+    if self.snapshot is not None:
+      self.snapshot.close()
+      self.snapshot = None
+
+
+# Process-wide taxon table used by the encoding mapper
+TAXON_TABLE = TaxonTable()
+
+
+def configure_taxon_table(snapshot: Path | None = None) -> None:
+  """Reset the process-wide taxon table and attach a snapshot.
+
+  Args:
+    snapshot: Snapshot from write_taxon_snapshot, or None to
+      resolve CURIEs and integer strings only
+  """
+  TAXON_TABLE.clear()
+  if snapshot is not None:
+    TAXON_TABLE.snapshot = TaxonSnapshot(snapshot)
+
+
+def write_taxon_snapshot(entries: Iterable[tuple[str, int]], path: Path) -> int:
+  """Write a snapshot of (name, taxon ID) pairs.
+
+  Names that map to more than one taxon are ambiguous and left out.
+
+  Args:
+    entries: Organism names and their taxon IDs
+    path: Snapshot file to write
+
+  Returns:
+    Number of names written
+  """
+  # writer imports manifest, which imports this module
+  from migratassert.writer import write_atomic
+
+  taxa: dict[bytes, int | None] = {}
+  for name, taxon in entries:
+    key = _snapshot_key(name)
+    if not key or b"\t" in key:
+      continue
+    taxa[key] = taxon if taxa.get(key, taxon) == taxon else None
+  lines = [key + b"\t" + str(taxon).encode() for key, taxon in sorted(taxa.items()) if taxon is not None]
+  write_atomic(path, b"\n".join(lines) + b"\n" if lines else b"")
+  return len(lines)
+
+
+def read_names_dmp(path: Path, name_classes: Iterable[str] = SNAPSHOT_NAME_CLASSES) -> Iterator[tuple[str, int]]:
+  """Read (name, taxon ID) pairs from an NCBI taxdump names.dmp file.
+
+  Args:
+    path: names.dmp ("tax_id | name_txt | unique name | name class |")
+    name_classes: Name classes to keep
+
+  Yields:
+    (name, taxon ID) pairs
+  """
+  wanted = set(name_classes)
+  with open(path, encoding="utf-8") as f:
+    for line in f:
+      fields = line.rstrip("\t|\n").split("\t|\t")
+      if len(fields) >= 4 and fields[3] in wanted:
+        yield (fields[1], int(fields[0]))
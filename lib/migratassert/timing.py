@@ -0,0 +1,91 @@
+"""Per-phase timing helpers and bounded-memory distributions."""
+
+import heapq
+import random
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+# Samples kept per distribution; percentiles beyond this are estimated
+RESERVOIR_SIZE = 4096
+
+
+class PhaseTimer:
+  """Accumulate wall and CPU seconds for named phases of one file."""
+
+  def __init__(
+    self,
+    wall: dict[str, float] | None = None,
+    cpu: dict[str, float] | None = None,
+  ) -> None:
+    self.wall: dict[str, float] = {} if wall is None else wall
+    self.cpu: dict[str, float] = {} if cpu is None else cpu
+
+  @contextmanager
+  def phase(self, name: str) -> Iterator[None]:
+    """Time the enclosed block under the given phase name.
+
+    CPU time is per-thread so concurrent phases don't inflate each other.
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+      yield
+    finally:
+      self.wall[name] = self.wall.get(name, 0.0) + time.perf_counter() - wall_start
+      self.cpu[name] = self.cpu.get(name, 0.0) + time.thread_time() - cpu_start
+
+
+@dataclass
+class Distribution:
+  """Count, total and max of a series, plus a reservoir sample for percentiles."""
+
+  count: int = 0
+  total: float = 0.0
+  maximum: float = 0.0
+  samples: list[float] = field(default_factory=list)
+  _rng: random.Random = field(default_factory=lambda: random.Random(0), repr=False)
+
+  def add(self, value: float) -> None:
+    """Add one observation."""
+    self.count += 1
+    self.total += value
+    if value > self.maximum:
+      self.maximum = value
+    if len(self.samples) < RESERVOIR_SIZE:
+      self.samples.append(value)
+    else:
+      slot = self._rng.randrange(self.count)
+      if slot < RESERVOIR_SIZE:
+        self.samples[slot] = value
+
+  def percentile(self, q: float) -> float:
+    """Return the q-th percentile (0-100) using nearest rank.
+
+    Exact while count <= RESERVOIR_SIZE, estimated afterwards.
+    """
+    if not self.samples:
+      return 0.0
+    ordered = sorted(self.samples)
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+@dataclass
+class TopN:
+  """Keep the N largest (value, label) pairs seen."""
+
+  size: int = 10
+  _heap: list[tuple[float, str]] = field(default_factory=list)
+
+  def add(self, value: float, label: str) -> None:
+    """Offer one observation."""
+    if len(self._heap) < self.size:
+      heapq.heappush(self._heap, (value, label))
+    elif value > self._heap[0][0]:
+      heapq.heapreplace(self._heap, (value, label))
+
+  def items(self) -> list[tuple[float, str]]:
+    """Return kept observations, largest first."""
+    return sorted(self._heap, reverse=True)
@@ -1,9 +1,11 @@
 """Core transformation logic for v4.4.0 -> TC3."""
 
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from typing import Any
 
 from migratassert.annotations import map_annotations
+from migratassert.encoding import MapResult
 from migratassert.provenance import map_provenance
 from migratassert.source import map_source
 from migratassert.statement import map_statement
@@ -11,93 +13,224 @@ from migratassert.statement import map_statement
 
 @dataclass
 class TransformResult:
-  """Result of transforming a single config."""
+  """Result of transforming a single config.
+
+  dropped_blocks runs parallel to dropped_fields and names the block each
+  field was dropped from: "template" or "sections[<index>]". warnings
+  lists values kept unconverted, e.g. "template.triple.subject.
+  in_this_organism: cannot resolve taxon 'mouse'".
+  """
 
   config: dict[str, Any]
   dropped_fields: list[str] = field(default_factory=list)
+  dropped_blocks: list[str] = field(default_factory=list)
+  warnings: list[str] = field(default_factory=list)
+
+
+# A block mapper: (v4.4.0 value, enclosing template/section, file stem) -> MapResult
+BlockMapper = Callable[[Any, dict[str, Any], str | None], MapResult]
+
+
+def _map_location(value: Any, block: dict[str, Any], file_stem: str | None) -> MapResult:
+  return map_source(value, reindexing=block.get("reindexing"), file_stem=file_stem)
+
+
+def _map_triple(value: Any, block: dict[str, Any], file_stem: str | None) -> MapResult:
+  return map_statement(value)
+
+
+def _map_provenance(value: Any, block: dict[str, Any], file_stem: str | None) -> MapResult:
+  return map_provenance(value)
+
+
+def _map_attributes(value: Any, block: dict[str, Any], file_stem: str | None) -> MapResult:
+  return map_annotations(value)
+
+
+# v4.4.0 block key -> (TC3 key, mapper), in TC3 output order
+BLOCK_MAPPINGS: dict[str, tuple[str, BlockMapper]] = {
+  "location": ("source", _map_location),
+  "triple": ("statement", _map_triple),
+  "provenance": ("provenance", _map_provenance),
+  "attributes": ("annotations", _map_attributes),
+}
+
+# Keys read by a mapper (reindexing feeds source) with no output of their own
+CONSUMED_KEYS = {"reindexing"}
+
+# A plan step: (output rank, TC3 key, mapper), or None for a consumed key
+BlockStep = tuple[int, str, BlockMapper] | None
+
+
+def compile_block_plan() -> dict[str, BlockStep]:
+  """Build the dispatch table shared by the template and every section.
+
+  Runs once at import; call recompile_block_plan after changing
+  BLOCK_MAPPINGS or CONSUMED_KEYS.
+
+  Returns:
+    Steps keyed by v4.4.0 key; keys not in the table are unknown
+  """
+  plan: dict[str, BlockStep] = {
+    old_key: (rank, new_key, mapper)
+    for rank, (old_key, (new_key, mapper)) in enumerate(BLOCK_MAPPINGS.items())
+  }
+  for old_key in CONSUMED_KEYS:
+    plan[old_key] = None
+  return plan
+
+
+BLOCK_PLAN = compile_block_plan()
+
+
+def recompile_block_plan() -> None:
+  """Rebuild the module-level plan after editing the mapping tables."""
+  global BLOCK_PLAN
+  BLOCK_PLAN = compile_block_plan()
+
+
+def _rank(entry: tuple[int, str, MapResult]) -> int:
+  return entry[0]
 
 
-def transform_config(v440_config: dict[str, Any], file_stem: str | None = None) -> TransformResult:
+def map_block(
+  block: dict[str, Any],
+  file_stem: str | None,
+  passthrough: bool,
+  dropped: list[str],
+  warnings: list[str],
+  label: str,
+) -> dict[str, Any]:
+  """Map a template or section in a single pass over its keys.
+
+  Mapped blocks are emitted in BLOCK_MAPPINGS order regardless of input
+  order, followed by unknown keys in input order when passthrough is set.
+
+  Args:
+    block: v4.4.0 template or section
+    file_stem: Stem for the default source.local (None for sections)
+    passthrough: If True, copy unknown keys through; otherwise ignore them
+    dropped: Receives dropped field names, in BLOCK_MAPPINGS order
+    warnings: Receives mapper warnings, prefixed with label
+    label: Block name for warnings ("template" or "sections[<index>]")
+
+  Returns:
+    Mapped TC3 block (without the template's syntax key)
+  """
+  plan = BLOCK_PLAN
+  entries: list[tuple[int, str, MapResult]] = []
+  extra: list[tuple[str, Any]] = []
+  for key, value in block.items():
+    if key not in plan:
+      if passthrough:
+        extra.append((key, value))
+      continue
+    step = plan[key]
+    if step is not None:
+      rank, new_key, mapper = step
+      entries.append((rank, new_key, mapper(value, block, file_stem)))
+
+  if len(entries) > 1:
+    entries.sort(key=_rank)
+  tc3: dict[str, Any] = {}
+  for _, new_key, result in entries:
+    tc3[new_key] = result.mapped
+    dropped.extend(result.dropped)
+    warnings.extend(f"{label}.{warning}" for warning in result.warnings)
+  tc3.update(extra)
+  return tc3
+
+
+def map_sections(
+  sections: list[dict[str, Any]],
+  start: int = 0,
+) -> tuple[list[dict[str, Any]], list[str], list[str], list[str]]:
+  """Map a run of consecutive sections.
+
+  Sections are independent, so any split of a config's sections mapped
+  chunk by chunk and concatenated equals mapping them in one call.
+
+  Args:
+    sections: v4.4.0 sections
+    start: Index of the first section within the config
+
+  Returns:
+    Tuple of (TC3 sections, dropped fields, matching dropped blocks,
+    warnings)
+  """
+  tc3_sections: list[dict[str, Any]] = []
+  dropped: list[str] = []
+  blocks: list[str] = []
+  warnings: list[str] = []
+  for index, section in enumerate(sections, start):
+    section_start = len(dropped)
+    label = f"sections[{index}]"
+    # Sections never use the main file stem
+    tc3_sections.append(
+      map_block(section, None, passthrough=True, dropped=dropped, warnings=warnings, label=label)
+    )
+    if len(dropped) > section_start:
+      blocks.extend([label] * (len(dropped) - section_start))
+  return (tc3_sections, dropped, blocks, warnings)
+
+
+def find_sections(v440_config: dict[str, Any]) -> list[dict[str, Any]] | None:
+  """Return a config's sections, at top level or inside template.
+
+  Args:
+    v440_config: Parsed v4.4.0 YAML config
+
+  Returns:
+    Sections list, or None if the config has none
+  """
+  template = v440_config.get("template", {})
+  sections = v440_config.get("sections") or template.get("sections")
+  if not sections or sections == [None]:
+    return None
+  return sections
+
+
+def transform_config(
+  v440_config: dict[str, Any],
+  file_stem: str | None = None,
+  include_sections: bool = True,
+) -> TransformResult:
   """Transform a v4.4.0 config to TC3 schema.
 
+  The template and each section go through the same compiled BLOCK_PLAN.
+  Unknown template keys are ignored; unknown section keys pass through.
+
   Args:
     v440_config: Parsed v4.4.0 YAML config
     file_stem: Optional file stem for default local field generation
+    include_sections: If False, map only the template; the caller maps
+      find_sections(v440_config) itself (see map_sections)
 
   Returns:
     TransformResult with TC3 config and list of dropped fields
   """
   dropped: list[str] = []
+  warnings: list[str] = []
   template = v440_config.get("template", {})
 
   tc3_template: dict[str, Any] = {"syntax": "TC3"}
+  tc3_template.update(
+    map_block(template, file_stem, passthrough=False, dropped=dropped, warnings=warnings, label="template")
+  )
   tc3_config: dict[str, Any] = {"template": tc3_template}
 
-  if "location" in template:
-    source_result = map_source(
-      template["location"],
-      reindexing=template.get("reindexing"),
-      file_stem=file_stem,
-    )
-    tc3_template["source"] = source_result.mapped
-    dropped.extend(source_result.dropped)
-
-  if "triple" in template:
-    stmt_result = map_statement(template["triple"])
-    tc3_template["statement"] = stmt_result.mapped
-    dropped.extend(stmt_result.dropped)
-
-  if "provenance" in template:
-    prov_result = map_provenance(template["provenance"])
-    tc3_template["provenance"] = prov_result.mapped
-    dropped.extend(prov_result.dropped)
-
-  if "attributes" in template:
-    annot_result = map_annotations(template["attributes"])
-    tc3_template["annotations"] = annot_result.mapped
-    dropped.extend(annot_result.dropped)
-
-  # Check for sections at top level OR inside template
-  sections_source = v440_config.get("sections") or template.get("sections")
-  if sections_source and sections_source != [None]:
-      tc3_sections: list[dict[str, Any]] = []
-      for section in sections_source:
-        tc3_section: dict[str, Any] = {}
-
-        if "location" in section:
-          source_result = map_source(
-            section["location"],
-            reindexing=section.get("reindexing"),
-            file_stem=None,  # Don't use main file stem for sections
-          )
-          tc3_section["source"] = source_result.mapped
-          dropped.extend(source_result.dropped)
-
-        if "triple" in section:
-          stmt_result = map_statement(section["triple"])
-          tc3_section["statement"] = stmt_result.mapped
-          dropped.extend(stmt_result.dropped)
-
-        if "provenance" in section:
-          prov_result = map_provenance(section["provenance"])
-          tc3_section["provenance"] = prov_result.mapped
-          dropped.extend(prov_result.dropped)
-
-        if "attributes" in section:
-          annot_result = map_annotations(section["attributes"])
-          tc3_section["annotations"] = annot_result.mapped
-          dropped.extend(annot_result.dropped)
-
-        keys_requiring_transformation = {"location", "triple", "provenance", "attributes", "reindexing"}
-        for key, value in section.items():
-          if key not in keys_requiring_transformation:
-            tc3_section[key] = value
-
-        tc3_sections.append(tc3_section)
-
-      tc3_config["sections"] = tc3_sections
+  blocks = ["template"] * len(dropped)
+  sections = find_sections(v440_config) if include_sections else None
+  if sections is not None:
+    tc3_sections, section_dropped, section_blocks, section_warnings = map_sections(sections)
+    tc3_config["sections"] = tc3_sections
+    dropped.extend(section_dropped)
+    blocks.extend(section_blocks)
+    warnings.extend(section_warnings)
 
   return TransformResult(
     config=tc3_config,
     dropped_fields=dropped,
+    dropped_blocks=blocks,
+    warnings=warnings,
   )
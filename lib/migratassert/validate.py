@@ -0,0 +1,260 @@
+"""TC3 schema validation of transformed configs.
+
+SCHEMA_RULES are compiled once into a plan keyed by path, and each
+template or section is walked once along that plan. Only the keys a
+rule can reach are visited. Every rule's checks, violations and time are
+counted so reports can show which rules are hit and what they cost.
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from migratassert.encoding import METHOD_VALUE_MAP
+from migratassert.paths import format_path
+from migratassert.source import EXTENSION_TO_KIND
+
+# Selector segment for "each item of a list"
+EACH = "[]"
+
+
+@dataclass(frozen=True)
+class Rule:
+  """One schema rule, checked at every node its selectors reach.
+
+  Selectors are dotted paths below a template or section, with "[]"
+  marking every item of a list (e.g. "provenance.contributors.[]").
+  """
+
+  name: str
+  selectors: tuple[str, ...]
+  check: Callable[[Any], str | None]
+  template_only: bool = False
+
+
+def _check_syntax(value: Any) -> str | None:
+  if value != "TC3":
+    return f"expected 'TC3', got {value!r}"
+  return None
+
+
+def _check_row_slice(value: Any) -> str | None:
+  if not isinstance(value, list) or len(value) != 2:
+    return f"expected [start, end], got {value!r}"
+  start, end = value
+  if isinstance(start, bool) or not isinstance(start, int) or start < 1:
+    return f"start must be a line number >= 1, got {start!r}"
+  if end == "auto":
+    return None
+  if isinstance(end, bool) or not isinstance(end, int) or end < start:
+    return f"end must be 'auto' or a line number >= start, got {end!r}"
+  return None
+
+
+_KINDS = frozenset(EXTENSION_TO_KIND.values())
+
+
+def _check_kind(value: Any) -> str | None:
+  if value not in _KINDS:
+    return f"unknown kind {value!r} (expected one of {', '.join(sorted(_KINDS))})"
+  return None
+
+
+_METHODS = frozenset(METHOD_VALUE_MAP.values())
+
+
+def _check_method(node: Any) -> str | None:
+  if not isinstance(node, dict) or "method" not in node:
+    return None
+  if node["method"] not in _METHODS:
+    return f"unknown method {node['method']!r} (expected one of {', '.join(sorted(_METHODS))})"
+  return None
+
+
+def _check_encoding(node: Any) -> str | None:
+  if isinstance(node, dict) and "method" in node and "encoding" not in node:
+    return "method set without encoding"
+  return None
+
+
+def _check_taxon(value: Any) -> str | None:
+  if isinstance(value, bool) or not isinstance(value, int):
+    return f"expected an integer NCBITaxon ID, got {value!r}"
+  return None
+
+
+def _check_contributor_date(contributor: Any) -> str | None:
+  if not isinstance(contributor, dict) or not contributor.get("date"):
+    return "missing date"
+  return None
+
+
+def _check_annotation_name(annotation: Any) -> str | None:
+  if not isinstance(annotation, dict) or not annotation.get("annotation"):
+    return "missing annotation name"
+  return None
+
+
+_ENCODINGS = ("statement.subject", "statement.object", "annotations.[]")
+
+SCHEMA_RULES: list[Rule] = [
+  Rule("syntax", ("syntax",), _check_syntax, template_only=True),
+  Rule("row-slice", ("source.row_slice",), _check_row_slice),
+  Rule("source-kind", ("source.kind",), _check_kind),
+  Rule("method", _ENCODINGS, _check_method),
+  Rule("encoding", _ENCODINGS, _check_encoding),
+  Rule("taxon", tuple(f"{encoding}.taxon" for encoding in _ENCODINGS), _check_taxon),
+  Rule("contributor-date", ("provenance.contributors.[]",), _check_contributor_date),
+  Rule("annotation-name", ("annotations.[]",), _check_annotation_name),
+]
+
+
+@dataclass
+class PlanStep:
+  """Rules to check at one path, and the steps below it."""
+
+  rules: list[Rule] = field(default_factory=list)
+  children: dict[str, "PlanStep"] = field(default_factory=dict)
+
+
+def compile_schema_plan(rules: list[Rule], template: bool) -> PlanStep:
+  """Merge every rule's selectors into one path tree.
+
+  Args:
+    rules: Rules to compile
+    template: If True, build the template plan; otherwise the section
+      plan, which leaves out template_only rules
+
+  Returns:
+    Root step for a template or section
+  """
+  root = PlanStep()
+  for rule in rules:
+    if rule.template_only and not template:
+      continue
+    for selector in rule.selectors:
+      step = root
+      for segment in selector.split("."):
+        step = step.children.setdefault(segment, PlanStep())
+      step.rules.append(rule)
+  return root
+
+
+TEMPLATE_PLAN = compile_schema_plan(SCHEMA_RULES, template=True)
+SECTION_PLAN = compile_schema_plan(SCHEMA_RULES, template=False)
+
+
+def recompile_schema_plan() -> None:
+  """Rebuild the module-level plans after editing SCHEMA_RULES."""
+  global TEMPLATE_PLAN, SECTION_PLAN
+  TEMPLATE_PLAN = compile_schema_plan(SCHEMA_RULES, template=True)
+  SECTION_PLAN = compile_schema_plan(SCHEMA_RULES, template=False)
+
+
+@dataclass
+class RuleStats:
+  """Checks run, violations found and seconds spent for one rule."""
+
+  checks: int = 0
+  violations: int = 0
+  seconds: float = 0.0
+
+  def add(self, other: "RuleStats") -> None:
+    """Add another RuleStats into this one."""
+    self.checks += other.checks
+    self.violations += other.violations
+    self.seconds += other.seconds
+
+
+@dataclass
+class ValidationReport:
+  """Violations found in one config, with per-rule stats."""
+
+  violations: list[str] = field(default_factory=list)
+  rules: dict[str, RuleStats] = field(default_factory=dict)
+
+  def merge(self, other: "ValidationReport") -> None:
+    """Append another report's violations and add its rule stats."""
+    self.violations.extend(other.violations)
+    for name, stats in other.rules.items():
+      self.rules.setdefault(name, RuleStats()).add(stats)
+
+
+def _walk(step: PlanStep, value: Any, path: tuple[str | int, ...], report: ValidationReport) -> None:
+  for rule in step.rules:
+    stats = report.rules.get(rule.name)
+    if stats is None:
+      stats = report.rules[rule.name] = RuleStats()
+    start = time.perf_counter()
+    problem = rule.check(value)
+    stats.seconds += time.perf_counter() - start
+    stats.checks += 1
+    if problem is not None:
+      stats.violations += 1
+      report.violations.append(f"{format_path(path)}: {rule.name}: {problem}")
+
+  for key, child in step.children.items():
+    if key == EACH:
+      if isinstance(value, list):
+        for index, item in enumerate(value):
+          _walk(child, item, (*path, index), report)
+    elif isinstance(value, dict) and key in value:
+      _walk(child, value[key], (*path, key), report)
+
+
+def validate_sections(
+  sections: list[dict[str, Any]],
+  start: int = 0,
+  report: ValidationReport | None = None,
+) -> ValidationReport:
+  """Validate a run of consecutive TC3 sections.
+
+  Args:
+    sections: TC3 sections
+    start: Index of the first section within the config
+    report: Report to add to (a new one if None)
+
+  Returns:
+    The report
+  """
+  report = ValidationReport() if report is None else report
+  plan = SECTION_PLAN
+  for index, section in enumerate(sections, start):
+    _walk(plan, section, ("sections", index), report)
+  return report
+
+
+def validate_config(tc3_config: dict[str, Any]) -> ValidationReport:
+  """Validate a transformed config against the TC3 rules.
+
+  Args:
+    tc3_config: Output of transform_config
+
+  Returns:
+    ValidationReport; violations are "path: rule: problem" lines in
+    document order
+  """
+  report = ValidationReport()
+  _walk(TEMPLATE_PLAN, tc3_config.get("template", {}), ("template",), report)
+  validate_sections(tc3_config.get("sections") or [], report=report)
+  return report
+
+
+class SchemaValidation:
+  """Process-wide switch for TC3 validation; enabled unless configured off."""
+
+  def __init__(self) -> None:
+    self.enabled = True
+
+
+SCHEMA_VALIDATION = SchemaValidation()
+
+
+def configure_schema_validation(enabled: bool) -> None:
+  """Enable or disable TC3 validation in this process.
+
+  Args:
+    enabled: If True, convert_source validates every transformed config
+  """
+  SCHEMA_VALIDATION.enabled = enabled
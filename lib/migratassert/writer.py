@@ -0,0 +1,92 @@
+"""Atomic output writes that leave unchanged files untouched."""
+
+import os
+import tempfile
+from pathlib import Path
+
+from migratassert.manifest import hash_bytes, hash_file
+
+
+def _creation_mode() -> int:
+  """Return the mode open() would give a new file under the current umask."""
+  umask = os.umask(0)
+  os.umask(umask)
+  return 0o666 & ~umask
+
+
+# Read once at import; os.umask can only be queried by setting it
+DEFAULT_FILE_MODE = _creation_mode()
+
+
+def matches_existing(dest_path: Path, data: bytes) -> bool:
+  """Check whether a file already holds exactly these bytes.
+
+  Sizes are compared first so most changed files are never read.
+
+  Args:
+    dest_path: Existing output file (may be missing)
+    data: Rendered output
+
+  Returns:
+    True if dest_path exists with identical content
+  """
+  try:
+    if dest_path.stat().st_size != len(data):
+      return False
+    return hash_file(dest_path) == hash_bytes(data)
+  except FileNotFoundError:
+    return False
+
+
+def fsync_file(path: Path) -> None:
+  """Flush a file or directory to stable storage.
+
+  Args:
+    path: File or directory to sync
+  """
+  fd = os.open(path, os.O_RDONLY)
+  try:
+    os.fsync(fd)
+  finally:
+    os.close(fd)
+
+
+def write_atomic(dest_path: Path, data: bytes, fsync: bool = False) -> bool:
+  """Write bytes via a temp file and rename, skipping identical output.
+
+  Readers see either the old file or the complete new one, never a
+  partial write. The temp file lives next to dest_path so the rename
+  stays on one filesystem. New files get the usual umask-derived mode;
+  replaced files keep their existing mode.
+
+  Args:
+    dest_path: Output path
+    data: Rendered output
+    fsync: If True, flush the temp file before renaming it into place
+      (sync the parent directory separately, see fsync_file)
+
+  Returns:
+    True if the file was written, False if it already matched
+  """
+  if matches_existing(dest_path, data):
+    return False
+
+  dest_path.parent.mkdir(parents=True, exist_ok=True)
+  try:
+    mode = dest_path.stat().st_mode & 0o7777
+  except FileNotFoundError:
+    mode = DEFAULT_FILE_MODE
+
+  fd, tmp_name = tempfile.mkstemp(prefix=f".{dest_path.name}.", suffix=".tmp", dir=dest_path.parent)
+  try:
+    with os.fdopen(fd, "wb") as f:
+      f.write(data)
+      if fsync:
+        f.flush()
+        os.fsync(f.fileno())
+    os.chmod(tmp_name, mode)
+    os.replace(tmp_name, dest_path)
+  except BaseException:
+    Path(tmp_name).unlink(missing_ok=True)
+    raise
+  return True
@@ -0,0 +1,137 @@
+"""Tests for tar/zip archive input and output."""
+
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from migratassert.archive import (
+  ArchiveWriter,
+  is_archive,
+  iter_archive_members,
+  member_selected,
+)
+from migratassert.migrate import run_migration
+
+CONFIG = (
+  "template:\n"
+  "  triple:\n"
+  "    triple_subject:\n"
+  "      encoding_method: column\n"
+  "      value_for_encoding: A\n"
+)
+
+MEMBERS = {
+  "alam1.yaml": CONFIG,
+  "nested/beta.yml": CONFIG,
+  "notes.txt": "not a config\n",
+}
+
+
+def make_tar(path, members, mode="w:gz"):
+  with tarfile.open(path, mode) as tar:
+    for name, text in members.items():
+      data = text.encode("utf-8")
+      info = tarfile.TarInfo(f"./{name}")
+      info.size = len(data)
+      tar.addfile(info, io.BytesIO(data))
+  return path
+
+
+def make_zip(path, members):
+  with zipfile.ZipFile(path, "w") as zf:
+    for name, text in members.items():
+      zf.writestr(name, text)
+  return path
+
+
+@pytest.fixture(params=["tar.gz", "tar", "zip"])
+def archive(request, tmp_path):
+  path = tmp_path / f"corpus.{request.param}"
+  if request.param == "zip":
+    return make_zip(path, MEMBERS)
+  return make_tar(path, MEMBERS, "w:gz" if request.param == "tar.gz" else "w")
+
+
+class TestMemberSelection:
+  def test_is_archive(self, tmp_path):
+    assert is_archive(tmp_path / "a.TAR.GZ")
+    assert is_archive(tmp_path / "a.tgz")
+    assert not is_archive(tmp_path / "a.gz")
+
+  def test_matches_directory_rules(self):
+    assert member_selected("a.yaml")
+    assert not member_selected("sub/a.yaml")
+    assert member_selected("sub/a.yaml", recursive=True)
+    assert not member_selected("sub/a.yaml", recursive=True, exclude=["sub"])
+    assert not member_selected("a.yaml", include=["b*"])
+    assert not member_selected("a.txt")
+
+  def test_streams_members(self, archive):
+    members = dict(iter_archive_members(archive, recursive=True))
+    assert members == {
+      archive / "alam1.yaml": CONFIG.encode("utf-8"),
+      archive / "nested/beta.yml": CONFIG.encode("utf-8"),
+    }
+
+  def test_rejects_escaping_members(self, tmp_path):
+    path = make_zip(tmp_path / "evil.zip", {"../evil.yaml": CONFIG, "/abs.yaml": CONFIG})
+    assert list(iter_archive_members(path, recursive=True)) == []
+
+
+class TestArchiveMigration:
+  def test_archive_to_directory(self, archive, tmp_path):
+    outdir = tmp_path / "out"
+    result = run_migration(archive, outdir, recursive=True)
+    assert result.files_succeeded == 2
+    assert (outdir / "ALAM1.yaml").exists()
+    assert (outdir / "nested" / "BETA.yml").exists()
+
+  @pytest.mark.parametrize("suffix", ["zip", "tar.gz"])
+  @pytest.mark.parametrize("jobs,async_io", [(1, False), (2, False), (1, True)])
+  def test_archive_to_archive_matches_directory(self, archive, tmp_path, suffix, jobs, async_io):
+    run_migration(archive, tmp_path / "dir", recursive=True)
+    out = tmp_path / f"out.{suffix}"
+    result = run_migration(archive, out, recursive=True, jobs=jobs, async_io=async_io)
+    assert result.files_succeeded == 2
+    assert all(fr.output_text is None for fr in result.file_results)
+
+    expected = {
+      "ALAM1.yaml": (tmp_path / "dir" / "ALAM1.yaml").read_bytes(),
+      "nested/BETA.yml": (tmp_path / "dir" / "nested" / "BETA.yml").read_bytes(),
+    }
+    if suffix == "zip":
+      with zipfile.ZipFile(out) as zf:
+        written = {name: zf.read(name) for name in zf.namelist()}
+    else:
+      with tarfile.open(out) as tar:
+        written = {m.name: tar.extractfile(m).read() for m in tar.getmembers()}
+    assert written == expected
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith(".")] == []
+
+  def test_dry_run_writes_no_archive(self, archive, tmp_path):
+    out = tmp_path / "out.zip"
+    result = run_migration(archive, out, dry_run=True)
+    assert result.files_succeeded == 1
+    assert not out.exists()
+
+  def test_incremental_archive_input(self, archive, tmp_path):
+    outdir = tmp_path / "out"
+    run_migration(archive, outdir, incremental=True)
+    second = run_migration(archive, outdir, incremental=True)
+    assert second.files_skipped == 1
+
+  def test_incremental_archive_output_rejected(self, archive, tmp_path):
+    with pytest.raises(ValueError, match="directory output"):
+      run_migration(archive, tmp_path / "out.zip", incremental=True)
+
+
+class TestArchiveWriter:
+  def test_abort_leaves_nothing(self, tmp_path):
+    out = tmp_path / "out.tar.gz"
+    with pytest.raises(RuntimeError):
+      with ArchiveWriter(out) as writer:
+        writer.add("A.yaml", b"a: 1\n")
+        raise RuntimeError("interrupted")
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,43 @@
+"""Smoke test for the benchmark harness."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import migratassert
+
+# benchmarks/ sits at the repository root, beside lib/
+REPO_ROOT = Path(__file__).parents[1]
+
+
+def run_bench(*args: str) -> subprocess.CompletedProcess:
+  """Run python -m benchmarks from the repository root."""
+  package_root = str(Path(migratassert.__file__).parents[1])
+  pythonpath = os.pathsep.join(filter(None, [str(REPO_ROOT), package_root, os.environ.get("PYTHONPATH")]))
+  env = dict(os.environ, PYTHONPATH=pythonpath)
+  return subprocess.run(
+    [sys.executable, "-m", "benchmarks", *args],
+    cwd=REPO_ROOT,
+    env=env,
+    capture_output=True,
+    text=True,
+  )
+
+
+def test_tiny_corpus(tmp_path):
+  output = tmp_path / "bench.json"
+  result = run_bench("--files", "3", "--sections", "1", "--repeat", "1", "--output", str(output))
+  assert result.returncode == 0, result.stderr
+
+  runs = json.loads(output.read_text())["runs"]
+  assert [run["engine"] for run in runs] == ["roundtrip", "fast"]
+  for run in runs:
+    assert set(run["phases"]) == {"parse", "transform", "dump", "total", "end_to_end"}
+    assert run["phases"]["end_to_end"]["seconds"] > 0
+  assert "end_to_end" in result.stdout
+
+  compared = run_bench("--files", "3", "--repeat", "1", "--compare", str(output), "--threshold", "1000")
+  assert compared.returncode == 0, compared.stderr
+  assert "end_to_end" in compared.stdout
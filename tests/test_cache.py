@@ -0,0 +1,114 @@
+"""Tests for the sub-block memoization cache."""
+
+import pytest
+from ruamel.yaml import YAML
+
+from migratassert.annotations import map_annotations
+from migratassert.cache import BLOCK_CACHE, BlockCache, canonical_key, configure_block_cache
+from migratassert.encoding import map_node_encoding
+from migratassert.migrate import run_migration
+
+
+@pytest.fixture
+def enabled_cache():
+  configure_block_cache(64)
+  yield BLOCK_CACHE
+  configure_block_cache(0)
+
+
+ENCODING = {
+  "encoding_method": "column",
+  "value_for_encoding": "A",
+  "mapping_hyperparameters": {
+    "classes_to_prioritize": ["biolink:Gene"],
+    "stray": 1,
+  },
+}
+
+
+class TestCanonicalKey:
+  def test_distinguishes_scalar_types(self):
+    assert canonical_key(1) != canonical_key(1.0)
+    assert canonical_key(1) != canonical_key(True)
+    assert canonical_key("1") != canonical_key(1)
+
+  def test_preserves_order(self):
+    assert canonical_key({"a": 1, "b": 2}) != canonical_key({"b": 2, "a": 1})
+
+  def test_distinguishes_float_spelling(self):
+    loaded = YAML().load("a: 0.050\nb: 0.05\n")
+    assert canonical_key(loaded["a"]) != canonical_key(loaded["b"])
+
+
+class TestBlockCache:
+  def test_disabled_by_default(self):
+    cache = BlockCache()
+    calls = []
+    cache.lookup("ns", {"a": 1}, "", lambda: calls.append(1) or {})
+    cache.lookup("ns", {"a": 1}, "", lambda: calls.append(1) or {})
+    assert len(calls) == 2
+    assert cache.hits == cache.misses == 0
+
+  def test_hits_return_independent_copies(self):
+    cache = BlockCache(maxsize=4)
+    first = cache.lookup("ns", {"a": 1}, "p.", lambda: {"x": [1]})
+    first["x"].append(2)
+    second = cache.lookup("ns", {"a": 1}, "p.", lambda: {"x": [99]})
+    assert second == {"x": [1]}
+    third = cache.lookup("ns", {"a": 1}, "p.", lambda: {"x": [99]})
+    assert third is not second
+    assert (cache.hits, cache.misses) == (2, 1)
+
+  def test_prefix_is_part_of_key(self):
+    cache = BlockCache(maxsize=4)
+    cache.lookup("ns", {"a": 1}, "p.", lambda: 1)
+    assert cache.lookup("ns", {"a": 1}, "q.", lambda: 2) == 2
+
+  def test_evicts_least_recently_used(self):
+    cache = BlockCache(maxsize=2)
+    cache.lookup("ns", 1, "", lambda: "one")
+    cache.lookup("ns", 2, "", lambda: "two")
+    cache.lookup("ns", 1, "", lambda: "unused")
+    cache.lookup("ns", 3, "", lambda: "three")
+    assert cache.lookup("ns", 1, "", lambda: "unused") == "one"
+    assert cache.lookup("ns", 2, "", lambda: "recomputed") == "recomputed"
+
+  def test_unhashable_blocks_bypass_cache(self):
+    cache = BlockCache(maxsize=2)
+    assert cache.lookup("ns", {"a": {1, 2}}, "", lambda: "computed") == "computed"
+    assert cache.misses == 0
+
+
+class TestCachedMappers:
+  def test_node_encoding_matches_uncached(self, enabled_cache):
+    expected = {"method": "column", "encoding": "A", "prioritize": ["Gene"]}
+    for _ in range(3):
+      result = map_node_encoding(ENCODING, field_prefix="s.")
+      assert result.mapped == expected
+      assert result.dropped == ["s.stray"]
+      result.mapped["prioritize"].append("mutated")
+    assert enabled_cache.hits == 2
+
+  def test_annotations_cached_per_attribute(self, enabled_cache):
+    attributes = {"p_value": {"encoding_method": "column", "value_for_encoding": "p"}}
+    first = map_annotations(attributes)
+    second = map_annotations(attributes)
+    assert first.mapped == second.mapped == [
+      {"annotation": "p value", "method": "column", "encoding": "p"}
+    ]
+    assert first.mapped[0] is not second.mapped[0]
+
+
+class TestReportedCounters:
+  def test_run_migration_counts_hits(self, tmp_path):
+    indir = tmp_path / "input"
+    indir.mkdir()
+    yaml = YAML()
+    for i in range(3):
+      with open(indir / f"c{i}.yaml", "w") as f:
+        yaml.dump({"template": {"triple": {"triple_subject": ENCODING}}}, f)
+
+    result = run_migration(indir, tmp_path / "out", cache_size=16)
+    assert result.cache_misses == 1
+    assert result.cache_hits == 2
+    configure_block_cache(0)
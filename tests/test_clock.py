@@ -0,0 +1,131 @@
+"""Tests for the run-wide clock snapshot."""
+
+import time
+import zipfile
+
+import pytest
+from typer.testing import CliRunner
+
+from migratassert.cli import app
+from migratassert.clock import RUN_CLOCK, SOURCE_DATE_EPOCH, capture_clock, configure_run_clock
+from migratassert.migrate import dump_yaml, run_migration
+from migratassert.provenance import map_provenance
+
+# 2025-01-09T23:59:59Z
+EPOCH = 1736467199
+
+CONFIG = {
+  "template": {"provenance": {"publication": "PMC:1", "config_curator_name": "Jane Doe"}},
+  "sections": [{"provenance": {"config_curator_name": f"Curator {index}"}} for index in range(4)],
+}
+
+
+@pytest.fixture(autouse=True)
+def reset_clock(monkeypatch):
+  monkeypatch.delenv(SOURCE_DATE_EPOCH, raising=False)
+  yield
+  configure_run_clock(None)
+
+
+class TestCaptureClock:
+  def test_pinned_epoch_is_utc(self):
+    snapshot = capture_clock(EPOCH)
+    assert snapshot.epoch == EPOCH
+    assert snapshot.contributor_date == "09 JAN 2025"
+    assert snapshot.pinned
+    assert not capture_clock().pinned
+
+  def test_source_date_epoch(self, monkeypatch):
+    monkeypatch.setenv(SOURCE_DATE_EPOCH, str(EPOCH))
+    assert capture_clock().contributor_date == "09 JAN 2025"
+    # An explicit epoch wins over the environment
+    assert capture_clock(0).contributor_date == "01 JAN 1970"
+
+  def test_invalid_source_date_epoch(self, monkeypatch):
+    monkeypatch.setenv(SOURCE_DATE_EPOCH, "yesterday")
+    with pytest.raises(ValueError, match="SOURCE_DATE_EPOCH must be an integer"):
+      capture_clock()
+
+
+class TestRunClock:
+  def test_captured_once(self):
+    configure_run_clock(None)
+    assert RUN_CLOCK.current() is RUN_CLOCK.current()
+
+  def test_map_provenance_uses_run_clock(self):
+    configure_run_clock(capture_clock(EPOCH))
+    contributor = map_provenance({"config_curator_name": "Jane"}).mapped["contributors"][0]
+    assert contributor["date"] == "09 JAN 2025"
+    contributor = map_provenance({"config_curator_name": "Jane"}, contributor_date="01 FEB 2025").mapped["contributors"][0]
+    assert contributor["date"] == "01 FEB 2025"
+
+
+class TestRunMigration:
+  @pytest.fixture
+  def indir(self, tmp_path):
+    indir = tmp_path / "in"
+    indir.mkdir()
+    for name in ("a", "b"):
+      (indir / f"{name}.yaml").write_text(dump_yaml(CONFIG))
+    return indir
+
+  @pytest.mark.parametrize(
+    "options",
+    [{}, {"jobs": 2}, {"async_io": True}, {"section_workers": 2, "section_threshold": 2}],
+  )
+  def test_reruns_are_unchanged(self, tmp_path, indir, options):
+    first = run_migration(indir, tmp_path / "out", clock=capture_clock(EPOCH), **options)
+    text = (tmp_path / "out" / "A.yaml").read_text()
+    assert text.count("date: 09 JAN 2025") == 5
+    second = run_migration(indir, tmp_path / "out", clock=capture_clock(EPOCH), **options)
+    assert first.files_unchanged == 0
+    assert second.files_unchanged == 2
+
+  def test_snapshot_released_after_run(self, tmp_path, indir):
+    run_migration(indir, tmp_path / "out", clock=capture_clock(EPOCH))
+    assert RUN_CLOCK.snapshot is None
+
+  def test_source_date_epoch_environment(self, tmp_path, indir, monkeypatch):
+    monkeypatch.setenv(SOURCE_DATE_EPOCH, str(EPOCH))
+    run_migration(indir, tmp_path / "out", jobs=2)
+    assert "date: 09 JAN 2025" in (tmp_path / "out" / "B.yaml").read_text()
+
+  @pytest.mark.parametrize("suffix", [".tar.gz", ".zip"])
+  def test_archives_are_byte_identical(self, tmp_path, indir, suffix):
+    first, second = tmp_path / f"one{suffix}", tmp_path / f"two{suffix}"
+    run_migration(indir, first, clock=capture_clock(EPOCH))
+    run_migration(indir, second, clock=capture_clock(EPOCH))
+    assert first.read_bytes() == second.read_bytes()
+
+  def test_zip_before_1980(self, tmp_path, indir):
+    result = run_migration(indir, tmp_path / "out.zip", clock=capture_clock(0))
+    assert result.files_failed == 0
+    with zipfile.ZipFile(tmp_path / "out.zip") as zf:
+      assert [info.date_time for info in zf.infolist()] == [(1980, 1, 1, 0, 0, 0)] * 2
+
+  def test_zip_ignores_time_zone(self, tmp_path, indir, monkeypatch):
+    archives = []
+    for zone in ("UTC", "Asia/Tokyo"):
+      monkeypatch.setenv("TZ", zone)
+      time.tzset()
+      archives.append(tmp_path / f"{zone.replace('/', '_')}.zip")
+      run_migration(indir, archives[-1], clock=capture_clock(EPOCH))
+    monkeypatch.delenv("TZ")
+    time.tzset()
+    assert archives[0].read_bytes() == archives[1].read_bytes()
+
+
+class TestCli:
+  def test_source_date_epoch_option(self, tmp_path):
+    indir = tmp_path / "in"
+    indir.mkdir()
+    (indir / "a.yaml").write_text(dump_yaml(CONFIG))
+    result = CliRunner().invoke(app, ["-i", str(indir), "-o", str(tmp_path / "out"), "--source-date-epoch", "0"])
+    assert result.exit_code == 0, result.output
+    assert "date: 01 JAN 1970" in (tmp_path / "out" / "A.yaml").read_text()
+
+  def test_invalid_environment(self, tmp_path, monkeypatch):
+    monkeypatch.setenv(SOURCE_DATE_EPOCH, "soon")
+    result = CliRunner().invoke(app, ["-i", str(tmp_path), "-o", str(tmp_path / "out")])
+    assert result.exit_code == 2
+    assert "SOURCE_DATE_EPOCH must be an integer" in result.output
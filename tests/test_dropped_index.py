@@ -0,0 +1,135 @@
+"""Tests for the SQLite dropped-field index."""
+
+import sqlite3
+from pathlib import Path
+
+from migratassert.dropped_index import (
+  INDEX_NAME,
+  DroppedFieldIndex,
+  default_index_path,
+  field_counts,
+  field_locations,
+)
+from migratassert.migrate import FileResult, run_migration
+
+CONFIG = (
+  "template:\n"
+  "  triple:\n"
+  "    triple_subject:\n"
+  "      encoding_method: column\n"
+  "      value_for_encoding: A\n"
+  "      mapping_hyperparameters:\n"
+  "        stray: 1\n"
+)
+
+SECTION = (
+  "sections:\n"
+  "  - triple:\n"
+  "      triple_object:\n"
+  "        encoding_method: column\n"
+  "        value_for_encoding: B\n"
+  "        mapping_hyperparameters:\n"
+  "          odd: 2\n"
+)
+
+
+def result(name: str, fields: list[str], blocks: list[str] | None = None, **kwargs) -> FileResult:
+  return FileResult(
+    source_path=Path(name),
+    dest_path=Path(name.upper()),
+    success=True,
+    dropped_fields=fields,
+    dropped_blocks=blocks if blocks is not None else ["template"] * len(fields),
+    **kwargs,
+  )
+
+
+def build(path: Path, *results: FileResult) -> None:
+  index = DroppedFieldIndex(path, commit_every=1)
+  for file_result in results:
+    index.add(file_result, file_result.source_path.as_posix(), file_result.dest_path.as_posix())
+  index.close()
+
+
+class TestDefaultIndexPath:
+  def test_directory(self, tmp_path):
+    assert default_index_path(tmp_path / "out") == tmp_path / "out" / INDEX_NAME
+
+  def test_archive(self, tmp_path):
+    assert default_index_path(tmp_path / "out.tar.gz") == tmp_path / "out.tar.gz.dropped.sqlite"
+
+
+class TestDroppedFieldIndex:
+  def test_counts_and_locations(self, tmp_path):
+    path = tmp_path / "index.sqlite"
+    build(
+      path,
+      result("a.yaml", ["triple.subject.x"]),
+      result("b.yaml", ["triple.subject.x", "triple.object.y"], ["template", "sections[0]"]),
+    )
+    assert field_counts(path) == [("triple.subject.x", 2, 2), ("triple.object.y", 1, 1)]
+    assert field_counts(path, "triple.object.*") == [("triple.object.y", 1, 1)]
+    assert field_locations(path, "triple.*.y") == [("triple.object.y", "b.yaml", "", "sections[0]")]
+
+  def test_rerun_replaces_rows_and_prunes_unseen_files(self, tmp_path):
+    path = tmp_path / "index.sqlite"
+    build(path, result("a.yaml", ["triple.subject.x"]), result("b.yaml", ["triple.subject.x"]))
+    build(path, result("a.yaml", ["triple.object.y"]))
+    assert field_counts(path) == [("triple.object.y", 1, 1)]
+
+  def test_skipped_file_keeps_previous_rows(self, tmp_path):
+    path = tmp_path / "index.sqlite"
+    build(
+      path,
+      result("a.yaml", ["triple.subject.x"], document_index=0),
+      result("a.yaml", ["triple.object.y"], document_index=1),
+    )
+    build(path, result("a.yaml", ["triple.subject.x", "triple.object.y"], [], skipped=True))
+    assert [row[2] for row in field_locations(path, "*")] == ["1", "2"]
+    assert all(row[3] == "template" for row in field_locations(path, "*"))
+
+  def test_interrupted_run_does_not_prune(self, tmp_path):
+    path = tmp_path / "index.sqlite"
+    build(path, result("a.yaml", ["triple.subject.x"]))
+    index = DroppedFieldIndex(path)
+    index.add(result("b.yaml", ["triple.object.y"]), source="b.yaml", dest="B.yaml")
+    index.close(prune=False)
+    assert {row[0] for row in field_counts(path)} == {"triple.subject.x", "triple.object.y"}
+
+  def test_rows_follow_deleted_files(self, tmp_path):
+    path = tmp_path / "index.sqlite"
+    build(path, result("a.yaml", ["triple.subject.x"]))
+    build(path)
+    with sqlite3.connect(path) as conn:
+      assert conn.execute("SELECT COUNT(*) FROM dropped").fetchone() == (0,)
+
+
+class TestRunMigrationIndex:
+  def test_records_fields_by_block(self, tmp_path):
+    indir = tmp_path / "in"
+    indir.mkdir()
+    (indir / "a.yaml").write_text(CONFIG)
+    (indir / "b.yaml").write_text(CONFIG + SECTION)
+    outdir = tmp_path / "out"
+    index = default_index_path(outdir)
+
+    run_migration(indir, outdir, dropped_index=index)
+    assert field_locations(index, "*") == [
+      ("triple.subject.stray", "a.yaml", "", "template"),
+      ("triple.object.odd", "b.yaml", "", "sections[0]"),
+      ("triple.subject.stray", "b.yaml", "", "template"),
+    ]
+
+    # Incremental re-runs keep skipped files and drop removed ones
+    (indir / "a.yaml").unlink()
+    run_migration(indir, outdir, incremental=True, dropped_index=index)
+    run_migration(indir, outdir, incremental=True, dropped_index=index)
+    assert field_counts(index) == [("triple.object.odd", 1, 1), ("triple.subject.stray", 1, 1)]
+
+  def test_dry_run_writes_nothing(self, tmp_path):
+    indir = tmp_path / "in"
+    indir.mkdir()
+    (indir / "a.yaml").write_text(CONFIG)
+    index = tmp_path / "index.sqlite"
+    run_migration(indir, tmp_path / "out", dry_run=True, dropped_index=index)
+    assert not index.exists()
@@ -103,3 +103,37 @@ class TestMapNodeEncoding:
     }
     result = map_node_encoding(v440, field_prefix="subject.")
     assert "subject.unknown_field" in result.dropped
+
+  def test_output_order_follows_field_map_not_input(self):
+    v440 = {
+      "value_for_encoding": "A",
+      "encoding_method": "column_of_values",
+      "mapping_hyperparameters": {
+        "explode_by_delimiter": ";",
+        "zzz_unknown": 1,
+        "classes_to_avoid": ["biolink:Cell"],
+        "in_this_organism": "NCBITaxon:9606",
+        "aaa_unknown": 2,
+      },
+    }
+    result = map_node_encoding(v440, field_prefix="s.")
+    assert list(result.mapped) == ["method", "encoding", "taxon", "avoid", "explode_by"]
+    assert result.mapped["method"] == "column"
+    assert result.mapped["avoid"] == ["Cell"]
+    assert result.dropped == ["s.zzz_unknown", "s.aaa_unknown"]
+
+
+class TestEncodingPlan:
+  def test_recompile_picks_up_table_changes(self, monkeypatch):
+    import migratassert.encoding as encoding
+
+    monkeypatch.setitem(encoding.HYPERPARAMETER_FIELD_MAP, "new_field", "renamed")
+    encoding.recompile_encoding_plan()
+    try:
+      result = map_node_encoding({"mapping_hyperparameters": {"new_field": 1}})
+      assert result.mapped == {"renamed": 1}
+    finally:
+      monkeypatch.undo()
+      encoding.recompile_encoding_plan()
+
+    assert map_node_encoding({"mapping_hyperparameters": {"new_field": 1}}).dropped == ["new_field"]
@@ -0,0 +1,81 @@
+"""Tests for dump-free output size estimates."""
+
+import datetime
+
+import pytest
+
+from migratassert.estimate import estimate_yaml_bytes, scalar_bytes
+from migratassert.migrate import dump_yaml, migrate_file, run_migration
+from migratassert.report import format_bytes, format_report
+from migratassert.transform import transform_config
+
+EDGE_CASES = {
+  "none": None,
+  "empty_list": [],
+  "empty_map": {},
+  "flag": False,
+  "small": 1.5e-7,
+  "colon": "x: y",
+  "empty": "",
+  "apostrophe": "it's",
+  "numeric": "123",
+  "boolean": "true",
+  "dash": "-a",
+  "newline": "a\nb",
+  "nested": [[1, 2], {"x": 1}, [], {}],
+  "nulls": [None, {"x": None}, [None]],
+  "date": datetime.date(2025, 1, 1),
+  "comment": "a #b",
+  "leading": " lead",
+  "alias": "*x",
+  "url": "http://example.org/a?b=1",
+  "flow": "[x]",
+  "unicode": "Ångström",
+}
+
+
+class TestEstimateYamlBytes:
+  @pytest.mark.parametrize("engine", ["roundtrip", "fast"])
+  def test_matches_dump_for_edge_cases(self, engine):
+    for key, value in EDGE_CASES.items():
+      assert estimate_yaml_bytes({key: value}) == len(dump_yaml({key: value}, engine).encode("utf-8")), key
+
+  def test_matches_dump_for_transformed_config(self, v440_full_config):
+    tc3 = transform_config(v440_full_config, file_stem="ALAM1").config
+    assert estimate_yaml_bytes(tc3) == len(dump_yaml(tc3).encode("utf-8"))
+
+  def test_scalar_quotes(self):
+    assert scalar_bytes("plain") == 5
+    assert scalar_bytes("yes") == 5
+    assert scalar_bytes(7) == 1
+
+
+class TestDryRunEstimate:
+  def test_migrate_file_estimates_output_bytes(self, tmp_path, v440_full_config):
+    source = tmp_path / "alam1.yaml"
+    source.write_text(dump_yaml(v440_full_config))
+    planned = migrate_file(source, tmp_path / "planned.yaml", dry_run=True)
+    written = migrate_file(source, tmp_path / "ALAM1.yaml")
+    assert not (tmp_path / "planned.yaml").exists()
+    assert planned.output_bytes == written.output_bytes
+    assert "estimate" in planned.phase_wall and "dump" not in planned.phase_wall
+
+  def test_report_shows_estimated_total(self, tmp_path, v440_full_config):
+    indir = tmp_path / "in"
+    indir.mkdir()
+    for name in ("a", "b"):
+      (indir / f"{name}.yaml").write_text(dump_yaml(v440_full_config))
+    result = run_migration(indir, tmp_path / "out", dry_run=True, yaml_engine="fast")
+    assert result.output_estimated
+    assert result.output_bytes == sum(fr.output_bytes for fr in result.file_results) > 0
+    assert f"Estimated output size: {format_bytes(result.output_bytes)}" in format_report(result)
+
+    written = run_migration(indir, tmp_path / "out")
+    assert not written.output_estimated
+    assert "Estimated output size" not in format_report(written)
+
+
+def test_format_bytes():
+  assert format_bytes(512) == "512 B"
+  assert format_bytes(1536) == "1.5 KiB"
+  assert format_bytes(3 * 1024**3) == "3.0 GiB"
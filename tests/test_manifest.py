@@ -0,0 +1,164 @@
+"""Tests for incremental migration manifest."""
+
+import json
+from pathlib import Path
+
+import pytest
+from ruamel.yaml import YAML
+
+from migratassert.clock import capture_clock
+from migratassert.manifest import (
+  MANIFEST_NAME,
+  Manifest,
+  ManifestEntry,
+  load_manifest,
+  mapping_tables_hash,
+  save_manifest,
+)
+from migratassert.migrate import run_migration
+
+
+@pytest.fixture
+def corpus(tmp_path):
+  yaml = YAML()
+  indir = tmp_path / "input"
+  indir.mkdir()
+  for name in ("alpha", "beta"):
+    config = {
+      "template": {
+        "location": {"posix_filepath": f"/data/{name}.csv"},
+        "triple": {
+          "triple_subject": {
+            "encoding_method": "column",
+            "value_for_encoding": "A",
+            "mapping_hyperparameters": {"unknown_key": 1},
+          },
+        },
+      }
+    }
+    with open(indir / f"{name}.yaml", "w") as f:
+      yaml.dump(config, f)
+  return indir
+
+
+class TestManifestPersistence:
+  def test_round_trips_entries(self, tmp_path):
+    manifest = Manifest()
+    manifest.entries["a.yaml"] = ManifestEntry("abc", "A.yaml", ["x.y"])
+    save_manifest(manifest, tmp_path)
+
+    loaded = load_manifest(tmp_path)
+    assert loaded.entries == manifest.entries
+
+  def test_stale_mapping_hash_discards_entries(self, tmp_path):
+    manifest = Manifest(mapping_hash="stale")
+    manifest.entries["a.yaml"] = ManifestEntry("abc", "A.yaml")
+    save_manifest(manifest, tmp_path)
+
+    assert load_manifest(tmp_path).entries == {}
+
+  def test_missing_manifest_is_empty(self, tmp_path):
+    assert load_manifest(tmp_path).entries == {}
+
+  def test_mapping_hash_is_stable(self):
+    assert mapping_tables_hash() == mapping_tables_hash()
+
+
+class TestIncrementalRun:
+  def test_second_run_skips_unchanged(self, tmp_path, corpus):
+    outdir = tmp_path / "output"
+    first = run_migration(corpus, outdir, incremental=True)
+    assert first.files_skipped == 0
+    assert (outdir / MANIFEST_NAME).exists()
+
+    second = run_migration(corpus, outdir, incremental=True)
+    assert second.files_processed == 2
+    assert second.files_succeeded == 2
+    assert second.files_skipped == 2
+    assert all(fr.skipped for fr in second.file_results)
+    assert second.all_dropped_fields == first.all_dropped_fields
+
+  def test_changed_source_is_migrated(self, tmp_path, corpus):
+    outdir = tmp_path / "output"
+    run_migration(corpus, outdir, incremental=True)
+
+    with open(corpus / "beta.yaml", "a") as f:
+      f.write("sections: []\n")
+
+    result = run_migration(corpus, outdir, incremental=True, jobs=2)
+    skipped = {fr.source_path.name: fr.skipped for fr in result.file_results}
+    assert skipped == {"alpha.yaml": True, "beta.yaml": False}
+
+  def test_missing_output_is_migrated(self, tmp_path, corpus):
+    outdir = tmp_path / "output"
+    run_migration(corpus, outdir, incremental=True)
+    (outdir / "ALPHA.yaml").unlink()
+
+    result = run_migration(corpus, outdir, incremental=True)
+    assert result.files_skipped == 1
+    assert (outdir / "ALPHA.yaml").exists()
+
+  def test_changed_source_is_read_once(self, tmp_path, corpus, monkeypatch):
+    outdir = tmp_path / "output"
+    run_migration(corpus, outdir, incremental=True)
+    with open(corpus / "beta.yaml", "a") as f:
+      f.write("sections: []\n")
+
+    reads = []
+    read_bytes = Path.read_bytes
+
+    def counting_read_bytes(path):
+      reads.append(path)
+      return read_bytes(path)
+
+    monkeypatch.setattr(Path, "read_bytes", counting_read_bytes)
+    result = run_migration(corpus, outdir, incremental=True)
+    assert result.files_skipped == 1
+    # Each source is read once, whether it is skipped or migrated
+    assert sorted(path.name for path in reads if path.parent == corpus) == ["alpha.yaml", "beta.yaml"]
+
+  @pytest.mark.parametrize("async_io", [False, True])
+  def test_unreadable_source_fails_alone(self, tmp_path, corpus, monkeypatch, async_io):
+    outdir = tmp_path / "output"
+    read_bytes = Path.read_bytes
+
+    def failing_read_bytes(path):
+      if path.name == "beta.yaml":
+        raise PermissionError(f"Permission denied: '{path}'")
+      return read_bytes(path)
+
+    monkeypatch.setattr(Path, "read_bytes", failing_read_bytes)
+    result = run_migration(corpus, outdir, incremental=True, async_io=async_io)
+    failed = [fr for fr in result.file_results if not fr.success]
+    assert [fr.source_path.name for fr in failed] == ["beta.yaml"]
+    assert "Permission denied" in failed[0].error
+
+    # The manifest is still saved, without the unreadable source
+    raw = json.loads((outdir / MANIFEST_NAME).read_text())
+    assert set(raw["entries"]) == {"alpha.yaml"}
+
+  def test_manifest_records_hashes(self, tmp_path, corpus):
+    outdir = tmp_path / "output"
+    run_migration(corpus, outdir, incremental=True, jobs=2)
+
+    raw = json.loads((outdir / MANIFEST_NAME).read_text())
+    assert set(raw["entries"]) == {"alpha.yaml", "beta.yaml"}
+    assert raw["entries"]["alpha.yaml"]["dest_name"] == "ALPHA.yaml"
+
+  @pytest.mark.parametrize(
+    ("first", "second"),
+    [
+      ({"yaml_engine": "fast"}, {"yaml_engine": "roundtrip"}),
+      ({}, {"multi_document": True}),
+      ({"clock": capture_clock(0)}, {"clock": capture_clock(86400 * 400)}),
+      ({}, {"clock": capture_clock(0)}),
+    ],
+  )
+  def test_output_options_invalidate_entries(self, tmp_path, corpus, first, second):
+    outdir = tmp_path / "output"
+    run_migration(corpus, outdir, incremental=True, **first)
+    assert run_migration(corpus, outdir, incremental=True, **first).files_skipped == 2
+
+    result = run_migration(corpus, outdir, incremental=True, **second)
+    assert result.files_skipped == 0
+    assert run_migration(corpus, outdir, incremental=True, **second).files_skipped == 2
@@ -3,13 +3,17 @@
 import pytest
 from pathlib import Path
 
+from migratassert.clock import capture_clock, configure_run_clock
 from migratassert.migrate import (
   discover_yaml_files,
+  get_yaml,
   migrate_file,
   run_migration,
   dump_yaml,
 )
 
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
 
 @pytest.fixture
 def sample_v440_config():
@@ -116,3 +120,287 @@ class TestRunMigration:
     assert result.files_processed == 3
     assert result.files_succeeded == 3
     assert len(list(outdir.glob("*.yaml"))) == 3
+
+  def test_parallel_matches_serial(self, tmp_path, sample_v440_config):
+    from ruamel.yaml import YAML
+    yaml = YAML()
+
+    indir = tmp_path / "input"
+    indir.mkdir()
+    for i in range(6):
+      config = dict(sample_v440_config)
+      config["template"] = dict(sample_v440_config["template"])
+      config["template"]["location"] = {
+        "posix_filepath": "/data/test.csv",
+        "download_hyperparameters": {"file_extension": "csv"},
+      }
+      with open(indir / f"config{i}.yaml", "w") as f:
+        yaml.dump(config, f)
+    (indir / "broken.yaml").write_text("template: [unclosed\n")
+
+    serial = run_migration(indir, tmp_path / "serial")
+    parallel = run_migration(indir, tmp_path / "parallel", jobs=3)
+
+    assert parallel.files_processed == serial.files_processed == 7
+    assert parallel.files_failed == serial.files_failed == 1
+    assert [fr.dest_path.name for fr in parallel.file_results] == [
+      fr.dest_path.name for fr in serial.file_results
+    ]
+    assert parallel.all_dropped_fields == serial.all_dropped_fields
+    for fr in serial.file_results:
+      if fr.success:
+        assert (tmp_path / "parallel" / fr.dest_path.name).read_text() == fr.dest_path.read_text()
+
+
+class TestYamlEngines:
+  @pytest.mark.parametrize("engine", ["roundtrip", "fast"])
+  def test_golden_output(self, tmp_path, engine, tc3_expected_config):
+    from ruamel.yaml import YAML
+
+    dest = tmp_path / "OUT.yaml"
+    configure_run_clock(capture_clock(0))
+    try:
+      result = migrate_file(
+        FIXTURES_DIR / "v440_full.yaml",
+        dest,
+        yaml=get_yaml(engine),
+      )
+    finally:
+      configure_run_clock(None)
+    assert result.success
+    # The source has no scalars the fast engine re-spells (see below), so
+    # both engines must write the golden bytes exactly
+    assert dest.read_bytes() == (FIXTURES_DIR / "tc3_golden.yaml").read_bytes()
+
+    # tc3_expected.yaml is hand-written (its quoting differs from the dump),
+    # so check the values too; it has no contributor dates, which default
+    # to the (pinned) run date
+    migrated = YAML().load(dest.read_text())
+    for contributor in tc3_expected_config["template"]["provenance"]["contributors"]:
+      contributor["date"] = "01 JAN 1970"
+    assert migrated == tc3_expected_config
+
+  def test_engines_match_without_respelled_scalars(self, tmp_path):
+    # The fixture has no scalars the fast engine re-spells (see below)
+
+    outputs = []
+    for engine in ("roundtrip", "fast"):
+      dest = tmp_path / f"{engine}.yaml"
+      assert migrate_file(FIXTURES_DIR / "v440_full.yaml", dest, yaml=get_yaml(engine)).success
+      outputs.append(dest.read_bytes())
+    assert outputs[0] == outputs[1]
+
+  def test_fast_engine_respells_scalars(self, tmp_path):
+    source = tmp_path / "input.yaml"
+    source.write_text(
+      "template:\n"
+      "  location:\n"
+      "    where_to_download_data_from: https://example.org/a.csv\n"
+      "  reindexing:\n"
+      "    - column: p\n"
+      "      comparison: lt\n"
+      "      value_for_comparison: 1e-5\n"
+      "    - column: q\n"
+      "      comparison: lt\n"
+      "      value_for_comparison: 0.10\n"
+      "  triple:\n"
+      "    triple_predicate: |\n"
+      "      line one\n"
+      "      line two\n"
+    )
+    texts = {}
+    for engine in ("roundtrip", "fast"):
+      dest = tmp_path / f"{engine}.yaml"
+      assert migrate_file(source, dest, yaml=get_yaml(engine)).success
+      texts[engine] = dest.read_text()
+    assert "comparator: 1e-5\n" in texts["roundtrip"] and "comparator: 0.10\n" in texts["roundtrip"]
+    assert "predicate: |\n" in texts["roundtrip"]
+    assert "comparator: 1e-05\n" in texts["fast"] and "comparator: 0.1\n" in texts["fast"]
+    assert 'predicate: "line one\\nline two\\n"\n' in texts["fast"]
+
+  def test_dump_yaml_engines_match(self):
+    data = {"template": {"syntax": "TC3", "source": {"row_slice": [1, "auto"]}}}
+    assert dump_yaml(data, engine="fast") == dump_yaml(data, engine="roundtrip")
+
+  @pytest.mark.parametrize("engine", ["roundtrip", "fast"])
+  def test_dump_yaml_writes_none_as_empty_scalar(self, engine):
+    data = {"a": None, "b": [None, 1], "c": {"d": None}}
+    assert dump_yaml(data, engine=engine).encode("utf-8") == b"a:\nb:\n  - \n  - 1\nc:\n  d:\n"
+
+  @pytest.mark.parametrize("engine", ["roundtrip", "fast"])
+  def test_input_formatting_is_not_carried_over(self, tmp_path, engine):
+    source = tmp_path / "input.yaml"
+    source.write_text(
+      "template:\n"
+      "  triple:\n"
+      "    triple_subject: &subj\n"
+      "      encoding_method: column\n"
+      "      value_for_encoding: A\n"
+      "      mapping_hyperparameters:\n"
+      "        classes_to_prioritize: [biolink:Gene]  # flow\n"
+      "        substrings_to_remove: [a, b]\n"
+      "    triple_object: *subj\n"
+    )
+    dest = tmp_path / "OUT.yaml"
+    assert migrate_file(source, dest, yaml=get_yaml(engine)).success
+
+    content = dest.read_text()
+    assert "[" not in content
+    assert "#" not in content
+    assert "&" not in content and "*" not in content
+    assert content.count("- a") == 2
+
+  def test_unknown_engine_rejected(self):
+    with pytest.raises(ValueError):
+      get_yaml("turbo")
+
+
+class TestRecursiveDiscovery:
+  @pytest.fixture
+  def tree(self, tmp_path):
+    root = tmp_path / "input"
+    for rel in ["b.yaml", "a.yml", "sub/c.yaml", "sub/deep/d.yaml", "skip/e.yaml", "sub/notes.txt"]:
+      path = root / rel
+      path.parent.mkdir(parents=True, exist_ok=True)
+      path.write_text("template:\n  provenance:\n    publication: PMC:1\n")
+    return root
+
+  def _relative(self, root, paths):
+    return [p.relative_to(root).as_posix() for p in paths]
+
+  def test_top_level_only_by_default(self, tree):
+    from migratassert.migrate import iter_yaml_files
+    assert self._relative(tree, iter_yaml_files(tree)) == ["a.yml", "b.yaml"]
+
+  def test_recursive_ordered(self, tree):
+    from migratassert.migrate import iter_yaml_files
+    found = self._relative(tree, iter_yaml_files(tree, recursive=True))
+    assert found == ["a.yml", "b.yaml", "skip/e.yaml", "sub/c.yaml", "sub/deep/d.yaml"]
+
+  def test_include_and_exclude(self, tree):
+    from migratassert.migrate import iter_yaml_files
+    found = self._relative(
+      tree,
+      iter_yaml_files(tree, recursive=True, include=["sub/*"], exclude=["sub/deep"]),
+    )
+    assert found == ["sub/c.yaml"]
+
+  def test_unordered_finds_same_files(self, tree):
+    from migratassert.migrate import iter_yaml_files
+    ordered = self._relative(tree, iter_yaml_files(tree, recursive=True))
+    unordered = self._relative(tree, iter_yaml_files(tree, recursive=True, ordered=False))
+    assert sorted(unordered) == sorted(ordered)
+
+  def test_run_migration_mirrors_tree(self, tree, tmp_path):
+    outdir = tmp_path / "output"
+    result = run_migration(tree, outdir, recursive=True, exclude=["skip"])
+    assert result.files_succeeded == 4
+    assert (outdir / "sub" / "deep" / "D.yaml").exists()
+    assert (outdir / "A.yml").exists()
+    assert not (outdir / "skip").exists()
+
+  def test_output_inside_input_is_not_rescanned(self, tree):
+    outdir = tree / "out"
+    run_migration(tree, outdir, recursive=True)
+    second = run_migration(tree, outdir, recursive=True)
+    assert second.files_processed == 5
+
+  def test_parallel_recursive_matches_serial(self, tree, tmp_path):
+    serial = run_migration(tree, tmp_path / "s", recursive=True)
+    parallel = run_migration(tree, tmp_path / "p", recursive=True, jobs=2)
+    assert [fr.source_path for fr in parallel.file_results] == [
+      fr.source_path for fr in serial.file_results
+    ]
+
+
+STREAM = (
+  "# stream of v4.4.0 configs\n"
+  "document_id: alam1\n"
+  "template:\n"
+  "  location:\n"
+  "    where_to_download_data_from: https://example.org/a.csv\n"
+  "---\n"
+  "template:\n"
+  "  location:\n"
+  "    where_to_download_data_from: https://example.org/b.csv\n"
+  "...\n"
+  "--- \n"
+  "document_id: bad\n"
+  "template: [unclosed\n"
+  "---\n"
+  "document_id: c3\n"
+  "template:\n"
+  "  location:\n"
+  "    where_to_download_data_from: https://example.org/c.csv\n"
+)
+
+
+class TestMultiDocument:
+  def test_split_documents(self):
+    from migratassert.migrate import split_documents
+
+    chunks = split_documents(STREAM.encode("utf-8"))
+    assert len(chunks) == 4
+    assert chunks[0].startswith(b"# stream")
+    assert chunks[1].endswith(b"...\n")
+    assert split_documents(b"---\n# only a comment\n") == []
+    assert split_documents(b"a: '--- not a marker'\n---x: 1\n") == [b"a: '--- not a marker'\n---x: 1\n"]
+
+  def test_per_document_results(self, tmp_path):
+    from migratassert.migrate import migrate_documents
+
+    source = tmp_path / "batch.yaml"
+    source.write_text(STREAM)
+    results = migrate_documents(source, tmp_path / "BATCH.yaml", file_stem="BATCH", multi_document=True)
+
+    assert [r.document_index for r in results] == [0, 1, 2, 3]
+    assert [r.document_id for r in results] == ["alam1", None, None, "c3"]
+    assert [r.success for r in results] == [True, True, False, True]
+    assert "read" in results[0].phase_wall and "write" in results[0].phase_wall
+
+    # The id is a comment, not a key outside the TC3 schema
+    text = (tmp_path / "BATCH.yaml").read_text()
+    assert text.startswith("# document_id: alam1\ntemplate:\n")
+    assert "---\n# document_id: c3\ntemplate:\n" in text
+    docs = list(get_yaml().load_all(text))
+    assert all("document_id" not in d for d in docs)
+    locals_ = [d["template"]["source"]["local"] for d in docs]
+    assert locals_ == ["./DATALAKE/ALAM1.csv", "./DATALAKE/BATCH_2.csv", "./DATALAKE/C3.csv"]
+
+  def test_dry_run_estimate_counts_id_comment(self, tmp_path):
+    from migratassert.migrate import migrate_documents
+
+    source = tmp_path / "batch.yaml"
+    source.write_text(STREAM)
+    written = migrate_documents(source, tmp_path / "BATCH.yaml", file_stem="BATCH", multi_document=True)
+    estimated = migrate_documents(
+      source, tmp_path / "DRY.yaml", file_stem="BATCH", dry_run=True, multi_document=True
+    )
+    assert [r.output_bytes for r in estimated] == [r.output_bytes for r in written]
+
+  @pytest.mark.parametrize("jobs,async_io", [(2, False), (1, True), (2, True)])
+  def test_parallel_matches_serial(self, tmp_path, jobs, async_io):
+    indir = tmp_path / "input"
+    indir.mkdir()
+    for i in range(3):
+      (indir / f"batch{i}.yaml").write_text(STREAM)
+
+    serial = run_migration(indir, tmp_path / "serial", multi_document=True)
+    other = run_migration(indir, tmp_path / "other", multi_document=True, jobs=jobs, async_io=async_io)
+    assert serial.files_processed == other.files_processed == 12
+    assert serial.failures == other.failures
+    assert [n for n, _ in serial.failures] == ["batch0.yaml#3", "batch1.yaml#3", "batch2.yaml#3"]
+    for path in (tmp_path / "serial").iterdir():
+      assert (tmp_path / "other" / path.name).read_text() == path.read_text()
+
+  def test_incremental_tracks_whole_stream(self, tmp_path):
+    indir = tmp_path / "input"
+    outdir = tmp_path / "output"
+    indir.mkdir()
+    (indir / "good.yaml").write_text(STREAM.replace("[unclosed", "{}"))
+    (indir / "bad.yaml").write_text(STREAM)
+
+    run_migration(indir, outdir, incremental=True, multi_document=True)
+    second = run_migration(indir, outdir, incremental=True, multi_document=True)
+    assert second.files_skipped == 1
+    assert [r.source_path.name for r in second.file_results if r.skipped] == ["good.yaml"]
@@ -0,0 +1,114 @@
+"""Tests for the asyncio migration pipeline."""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from migratassert.migrate import FileResult, run_migration
+from migratassert.pipeline import RESULT_QUEUE_SIZE, fsync_paths, iter_pipeline_results
+
+CONFIG = (
+  "template:\n"
+  "  location:\n"
+  "    download_hyperparameters:\n"
+  "      file_extension: csv\n"
+  "  triple:\n"
+  "    triple_subject:\n"
+  "      encoding_method: column\n"
+  "      value_for_encoding: A\n"
+  "      mapping_hyperparameters:\n"
+  "        stray: 1\n"
+)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+  indir = tmp_path / "input"
+  indir.mkdir()
+  for i in range(12):
+    (indir / f"config{i:02d}.yaml").write_text(CONFIG)
+  (indir / "broken.yaml").write_text("template: [unclosed\n")
+  return indir
+
+
+class TestPipeline:
+  @pytest.mark.parametrize("jobs", [1, 2])
+  def test_matches_serial_run(self, tmp_path, corpus, jobs):
+    serial = run_migration(corpus, tmp_path / "serial")
+    piped = run_migration(
+      corpus,
+      tmp_path / "piped",
+      async_io=True,
+      jobs=jobs,
+      read_ahead=3,
+      write_concurrency=2,
+      fsync_batch=5,
+    )
+
+    assert [fr.source_path for fr in piped.file_results] == [
+      fr.source_path for fr in serial.file_results
+    ]
+    assert piped.files_failed == serial.files_failed == 1
+    assert piped.all_dropped_fields == serial.all_dropped_fields
+    for fr in serial.file_results:
+      if fr.success:
+        assert (tmp_path / "piped" / fr.dest_path.name).read_text() == fr.dest_path.read_text()
+
+  def test_records_read_and_write_phases(self, tmp_path, corpus):
+    result = run_migration(corpus, tmp_path / "out", async_io=True)
+    ok = next(fr for fr in result.file_results if fr.success)
+    assert {"read", "parse", "transform", "dump", "write"} <= set(ok.phase_wall)
+
+  def test_dry_run_writes_nothing(self, tmp_path, corpus):
+    outdir = tmp_path / "out"
+    result = run_migration(corpus, outdir, dry_run=True, async_io=True)
+    assert result.files_succeeded == 12
+    assert not outdir.exists()
+
+  def test_passes_resolved_results_through_in_order(self, tmp_path, corpus):
+    resolved = FileResult(Path("skip.yaml"), Path("SKIP.yaml"), success=True, skipped=True)
+    source = corpus / "config00.yaml"
+    items = [resolved, (source, tmp_path / "A.yaml", "A"), resolved]
+    results = list(iter_pipeline_results(items))
+    assert [fr.source_path for fr in results] == [Path("skip.yaml"), source, Path("skip.yaml")]
+
+  def test_missing_source_fails_file(self, tmp_path):
+    items = [(tmp_path / "missing.yaml", tmp_path / "MISSING.yaml", "MISSING")]
+    (result,) = iter_pipeline_results(items)
+    assert not result.success
+    assert result.error
+
+  @pytest.mark.parametrize("async_io", [True, False])
+  def test_failing_sink_stops_the_run(self, tmp_path, corpus, async_io):
+    def sink(file_result):
+      raise RuntimeError("sink failed")
+
+    outdir = tmp_path / "out"
+    with pytest.raises(RuntimeError, match="sink failed"):
+      run_migration(corpus, outdir, sink=sink, async_io=async_io, jobs=2, read_ahead=2, write_concurrency=1)
+    written = sorted(outdir.glob("*.yaml"))
+    time.sleep(0.5)
+    assert sorted(outdir.glob("*.yaml")) == written
+
+  def test_closing_early_stops_the_pipeline(self, tmp_path):
+    indir = tmp_path / "input"
+    indir.mkdir()
+    tasks = []
+    for i in range(RESULT_QUEUE_SIZE * 2):
+      (indir / f"c{i:03d}.yaml").write_text(CONFIG)
+      tasks.append((indir / f"c{i:03d}.yaml", tmp_path / "out" / f"C{i:03d}.yaml", f"C{i:03d}"))
+    results = iter_pipeline_results(tasks, read_ahead=1, write_concurrency=1)
+    next(results)
+    # The consumer stalls: the bounded queue holds the pipeline back
+    time.sleep(0.5)
+    results.close()
+    written = len(list((tmp_path / "out").iterdir()))
+    assert written < len(tasks)
+    time.sleep(0.2)
+    assert len(list((tmp_path / "out").iterdir())) == written
+
+  def test_fsync_paths(self, tmp_path):
+    path = tmp_path / "a.yaml"
+    path.write_text("x: 1\n")
+    fsync_paths([path])
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 import pytest
-from migratassert.provenance import map_provenance, parse_publication_curie
+from migratassert.provenance import map_provenance, normalize_publication, parse_publication_curie, publication_key
 
 
 class TestParsePublicationCurie:
@@ -78,3 +78,51 @@ class TestMapProvenance:
     result = map_provenance(v440)
     contrib = result.mapped["contributors"][0]
     assert contrib["comment"] == "Manual migration test"
+
+
+class TestNormalizePublication:
+  @pytest.mark.parametrize(
+    ("publication", "expected"),
+    [
+      ("PMC:11708054", ("PMC", "11708054")),
+      ("pmc:PMC11708054", ("PMC", "11708054")),
+      (" PMID: 42 ", ("PMID", "42")),
+      ("DOI:10.1000/ABC", ("DOI", "10.1000/abc")),
+      ("https://doi.org/10.1038/NATURE123", ("DOI", "10.1038/nature123")),
+      ("http://dx.doi.org/10.5555/x", ("DOI", "10.5555/x")),
+      ("10.1234/Foo", ("DOI", "10.1234/foo")),
+      ("https://pubmed.ncbi.nlm.nih.gov/12345678/", ("PMID", "12345678")),
+      ("https://www.ncbi.nlm.nih.gov/pmc/articles/PMC11708054/", ("PMC", "11708054")),
+      ("https://pmc.ncbi.nlm.nih.gov/articles/PMC11708054", ("PMC", "11708054")),
+    ],
+  )
+  def test_canonical_forms(self, publication, expected):
+    assert normalize_publication(publication) == (*expected, None)
+
+  @pytest.mark.parametrize(
+    ("publication", "problem"),
+    [
+      ("PMID:12a", "malformed PMID ID '12a'"),
+      ("ISBN:978", "unknown publication repo 'ISBN' (expected DOI, PMC, PMID)"),
+      ("11708054", "no publication repo in '11708054'"),
+    ],
+  )
+  def test_problems(self, publication, problem):
+    assert normalize_publication(publication)[2] == problem
+
+  def test_memoized(self):
+    assert normalize_publication("PMC:77") is normalize_publication("PMC:77")
+
+  def test_publication_key(self):
+    assert publication_key("https://doi.org/10.1/AB") == "DOI:10.1/ab"
+    assert publication_key("ISBN:978") == "ISBN:978"
+
+  def test_map_provenance_warns(self):
+    result = map_provenance({"publication": "ISBN:978"})
+    assert result.mapped == {"publication": "978"}
+    assert result.warnings == ["provenance.publication: unknown publication repo 'ISBN' (expected DOI, PMC, PMID)"]
+
+  def test_map_provenance_url(self):
+    result = map_provenance({"publication": "https://doi.org/10.1/AB"})
+    assert result.mapped == {"repo": "DOI", "publication": "10.1/ab"}
+    assert result.warnings == []
@@ -0,0 +1,85 @@
+"""Tests for the corpus-wide publication index."""
+
+import pytest
+
+from migratassert import migrate
+from migratassert.migrate import dump_yaml, run_migration
+from migratassert.publication_index import (
+  PUBLICATION_INDEX_NAME,
+  default_publication_index_path,
+  find_publications,
+  load_publication_index,
+)
+from migratassert.report import format_report
+
+
+def config(template_publication: str, *section_publications: str) -> dict:
+  return {
+    "template": {"provenance": {"publication": template_publication}},
+    "sections": [{"provenance": {"publication": p}} for p in section_publications] or [{"comment": "x"}],
+  }
+
+
+def test_find_publications_dedupes_canonical_forms():
+  found = find_publications(config("DOI:10.1/AB", "https://doi.org/10.1/ab", "PMID:7", "PMID:7"))
+  assert found == ["DOI:10.1/ab", "PMID:7"]
+  assert find_publications({"template": {}}) == []
+  assert find_publications(None) == []
+
+
+def test_default_path(tmp_path):
+  assert default_publication_index_path(tmp_path) == tmp_path / PUBLICATION_INDEX_NAME
+  assert default_publication_index_path(tmp_path / "out.zip") == tmp_path / "out.zip.publications.json"
+
+
+class TestRunMigration:
+  def corpus(self, tmp_path):
+    indir = tmp_path / "in"
+    indir.mkdir()
+    (indir / "a.yaml").write_text(dump_yaml(config("PMC:1", "PMID:9")))
+    (indir / "b.yaml").write_text(dump_yaml(config("https://www.ncbi.nlm.nih.gov/pmc/articles/PMC1/")))
+    (indir / "c.yaml").write_text(dump_yaml({"template": {}}))
+    return indir
+
+  @pytest.mark.parametrize("async_io", [False, True])
+  def test_index_written_in_one_pass(self, tmp_path, async_io):
+    indir = self.corpus(tmp_path)
+    index_path = tmp_path / "pubs.json"
+    result = run_migration(indir, tmp_path / "out", jobs=2, async_io=async_io, publication_index=index_path)
+    assert load_publication_index(index_path) == {"PMC:1": ["A.yaml", "B.yaml"], "PMID:9": ["A.yaml"]}
+    assert result.publication_count == 2
+    assert "Publication index: 2 publications" in format_report(result)
+
+  def test_incremental_run_keeps_skipped_files(self, tmp_path):
+    indir = self.corpus(tmp_path)
+    outdir = tmp_path / "out"
+    index_path = outdir / PUBLICATION_INDEX_NAME
+    run_migration(indir, outdir, incremental=True, publication_index=index_path)
+    (indir / "c.yaml").write_text(dump_yaml(config("PMID:9")))
+    result = run_migration(indir, outdir, incremental=True, publication_index=index_path)
+    assert result.files_skipped == 2
+    assert load_publication_index(index_path) == {"PMC:1": ["A.yaml", "B.yaml"], "PMID:9": ["A.yaml", "C.yaml"]}
+
+  def test_not_written_on_dry_run(self, tmp_path):
+    index_path = tmp_path / "pubs.json"
+    run_migration(self.corpus(tmp_path), tmp_path / "out", dry_run=True, publication_index=index_path)
+    assert not index_path.exists()
+
+  def test_no_scan_without_index(self, tmp_path, monkeypatch):
+    def fail(config):
+      raise AssertionError("publications scanned without an index")
+
+    monkeypatch.setattr(migrate, "find_publications", fail)
+    result = run_migration(self.corpus(tmp_path), tmp_path / "out")
+    assert result.files_succeeded == 3
+    assert all(fr.publications == [] for fr in result.file_results)
+
+  def test_incremental_run_without_index_is_not_reused(self, tmp_path):
+    indir = self.corpus(tmp_path)
+    outdir = tmp_path / "out"
+    run_migration(indir, outdir, incremental=True)
+    index_path = outdir / PUBLICATION_INDEX_NAME
+    # Those entries recorded no publications, so they are migrated again
+    result = run_migration(indir, outdir, incremental=True, publication_index=index_path)
+    assert result.files_skipped == 0
+    assert load_publication_index(index_path) == {"PMC:1": ["A.yaml", "B.yaml"], "PMID:9": ["A.yaml"]}
@@ -0,0 +1,123 @@
+"""Tests for validating migrated regular_expressions."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import migratassert
+from migratassert.migrate import dump_yaml, run_migration
+from migratassert.regex_check import REGEX_CHECK, check_pattern, configure_regex_check, find_regex_issues
+from migratassert.report import format_report
+from migratassert.sinks import file_result_event
+
+CONFIG = {
+  "template": {
+    "triple": {
+      "triple_subject": {
+        "encoding_method": "column",
+        "value_for_encoding": "A",
+        "mapping_hyperparameters": {
+          "regular_expressions": [
+            {"pattern": "\\s+", "replacement": "_"},
+            {"pattern": "(a+)+$", "replacement": ""},
+          ],
+        },
+      },
+    },
+  },
+  "sections": [
+    {"triple": {"triple_object": {"mapping_hyperparameters": {"regular_expressions": "[unclosed"}}}},
+  ],
+}
+
+
+@pytest.fixture
+def regex_check():
+  yield REGEX_CHECK
+  configure_regex_check(False)
+
+
+class TestCheckPattern:
+  @pytest.mark.parametrize("pattern", ["\\s+", "^HGNC:(\\d+)$", "(ab|cd)+", "(?>a+)+", "(a++)+", "[a-z]+@[a-z]+"])
+  def test_safe_patterns(self, pattern):
+    check = check_pattern(pattern)
+    assert check.problem is None
+    assert check.compiled.pattern == pattern
+
+  @pytest.mark.parametrize(
+    ("pattern", "problem"),
+    [
+      ("(a+)+$", "nested quantifier"),
+      ("(?:\\w*\\s?)*x", "nested quantifier"),
+      ("(.|x)*", "overlapping branches"),
+      ("(xa|[a-x]b)+", "overlapping branches"),
+    ],
+  )
+  def test_backtracking_patterns(self, pattern, problem):
+    check = check_pattern(pattern)
+    assert check.compiled is not None
+    assert problem in check.problem
+
+  def test_invalid_pattern(self):
+    check = check_pattern("(unclosed")
+    assert check.compiled is None
+    assert check.problem.startswith("invalid regex: ")
+
+  def test_cached_by_pattern_text(self):
+    assert check_pattern("^cached$") is check_pattern("^cached$")
+
+  def test_compile_only_without_private_parser(self):
+    # re._parser is CPython-private; blocking it leaves compile-only checks
+    script = (
+      "import re, sys\n"
+      "sys.modules['re._parser'] = None\n"
+      "from migratassert.regex_check import check_pattern\n"
+      "assert check_pattern('(a+)+$').problem is None\n"
+      "assert check_pattern('(unclosed').problem.startswith('invalid regex: ')\n"
+    )
+    package_root = str(Path(migratassert.__file__).parents[1])
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")])))
+    completed = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
+
+
+class TestFindRegexIssues:
+  def test_reports_paths_in_document_order(self):
+    issues = find_regex_issues(CONFIG)
+    assert len(issues) == 2
+    assert issues[0].startswith(
+      "template.triple.triple_subject.mapping_hyperparameters.regular_expressions[1].pattern: "
+      "possible catastrophic backtracking"
+    )
+    assert issues[1].startswith("sections[0].triple.triple_object.mapping_hyperparameters.regular_expressions: invalid")
+
+  def test_clean_config(self, v440_full_config):
+    assert find_regex_issues(v440_full_config) == []
+
+
+class TestMigrationRegexCheck:
+  def test_disabled_by_default(self, tmp_path):
+    (tmp_path / "in").mkdir()
+    (tmp_path / "in" / "a.yaml").write_text(dump_yaml(CONFIG))
+    result = run_migration(tmp_path / "in", tmp_path / "out")
+    assert result.regex_issues == []
+    assert result.file_results[0].regex_issues == []
+
+  @pytest.mark.parametrize("jobs", [1, 2])
+  def test_flags_issues(self, tmp_path, jobs, regex_check):
+    (tmp_path / "in").mkdir()
+    (tmp_path / "in" / "a.yaml").write_text(dump_yaml(CONFIG))
+    (tmp_path / "in" / "b.yaml").write_text(dump_yaml({"template": {}}))
+    result = run_migration(tmp_path / "in", tmp_path / "out", jobs=jobs, check_regex=True)
+    assert result.files_failed == 0
+    # The process-wide switch is restored after the run
+    assert not regex_check.enabled
+    assert [name for name, _ in result.regex_issues] == ["a.yaml", "a.yaml"]
+    assert "Regex issues:" in format_report(result)
+    assert "regex" in result.phase_wall
+    # Migrated patterns are still copied through unchanged
+    assert "[unclosed" in (tmp_path / "out" / "A.yaml").read_text()
+    assert [len(file_result_event(fr)["regex_issues"]) for fr in result.file_results] == [2, 0]
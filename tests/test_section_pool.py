@@ -0,0 +1,134 @@
+"""Tests for splitting very large configs' sections across processes."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import migratassert
+from migratassert.migrate import FileResult, convert_source, get_yaml, run_migration
+from migratassert.section_pool import SECTION_POOL, configure_section_pool, has_anchored_scalars
+
+SECTION = (
+  "  # section {index}\n"
+  "  - location:\n"
+  "      where_to_download_data_from: https://example.org/{index}.csv\n"
+  "    triple:\n"
+  "      triple_subject:\n"
+  "        encoding_method: column\n"
+  "        value_for_encoding: A{index}\n"
+  "        mapping_hyperparameters:\n"
+  "          stray: {index}\n"
+  "    attributes:\n"
+  "      p_value:\n"
+  "        encoding_method: column\n"
+  "        value_for_encoding: P\n"
+  "    comment: kept  # trailing comment\n"
+)
+
+
+def make_config(sections: int, alias: bool = False) -> bytes:
+  text = (
+    "template:\n"
+    "  triple:\n"
+    "    triple_subject:\n"
+    "      encoding_method: column\n"
+    "      value_for_encoding: A\n"
+    "      mapping_hyperparameters:\n"
+    "        stray: 1\n"
+    "sections:\n"
+  )
+  text += "".join(SECTION.format(index=index) for index in range(sections))
+  if alias:
+    text = text.replace("comment: kept", "comment: &shared kept", 1)
+    text += "  - comment: *shared\n"
+  return text.encode("utf-8")
+
+
+def convert(raw: bytes, engine: str) -> tuple[FileResult, str | None]:
+  file_result = FileResult(source_path=None, dest_path=None, success=False)
+  text = convert_source(raw, file_result, get_yaml(engine), file_stem="BIG")
+  assert file_result.success, file_result.error
+  return (file_result, text)
+
+
+@pytest.fixture
+def section_pool():
+  configure_section_pool(3, threshold=4)
+  yield SECTION_POOL
+  configure_section_pool(0)
+
+
+class TestHasAnchoredScalars:
+  def test_plain_tree(self):
+    shared = {"b": 1}
+    assert not has_anchored_scalars({"a": [shared], "c": {"d": [1, shared]}})
+
+  def test_anchored_scalar(self):
+    config = get_yaml().load("a:\n  - b: &x 5\n  - b: *x\n")
+    assert has_anchored_scalars(config)
+
+
+class TestSplitConversion:
+  @pytest.mark.parametrize("engine", ["roundtrip", "fast"])
+  def test_matches_serial(self, section_pool, engine):
+    raw = make_config(10).replace(b"encoding_method: column\n        value_for_encoding: A7", b"encoding_method: row\n        value_for_encoding: A7")
+    split_result, split_text = convert(raw, engine)
+    configure_section_pool(0)
+    serial_result, serial_text = convert(raw, engine)
+
+    assert split_text == serial_text
+    assert split_result.dropped_fields == serial_result.dropped_fields
+    assert split_result.dropped_blocks == serial_result.dropped_blocks
+    assert split_result.dropped_blocks[-1] == "sections[9]"
+    assert (split_result.section_count, split_result.annotation_count) == (10, 10)
+    assert (serial_result.section_count, serial_result.annotation_count) == (10, 10)
+    split_checks = {name: (s.checks, s.violations) for name, s in split_result.validation.rules.items()}
+    assert split_checks == {name: (s.checks, s.violations) for name, s in serial_result.validation.rules.items()}
+    assert split_result.validation.violations == [
+      "sections[7].statement.subject: method: unknown method 'row' (expected one of column, value)"
+    ]
+
+  def test_below_threshold_stays_in_process(self, section_pool):
+    convert(make_config(3), "roundtrip")
+    assert section_pool._executor is None
+
+  def test_anchored_scalars_stay_in_process(self, section_pool):
+    _, text = convert(make_config(6, alias=True), "roundtrip")
+    assert section_pool._executor is None
+    assert "&shared" in text and "*shared" in text
+
+  def test_run_migration(self, tmp_path):
+    indir = tmp_path / "in"
+    indir.mkdir()
+    (indir / "big.yaml").write_bytes(make_config(8))
+    run_migration(indir, tmp_path / "serial")
+    result = run_migration(indir, tmp_path / "split", section_workers=2, section_threshold=4)
+    assert result.files_succeeded == 1
+    assert (tmp_path / "split" / "BIG.yaml").read_text() == (tmp_path / "serial" / "BIG.yaml").read_text()
+    assert SECTION_POOL._executor is None
+    configure_section_pool(0)
+
+  def test_run_migration_with_jobs(self, tmp_path):
+    # Every --jobs worker starts its own section pool. Run in a fresh
+    # interpreter so that a pool left running fails on the timeout
+    # instead of hanging the suite.
+    indir = tmp_path / "in"
+    indir.mkdir()
+    for name in ("a", "b", "c"):
+      (indir / f"{name}.yaml").write_bytes(make_config(8))
+    script = (
+      "from pathlib import Path\n"
+      "from migratassert.migrate import run_migration\n"
+      f"result = run_migration(Path({str(indir)!r}), Path({str(tmp_path / 'out')!r}), "
+      "jobs=2, section_workers=2, section_threshold=4)\n"
+      "assert result.files_succeeded == 3\n"
+    )
+    package_root = str(Path(migratassert.__file__).parents[1])
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")])))
+    # No pipes: orphaned pool processes would keep them open past the timeout
+    completed = subprocess.run([sys.executable, "-c", script], env=env, stdout=subprocess.DEVNULL, timeout=60)
+    assert completed.returncode == 0
+    assert sorted(path.name for path in (tmp_path / "out").iterdir()) == ["A.yaml", "B.yaml", "C.yaml"]
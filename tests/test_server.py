@@ -0,0 +1,166 @@
+"""Tests for the JSON-lines migration service."""
+
+import io
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from migratassert.clock import SOURCE_DATE_EPOCH
+from migratassert.migrate import get_yaml
+from migratassert.server import MigrationService, serve_stream, serve_unix
+
+CONFIG = (
+  "template:\n"
+  "  location:\n"
+  "    where_to_download_data_from: https://example.org/a.csv\n"
+  "  triple:\n"
+  "    triple_subject:\n"
+  "      encoding_method: column\n"
+  "      value_for_encoding: A\n"
+  "      mapping_hyperparameters:\n"
+  "        stray: 1\n"
+)
+
+
+@pytest.fixture(scope="module")
+def service():
+  service = MigrationService()
+  yield service
+  service.close()
+
+
+class TestMigrationService:
+  def test_inline_yaml(self, service):
+    response = service.handle({"id": 7, "yaml": CONFIG, "file_stem": "ALAM1"})
+    assert response["id"] == 7
+    assert response["ok"]
+    output = get_yaml().load(response["output"])
+    assert output["template"]["source"]["local"] == "./DATALAKE/ALAM1.csv"
+    (event,) = response["results"]
+    assert event["source"] == "<inline>"
+    assert event["dropped_fields"] == ["triple.subject.stray"]
+
+  def test_path_to_dest(self, service, tmp_path):
+    source = tmp_path / "alam1.yaml"
+    source.write_text(CONFIG)
+    dest = tmp_path / "out" / "ALAM1.yaml"
+    request = {"id": "a", "path": str(source), "dest": str(dest)}
+
+    first = service.handle(request)
+    assert first["ok"] and first["output"] is None
+    assert "./DATALAKE/ALAM1.csv" in dest.read_text()
+    assert service.handle(request)["results"][0]["unchanged"]
+
+  def test_multi_document(self, service):
+    stream = f"document_id: a\n{CONFIG}---\ndocument_id: b\n{CONFIG}"
+    response = service.handle({"yaml": stream, "multi_document": True})
+    assert [e["document_id"] for e in response["results"]] == ["a", "b"]
+    assert response["output"].startswith("# document_id: a\n")
+    assert "---\n# document_id: b\n" in response["output"]
+
+  @pytest.mark.parametrize(
+    "request_,message",
+    [
+      ({"id": 1}, "'path' or 'yaml'"),
+      ({"id": 1, "yaml": 3}, "must be a string"),
+      ({"id": 1, "op": "explode"}, "unknown op"),
+    ],
+  )
+  def test_bad_requests(self, service, request_, message):
+    response = service.handle(request_)
+    assert response["id"] == 1
+    assert not response["ok"]
+    assert message in response["error"]
+
+  def test_failed_migration(self, service, tmp_path):
+    response = service.handle({"id": 2, "path": str(tmp_path / "missing.yaml")})
+    assert not response["ok"]
+    assert response["results"][0]["error"]
+
+
+class TestRequestDates:
+  REQUEST = {"yaml": CONFIG + "  provenance:\n    config_curator_name: Jane\n"}
+
+  def contributor_date(self, response):
+    return get_yaml().load(response["output"])["template"]["provenance"]["contributors"][0]["date"]
+
+  @pytest.mark.parametrize("jobs", [1, 2])
+  def test_each_request_reads_the_clock(self, monkeypatch, jobs):
+    monkeypatch.delenv(SOURCE_DATE_EPOCH, raising=False)
+    now = time.time()
+    dated_service = MigrationService(jobs=jobs)
+    try:
+      first = self.contributor_date(dated_service.handle(self.REQUEST))
+      monkeypatch.setattr("migratassert.clock.time.time", lambda: now + 3 * 86400)
+      later = self.contributor_date(dated_service.handle(self.REQUEST))
+    finally:
+      dated_service.close()
+    assert first != later
+
+  def test_invalid_source_date_epoch(self, service, monkeypatch):
+    monkeypatch.setenv(SOURCE_DATE_EPOCH, "soon")
+    response = service.handle({"id": 4, **self.REQUEST})
+    assert not response["ok"]
+    assert "SOURCE_DATE_EPOCH must be an integer" in response["error"]
+
+
+def requests_text(*requests):
+  return "".join(json.dumps(r) + "\n" for r in requests)
+
+
+class TestTransports:
+  def test_stream_until_shutdown(self, service):
+    instream = io.StringIO(
+      requests_text({"id": 1, "op": "ping"}, {"id": 2, "yaml": CONFIG}, {"id": 3, "op": "shutdown"})
+      + "not json\n"
+    )
+    outstream = io.StringIO()
+    assert serve_stream(service, instream, outstream)
+    responses = [json.loads(line) for line in outstream.getvalue().splitlines()]
+    assert [r["id"] for r in responses] == [1, 2, 3]
+    assert all(r["ok"] for r in responses)
+
+  def test_invalid_json_reported(self, service):
+    outstream = io.StringIO()
+    assert not serve_stream(service, io.StringIO("{oops\n[1]\n"), outstream)
+    responses = [json.loads(line) for line in outstream.getvalue().splitlines()]
+    assert [r["ok"] for r in responses] == [False, False]
+
+  def test_worker_pool_answers_every_request(self):
+    pool_service = MigrationService(jobs=2)
+    try:
+      requests = [{"id": i, "yaml": CONFIG, "file_stem": f"S{i}"} for i in range(6)]
+      outstream = io.StringIO()
+      serve_stream(pool_service, io.StringIO(requests_text(*requests)), outstream)
+    finally:
+      pool_service.close()
+    responses = {r["id"]: r for r in map(json.loads, outstream.getvalue().splitlines())}
+    assert sorted(responses) == list(range(6))
+    assert "./DATALAKE/S4.csv" in responses[4]["output"]
+
+  def test_unix_socket(self, service, tmp_path):
+    socket_path = tmp_path / "migratassert.sock"
+    thread = threading.Thread(target=serve_unix, args=(service, socket_path))
+    thread.start()
+    try:
+      for _ in range(200):
+        if socket_path.exists():
+          break
+        threading.Event().wait(0.01)
+
+      with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+        stream = client.makefile("rw", encoding="utf-8")
+        stream.write(requests_text({"id": 1, "yaml": CONFIG}, {"id": 2, "op": "shutdown"}))
+        stream.flush()
+        client.shutdown(socket.SHUT_WR)
+        responses = [json.loads(line) for line in stream]
+    finally:
+      thread.join(timeout=10)
+    assert [r["id"] for r in responses] == [1, 2]
+    assert responses[0]["ok"]
+    assert not thread.is_alive()
+    assert not socket_path.exists()
@@ -0,0 +1,115 @@
+"""Tests for streaming result sinks."""
+
+import io
+import json
+from pathlib import Path
+
+from migratassert.migrate import (
+  STREAM_SAMPLE_SIZE,
+  FileResult,
+  MigrationResult,
+  record_file_result,
+  run_migration,
+)
+from migratassert.report import format_report
+from migratassert.sinks import JsonlSink, ProgressSink, fan_out
+
+
+def _result(name: str, success: bool = True, dropped: list[str] | None = None) -> FileResult:
+  return FileResult(
+    source_path=Path(name),
+    dest_path=Path(name.upper()),
+    success=success,
+    dropped_fields=dropped or [],
+    error=None if success else "boom",
+  )
+
+
+class TestStreamingAggregates:
+  def test_discards_file_results_but_keeps_aggregates(self):
+    result = MigrationResult(keep_file_results=False)
+    record_file_result(result, _result("a.yaml", dropped=["x"]))
+    record_file_result(result, _result("b.yaml", dropped=["x", "y"]))
+    record_file_result(result, _result("c.yaml", success=False))
+
+    assert result.file_results == []
+    assert result.files_processed == 3
+    assert result.all_dropped_fields == {"x": 2, "y": 1}
+    assert result.failures == [("c.yaml", "boom")]
+
+  def test_report_uses_aggregates(self):
+    result = MigrationResult(keep_file_results=False)
+    record_file_result(result, _result("c.yaml", success=False))
+
+    report = format_report(result)
+    assert "c.yaml: boom" in report
+
+
+  def test_samples_warnings(self):
+    result = MigrationResult(keep_file_results=False)
+    for index in range(STREAM_SAMPLE_SIZE + 5):
+      file_result = _result(f"{index}.yaml")
+      file_result.warnings = ["taxon: cannot resolve taxon 'x'"]
+      record_file_result(result, file_result)
+
+    assert result.warning_count == STREAM_SAMPLE_SIZE + 5
+    assert len(result.warnings) == STREAM_SAMPLE_SIZE
+    assert "  ... and 5 more (per-file details are in the events)" in format_report(result)
+
+  def test_samples_regex_issues(self):
+    result = MigrationResult(keep_file_results=False)
+    for index in range(STREAM_SAMPLE_SIZE):
+      file_result = _result(f"{index}.yaml")
+      file_result.regex_issues = ["a: invalid pattern", "b: invalid pattern"]
+      record_file_result(result, file_result)
+
+    assert result.regex_issue_count == 2 * STREAM_SAMPLE_SIZE
+    assert len(result.regex_issues) == STREAM_SAMPLE_SIZE
+    assert f"  ... and {STREAM_SAMPLE_SIZE} more" in format_report(result)
+
+
+class TestSinks:
+  def test_jsonl_sink_writes_one_event_per_file(self, tmp_path):
+    path = tmp_path / "events.jsonl"
+    with JsonlSink(path) as sink:
+      sink(_result("a.yaml", dropped=["x"]))
+      sink(_result("b.yaml", success=False))
+
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [e["source"] for e in events] == ["a.yaml", "b.yaml"]
+    assert events[0]["dropped_fields"] == ["x"]
+    assert events[1]["error"] == "boom"
+
+  def test_progress_sink_counts(self):
+    stream = io.StringIO()
+    sink = ProgressSink(stream=stream, every=2)
+    for name in ("a", "b", "c"):
+      sink(_result(name))
+    sink.close()
+    assert "Migrated 3 files (0 failed)" in stream.getvalue()
+
+  def test_fan_out(self):
+    seen: list[str] = []
+    combined = fan_out(None, lambda fr: seen.append("one"), lambda fr: seen.append("two"))
+    combined(_result("a"))
+    assert seen == ["one", "two"]
+    assert fan_out(None) is None
+
+
+class TestRunMigrationSink:
+  def test_sink_receives_every_file_in_order(self, tmp_path):
+    indir = tmp_path / "input"
+    indir.mkdir()
+    for name in ("b", "a"):
+      (indir / f"{name}.yaml").write_text("template:\n  provenance:\n    publication: PMC:1\n")
+
+    seen: list[str] = []
+    result = run_migration(
+      indir,
+      tmp_path / "output",
+      sink=lambda fr: seen.append(fr.source_path.name),
+      keep_file_results=False,
+    )
+    assert seen == ["a.yaml", "b.yaml"]
+    assert result.file_results == []
+    assert result.files_succeeded == 2
@@ -0,0 +1,77 @@
+"""Cold-start import footprint of the CLI.
+
+Checked by module rather than by wall time, which varies too much
+between machines to assert on.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import migratassert
+
+# Modules only pool, --async-io, archive, server or report-rendering
+# runs need; a plain single-file migration must not import them
+OPTIONAL_MODULES = (
+  "asyncio",
+  "multiprocessing",
+  "concurrent.futures.process",
+  "migratassert.pipeline",
+  "migratassert.server",
+  "zipfile",
+  "tarfile",
+  "rich",
+)
+
+CONFIG = (
+  "template:\n"
+  "  triple:\n"
+  "    triple_subject:\n"
+  "      encoding_method: column\n"
+  "      value_for_encoding: A\n"
+)
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+  """Run a fresh interpreter that can import this checkout of migratassert."""
+  package_root = str(Path(migratassert.__file__).parents[1])
+  pythonpath = os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")]))
+  env = dict(os.environ, PYTHONPATH=pythonpath)
+  return subprocess.run([sys.executable, *args], env=env, capture_output=True, text=True)
+
+
+def test_help_skips_migration_stack():
+  script = (
+    "import sys\n"
+    "from migratassert.cli import app\n"
+    "sys.argv = ['migratassert-cli', '--help']\n"
+    "try:\n"
+    "  app()\n"
+    "except SystemExit:\n"
+    "  pass\n"
+    "print(sorted(m for m in ('ruamel.yaml', 'migratassert.migrate', 'rich') if m in sys.modules))\n"
+  )
+  result = run_python("-c", script)
+  assert result.returncode == 0, result.stderr
+  assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_single_file_skips_optional_modules(tmp_path):
+  indir = tmp_path / "in"
+  indir.mkdir()
+  (indir / "alam1.yaml").write_text(CONFIG)
+  script = (
+    "import sys\n"
+    "from migratassert.cli import app\n"
+    f"sys.argv = ['migratassert-cli', '-i', {str(indir)!r}, '-o', {str(tmp_path / 'out')!r}]\n"
+    "try:\n"
+    "  app()\n"
+    "except SystemExit as e:\n"
+    "  assert not e.code, e.code\n"
+    f"print(sorted(m for m in {OPTIONAL_MODULES!r} if m in sys.modules))\n"
+  )
+  result = run_python("-c", script)
+  assert result.returncode == 0, result.stderr
+  assert result.stdout.strip().splitlines()[-1] == "[]"
+  assert (tmp_path / "out" / "ALAM1.yaml").exists()
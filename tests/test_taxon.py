@@ -0,0 +1,167 @@
+"""Tests for taxon normalization and NCBITaxon snapshots."""
+
+import pytest
+from typer.testing import CliRunner
+
+from migratassert.cli import app
+from migratassert.encoding import map_node_encoding
+from migratassert.manifest import mapping_tables_hash
+from migratassert.migrate import dump_yaml, get_yaml, run_migration
+from migratassert.report import format_report
+from migratassert.taxon import (
+  TAXON_TABLE,
+  TaxonSnapshot,
+  configure_taxon_table,
+  read_names_dmp,
+  write_taxon_snapshot,
+)
+
+NAMES_DMP = (
+  "9606\t|\tHomo sapiens\t|\t\t|\tscientific name\t|\n"
+  "9606\t|\thuman\t|\t\t|\tgenbank common name\t|\n"
+  "9606\t|\tHomo sapiens Linnaeus, 1758\t|\t\t|\tauthority\t|\n"
+  "10090\t|\tMus musculus\t|\t\t|\tscientific name\t|\n"
+  "10090\t|\tmouse\t|\t\t|\tgenbank common name\t|\n"
+  "10116\t|\tRattus norvegicus\t|\t\t|\tscientific name\t|\n"
+  "10116\t|\trat\t|\t\t|\tcommon name\t|\n"
+  "10117\t|\trat\t|\t\t|\tcommon name\t|\n"
+)
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+  names = tmp_path / "names.dmp"
+  names.write_text(NAMES_DMP)
+  path = tmp_path / "taxa.tsv"
+  write_taxon_snapshot(read_names_dmp(names), path)
+  yield path
+  configure_taxon_table()
+
+
+def encoding(organism: str) -> dict:
+  return {
+    "encoding_method": "column",
+    "value_for_encoding": "A",
+    "mapping_hyperparameters": {"in_this_organism": organism},
+  }
+
+
+class TestSnapshot:
+  def test_written_sorted_without_ambiguous_names(self, snapshot):
+    assert snapshot.read_text().splitlines() == [
+      "homo sapiens\t9606",
+      "human\t9606",
+      "mouse\t10090",
+      "mus musculus\t10090",
+      "rattus norvegicus\t10116",
+    ]
+
+  @pytest.mark.parametrize(
+    ("name", "taxon"),
+    [("Homo sapiens", 9606), ("homo  SAPIENS", 9606), ("mouse", 10090), ("rattus norvegicus", 10116)],
+  )
+  def test_lookup(self, snapshot, name, taxon):
+    assert TaxonSnapshot(snapshot).lookup(name) == taxon
+
+  @pytest.mark.parametrize("name", ["rat", "aardvark", "zebrafish", ""])
+  def test_lookup_missing(self, snapshot, name):
+    assert TaxonSnapshot(snapshot).lookup(name) is None
+
+  def test_empty_snapshot(self, tmp_path):
+    path = tmp_path / "empty.tsv"
+    assert write_taxon_snapshot([], path) == 0
+    assert TaxonSnapshot(path).lookup("human") is None
+
+
+class TestTaxonTable:
+  def test_memoizes_interned_values(self):
+    configure_taxon_table()
+    assert TAXON_TABLE.resolve("NCBITaxon:9606") == 9606
+    assert TAXON_TABLE.resolve("NCBITaxon:9606") is TAXON_TABLE.resolve("NCBITaxon:9606")
+    assert list(TAXON_TABLE._memo) == ["NCBITaxon:9606"]
+
+  def test_block_scalar_value(self):
+    configure_taxon_table()
+    value = get_yaml().load("taxon: >-\n  NCBITaxon:9606\n")["taxon"]
+    assert type(value) is not str
+    assert TAXON_TABLE.resolve(value) == 9606
+    assert map_node_encoding({**encoding("x"), "mapping_hyperparameters": {"in_this_organism": value}}).mapped["taxon"] == 9606
+
+  def test_unresolvable_raises(self):
+    configure_taxon_table()
+    with pytest.raises(ValueError, match="cannot resolve taxon 'Homo sapiens'"):
+      TAXON_TABLE.resolve("Homo sapiens")
+    assert TAXON_TABLE._memo == {"Homo sapiens": None}
+
+  def test_names_resolve_with_snapshot(self, snapshot):
+    configure_taxon_table(snapshot)
+    assert TAXON_TABLE.resolve("Homo sapiens") == 9606
+    assert TAXON_TABLE.resolve("NCBITaxon:mouse") == 10090
+    assert TAXON_TABLE.resolve("10116") == 10116
+
+
+class TestEncodingWarnings:
+  def test_unresolvable_taxon_is_kept_with_warning(self):
+    configure_taxon_table()
+    result = map_node_encoding(encoding("NCBITaxon:human"), field_prefix="triple.subject.")
+    assert result.mapped["taxon"] == "NCBITaxon:human"
+    assert result.warnings == ["triple.subject.in_this_organism: cannot resolve taxon 'NCBITaxon:human'"]
+
+  def test_resolved_taxon_has_no_warning(self):
+    result = map_node_encoding(encoding("NCBITaxon:9606"))
+    assert result.mapped["taxon"] == 9606
+    assert result.warnings == []
+
+
+class TestMigration:
+  @pytest.fixture
+  def indir(self, tmp_path):
+    indir = tmp_path / "in"
+    indir.mkdir()
+    config = {
+      "template": {"triple": {"triple_subject": encoding("mouse")}},
+      "sections": [{"attributes": {"host": encoding("Homo sapiens")}}],
+    }
+    (indir / "a.yaml").write_text(dump_yaml(config))
+    return indir
+
+  @pytest.mark.parametrize("jobs", [1, 2])
+  def test_unresolvable_values_warn_instead_of_failing(self, tmp_path, indir, jobs):
+    result = run_migration(indir, tmp_path / "out", jobs=jobs)
+    assert result.files_failed == 0
+    assert result.warnings == [
+      ("a.yaml", "template.triple.subject.in_this_organism: cannot resolve taxon 'mouse'"),
+      ("a.yaml", "sections[0].attributes.host.in_this_organism: cannot resolve taxon 'Homo sapiens'"),
+    ]
+    assert "Warnings (values kept unconverted):" in format_report(result)
+    # The kept values are not TC3
+    assert result.rule_stats["taxon"].violations == 2
+
+  @pytest.mark.parametrize("jobs", [1, 2])
+  def test_snapshot_resolves_names(self, tmp_path, indir, snapshot, jobs):
+    result = run_migration(indir, tmp_path / "out", jobs=jobs, taxon_snapshot=snapshot)
+    assert result.warnings == []
+    text = (tmp_path / "out" / "A.yaml").read_text()
+    assert "taxon: 10090" in text and "taxon: 9606" in text
+
+  def test_split_sections_use_snapshot(self, tmp_path, indir, snapshot):
+    result = run_migration(
+      indir, tmp_path / "out", taxon_snapshot=snapshot, section_workers=2, section_threshold=1
+    )
+    assert result.warnings == []
+    assert "taxon: 9606" in (tmp_path / "out" / "A.yaml").read_text()
+
+
+def test_snapshot_changes_mapping_hash(snapshot):
+  configure_taxon_table()
+  plain = mapping_tables_hash()
+  configure_taxon_table(snapshot)
+  assert mapping_tables_hash() != plain
+
+
+def test_cli_builds_snapshot(tmp_path):
+  names = tmp_path / "names.dmp"
+  names.write_text(NAMES_DMP)
+  result = CliRunner().invoke(app, ["taxon-snapshot", str(names), "-o", str(tmp_path / "taxa.tsv")])
+  assert result.exit_code == 0, result.output
+  assert "Wrote 5 names" in result.output
@@ -0,0 +1,75 @@
+"""Tests for timing instrumentation."""
+
+from pathlib import Path
+
+from migratassert.migrate import MigrationResult, migrate_file, record_file_result
+from migratassert.report import format_timing_report
+from migratassert.timing import RESERVOIR_SIZE, Distribution, PhaseTimer, TopN
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+class TestDistribution:
+  def test_percentiles_exact_when_small(self):
+    dist = Distribution()
+    for value in range(1, 101):
+      dist.add(float(value))
+    assert dist.percentile(50) == 50.0
+    assert dist.percentile(95) == 95.0
+    assert dist.maximum == 100.0
+    assert dist.total == 5050.0
+
+  def test_reservoir_is_bounded(self):
+    dist = Distribution()
+    for value in range(RESERVOIR_SIZE * 3):
+      dist.add(float(value))
+    assert len(dist.samples) == RESERVOIR_SIZE
+    assert dist.count == RESERVOIR_SIZE * 3
+    assert dist.maximum == RESERVOIR_SIZE * 3 - 1
+
+  def test_empty_percentile(self):
+    assert Distribution().percentile(50) == 0.0
+
+
+class TestTopN:
+  def test_keeps_largest(self):
+    top = TopN(size=2)
+    for value, label in [(1.0, "a"), (3.0, "c"), (2.0, "b")]:
+      top.add(value, label)
+    assert top.items() == [(3.0, "c"), (2.0, "b")]
+
+
+class TestPhaseTimer:
+  def test_accumulates_phases(self):
+    timer = PhaseTimer()
+    with timer.phase("parse"):
+      pass
+    with timer.phase("parse"):
+      pass
+    assert set(timer.wall) == {"parse"}
+    assert timer.wall["parse"] >= 0.0
+    assert timer.cpu["parse"] >= 0.0
+
+
+class TestFileResultInstrumentation:
+  def test_migrate_file_records_phases_and_sizes(self, tmp_path):
+    source = FIXTURES_DIR / "v440_full.yaml"
+    dest = tmp_path / "OUT.yaml"
+    result = migrate_file(source, dest)
+
+    assert result.success
+    assert set(result.phase_wall) == {"read", "parse", "transform", "validate", "dump", "write"}
+    assert result.input_bytes == source.stat().st_size
+    assert result.output_bytes == dest.stat().st_size
+    assert result.annotation_count == 2
+    assert result.section_count == 0
+
+  def test_report_tables(self, tmp_path):
+    result = MigrationResult()
+    record_file_result(result, migrate_file(FIXTURES_DIR / "v440_full.yaml", tmp_path / "OUT.yaml"))
+
+    report = format_timing_report(result)
+    assert "transform" in report
+    assert "annotations" in report
+    assert "v440_full.yaml" in report
+    assert "contributor-date" in report
@@ -73,3 +73,35 @@ class TestTransformConfig:
     assert "sections" in result.config
     assert "sections" not in result.config["template"]
     assert len(result.config["sections"]) == 1
+
+  def test_section_blocks_in_plan_order_then_unknown_keys(self):
+    v440 = {
+      "template": {"notes": "ignored"},
+      "sections": [
+        {
+          "comment": "kept",
+          "attributes": {},
+          "reindexing": [],
+          "triple": {},
+          "location": {"where_to_download_data_from": "https://example.org/a.csv"},
+          "extra": 1,
+        }
+      ],
+    }
+    result = transform_config(v440)
+    assert list(result.config["template"]) == ["syntax"]
+    (section,) = result.config["sections"]
+    assert list(section) == ["source", "statement", "annotations", "comment", "extra"]
+
+  def test_dropped_blocks_parallel_dropped_fields(self):
+    stray = {"value_for_encoding": "A", "mapping_hyperparameters": {"stray": 1}}
+    v440 = {
+      "template": {"triple": {"triple_subject": stray}},
+      "sections": [
+        {"triple": {}},
+        {"triple": {"triple_object": stray}},
+      ],
+    }
+    result = transform_config(v440)
+    assert result.dropped_fields == ["triple.subject.stray", "triple.object.stray"]
+    assert result.dropped_blocks == ["template", "sections[1]"]
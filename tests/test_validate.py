@@ -0,0 +1,135 @@
+"""Tests for TC3 schema validation."""
+
+import pytest
+
+from migratassert.migrate import dump_yaml, run_migration
+from migratassert.report import format_report, format_timing_report
+from migratassert.sinks import file_result_event
+from migratassert.transform import transform_config
+from migratassert.validate import (
+  SCHEMA_RULES,
+  SCHEMA_VALIDATION,
+  Rule,
+  compile_schema_plan,
+  configure_schema_validation,
+  validate_config,
+)
+
+VALID = {
+  "template": {
+    "syntax": "TC3",
+    "source": {"url": "https://example.org/a.csv", "kind": "text", "row_slice": [2, "auto"]},
+    "statement": {
+      "subject": {"method": "column", "encoding": "A"},
+      "predicate": "related_to",
+      "object": {"method": "value", "encoding": "MONDO:1"},
+    },
+    "provenance": {"contributors": [{"kind": "curation", "name": "J", "date": "01 JAN 2025"}]},
+    "annotations": [{"annotation": "p value", "method": "column", "encoding": "P"}],
+  },
+  "sections": [{"source": {"row_slice": [1, 10]}}],
+}
+
+
+def broken() -> dict:
+  config = transform_config({}).config
+  config["template"].update(
+    {
+      "source": {"kind": "parquet", "row_slice": [5, 2]},
+      "statement": {"subject": {"method": "column_of_values", "encoding": "A"}, "object": {"method": "value"}},
+      "provenance": {"contributors": [{"kind": "curation", "name": "J"}]},
+    }
+  )
+  config["sections"] = [{"annotations": [{"method": "column", "encoding": "P"}]}, {"source": {"row_slice": [0]}}]
+  return config
+
+
+class TestValidateConfig:
+  def test_valid_config(self):
+    report = validate_config(VALID)
+    assert report.violations == []
+    assert report.rules["row-slice"].checks == 2
+    assert report.rules["method"].checks == 3
+
+  def test_transformed_fixture_is_valid(self, v440_full_config):
+    assert validate_config(transform_config(v440_full_config, file_stem="ALAM1").config).violations == []
+
+  def test_violations_in_document_order(self):
+    report = validate_config(broken())
+    assert report.violations == [
+      "template.source.row_slice: row-slice: end must be 'auto' or a line number >= start, got 2",
+      "template.source.kind: source-kind: unknown kind 'parquet' (expected one of excel, text)",
+      "template.statement.subject: method: unknown method 'column_of_values' (expected one of column, value)",
+      "template.statement.object: encoding: method set without encoding",
+      "template.provenance.contributors[0]: contributor-date: missing date",
+      "sections[0].annotations[0]: annotation-name: missing annotation name",
+      "sections[1].source.row_slice: row-slice: expected [start, end], got [0]",
+    ]
+    assert report.rules["method"].violations == 1
+    assert all(stats.seconds >= 0 for stats in report.rules.values())
+
+  @pytest.mark.parametrize(("taxon", "valid"), [(9606, True), ("Homo sapiens", False), ("9606", False), (True, False)])
+  def test_taxon(self, taxon, valid):
+    config = {"template": {"syntax": "TC3", "annotations": [{"annotation": "host", "method": "value", "encoding": "x", "taxon": taxon}]}}
+    report = validate_config(config)
+    assert report.rules["taxon"].checks == 1
+    assert (report.violations == []) == valid
+
+  def test_syntax_is_template_only(self):
+    config = {"template": {"syntax": "TC2"}, "sections": [{"syntax": "TC2"}]}
+    assert [v.split(":")[0] for v in validate_config(config).violations] == ["template.syntax"]
+
+  @pytest.mark.parametrize(
+    ("row_slice", "valid"),
+    [([1, 1], True), ([3, "auto"], True), ([0, 5], False), ([True, 5], False), (["2", 5], False), ([2], False)],
+  )
+  def test_row_slice(self, row_slice, valid):
+    report = validate_config({"template": {"syntax": "TC3", "source": {"row_slice": row_slice}}})
+    assert (report.violations == []) == valid
+
+
+def test_compile_schema_plan_shares_paths():
+  plan = compile_schema_plan(SCHEMA_RULES, template=False)
+  encoding = plan.children["statement"].children["subject"]
+  assert [rule.name for rule in encoding.rules] == ["method", "encoding"]
+  assert "syntax" not in plan.children
+
+  extra = Rule("predicate", ("statement.predicate",), lambda value: None)
+  plan = compile_schema_plan([*SCHEMA_RULES, extra], template=True)
+  assert plan.children["statement"].children["predicate"].rules == [extra]
+
+
+class TestMigrationValidation:
+  @pytest.fixture(autouse=True)
+  def restore(self):
+    yield
+    configure_schema_validation(True)
+
+  @pytest.mark.parametrize("jobs", [1, 2])
+  def test_report_counts(self, tmp_path, jobs):
+    indir = tmp_path / "in"
+    indir.mkdir()
+    (indir / "a.yaml").write_text(
+      dump_yaml({"template": {"provenance": {"config_curator_name": "J"}, "attributes": {"n": {"encoding_method": "guess"}}}})
+    )
+    (indir / "b.yaml").write_text(dump_yaml({"template": {}}))
+    result = run_migration(indir, tmp_path / "out", jobs=jobs)
+    assert result.files_succeeded == 2
+    assert result.files_invalid == 1
+    assert result.rule_stats["method"].violations == 1
+    assert "TC3 schema violations (1 files):" in format_report(result)
+    assert "  method: 1 violations" in format_report(result)
+    assert "Schema rules (total):" in format_timing_report(result)
+    events = [file_result_event(fr)["schema_violations"] for fr in result.file_results]
+    assert [len(violations) for violations in events] == [2, 0]
+
+  def test_disabled(self, tmp_path):
+    indir = tmp_path / "in"
+    indir.mkdir()
+    (indir / "a.yaml").write_text(dump_yaml({"template": {}}))
+    result = run_migration(indir, tmp_path / "out", validate=False)
+    # The process-wide switch is restored after the run
+    assert SCHEMA_VALIDATION.enabled
+    assert result.file_results[0].validation is None
+    assert result.rule_stats == {}
+    assert "validate" not in result.phase_wall
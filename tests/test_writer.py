@@ -0,0 +1,82 @@
+"""Tests for atomic, skip-if-identical output writes."""
+
+import os
+
+import pytest
+from ruamel.yaml import YAML
+
+from migratassert.migrate import run_migration
+from migratassert.writer import matches_existing, write_atomic
+
+
+class TestMatchesExisting:
+  def test_missing_file(self, tmp_path):
+    assert not matches_existing(tmp_path / "out.yaml", b"a: 1\n")
+
+  def test_size_and_content(self, tmp_path):
+    path = tmp_path / "out.yaml"
+    path.write_bytes(b"a: 1\n")
+    assert matches_existing(path, b"a: 1\n")
+    assert not matches_existing(path, b"a: 2\n")
+    assert not matches_existing(path, b"a: 10\n")
+
+
+class TestWriteAtomic:
+  def test_creates_parents_and_writes(self, tmp_path):
+    path = tmp_path / "nested" / "out.yaml"
+    assert write_atomic(path, b"a: 1\n", fsync=True)
+    assert path.read_bytes() == b"a: 1\n"
+    assert os.listdir(path.parent) == ["out.yaml"]
+
+  def test_identical_output_is_not_rewritten(self, tmp_path):
+    path = tmp_path / "out.yaml"
+    path.write_bytes(b"a: 1\n")
+    os.utime(path, ns=(0, 0))
+    assert not write_atomic(path, b"a: 1\n")
+    assert path.stat().st_mtime_ns == 0
+
+  def test_replaces_and_keeps_mode(self, tmp_path):
+    path = tmp_path / "out.yaml"
+    path.write_bytes(b"a: 1\n")
+    path.chmod(0o640)
+    assert write_atomic(path, b"a: 2\n")
+    assert path.read_bytes() == b"a: 2\n"
+    assert path.stat().st_mode & 0o777 == 0o640
+
+  def test_failed_write_keeps_old_file(self, tmp_path, monkeypatch):
+    path = tmp_path / "out.yaml"
+    path.write_bytes(b"a: 1\n")
+
+    def fail(*args):
+      raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError, match="disk full"):
+      write_atomic(path, b"a: 2\n")
+    assert path.read_bytes() == b"a: 1\n"
+    assert os.listdir(tmp_path) == ["out.yaml"]
+
+
+class TestRunMigrationWrites:
+  @pytest.mark.parametrize("async_io", [False, True])
+  def test_rerun_leaves_identical_outputs_untouched(self, tmp_path, async_io):
+    indir = tmp_path / "input"
+    outdir = tmp_path / "output"
+    indir.mkdir()
+    yaml = YAML()
+    for i in range(3):
+      with open(indir / f"c{i}.yaml", "w") as f:
+        yaml.dump({"template": {"triple": {"triple_subject": {"value_for_encoding": f"A{i}"}}}}, f)
+
+    first = run_migration(indir, outdir, fsync=True, async_io=async_io)
+    assert first.files_unchanged == 0
+    for path in outdir.iterdir():
+      os.utime(path, ns=(0, 0))
+
+    (indir / "c0.yaml").write_text("template:\n  triple:\n    triple_subject:\n      value_for_encoding: Z\n")
+    second = run_migration(indir, outdir, fsync=True, async_io=async_io)
+    assert second.files_succeeded == 3
+    assert second.files_unchanged == 2
+    assert [r.unchanged for r in second.file_results] == [False, True, True]
+    assert (outdir / "C0.yaml").stat().st_mtime_ns != 0
+    assert (outdir / "C1.yaml").stat().st_mtime_ns == 0